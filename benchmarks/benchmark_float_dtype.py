@@ -0,0 +1,128 @@
+# =================================================================
+# === 信号処理 浮動小数点型(float64 / float32) 比較ベンチマーク ===
+# =================================================================
+# リポジトリTOPディレクトリにて「python -m benchmarks.benchmark_float_dtype」で実行する
+import contextlib
+import io
+import timeit
+
+import numpy as np
+
+from modules.audio_signal_processing_advanced import overlap, window
+from modules.audio_signal_processing_basic import (discrete_data_normalize,
+                                                   set_float_dtype)
+from modules.gen_cepstrum_data import (gen_cepstrum_data,
+                                       gen_melscale_spctrm_env_data)
+from modules.gen_freq_domain_data import (
+    gen_freq_domain_data, gen_freq_domain_data_of_signal_spctrgrm,
+    gen_freq_domain_data_of_stft)
+
+
+def gen_benchmark_discrete_data(samplerate, time):
+    # ============================================================
+    # === ベンチマーク用 16bit量子化 離散データ(bytes)生成関数 ===
+    # ============================================================
+    # samplerate    : サンプリング周波数[Hz]
+    # time          : データ時間長[s]
+
+    rng = np.random.default_rng(0)
+    t = np.arange(int(samplerate * time)) / samplerate
+
+    # 基本周波数220[Hz]の調波成分 + 白色雑音
+    wave = sum(np.sin(2 * np.pi * 220 * k * t) / k for k in range(1, 8))
+    wave = 0.3 * wave / np.max(np.abs(wave)) + 0.01 * rng.standard_normal(len(t))
+
+    # discrete_data : 16bit量子化 離散データ(bytes)
+    return (wave * 32767).astype(np.int16).tobytes()
+
+
+def gen_analysis_stages(discrete_data, samplerate, stft_frame_size, overlap_rate, dbref, A):
+    # =========================================================
+    # === ベンチマーク対象 解析ステージ(関数)一覧の生成関数 ===
+    # =========================================================
+    # (正規化は各ステージ内で実施し、FLOAT_DTYPEの設定が正規化から反映されるようにする)
+
+    def normalize():
+        return discrete_data_normalize(discrete_data, "int16")
+
+    def freq_domain():
+        gen_freq_domain_data(normalize(), samplerate, dbref, A)
+
+    def signal_spectrogram():
+        gen_freq_domain_data_of_signal_spctrgrm(
+            normalize(), samplerate, stft_frame_size, overlap_rate, "hann", dbref, A)
+
+    def scratch_stft():
+        data_overlaped, N_ave, final_time = overlap(
+            normalize(), samplerate, stft_frame_size, overlap_rate)
+        data_applied_window, acf = window(data_overlaped, stft_frame_size, N_ave, "hann")
+        gen_freq_domain_data_of_stft(
+            data_applied_window, samplerate, stft_frame_size, N_ave, final_time, acf, dbref, A)
+
+    def cepstrum():
+        gen_cepstrum_data(normalize(), samplerate, dbref)
+
+    def melscale():
+        gen_melscale_spctrm_env_data(normalize(), samplerate, 20, dbref)
+
+    # stages : (ステージ名, ステージ関数)のリスト
+    return [
+        ("normalize", normalize),
+        ("gen_freq_domain_data", freq_domain),
+        ("scipy.signal.spectrogram", signal_spectrogram),
+        ("Full Scratch STFT", scratch_stft),
+        ("gen_cepstrum_data", cepstrum),
+        ("gen_melscale_spctrm_env_data", melscale),
+    ]
+
+
+if __name__ == '__main__':
+    # --- Parameters ---
+    samplerate = 8000           # サンプリング周波数[Hz] (リアルタイムモードと同じ設定)
+    frames_per_buffer = 1024 * 8
+    stft_frame_size = int(frames_per_buffer / 35)
+    overlap_rate = 50
+    dbref = 0
+    A = True
+    buffer_count = 8            # ベンチマーク用データ長 [入力音声ストリームバッファ数]
+    repeat = 20                 # 計測回数 (最小値を計測結果とする)
+    # ------------------
+
+    discrete_data = gen_benchmark_discrete_data(
+        samplerate, frames_per_buffer * buffer_count / samplerate)
+
+    stages = gen_analysis_stages(
+        discrete_data, samplerate, stft_frame_size, overlap_rate, dbref, A)
+
+    results = {}
+    for float_dtype in ("float64", "float32"):
+        set_float_dtype(float_dtype)
+
+        for stage_name, stage_func in stages:
+            # 各解析関数の標準出力(shape表示等)は計測対象外とする
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[(float_dtype, stage_name)] = min(
+                    timeit.repeat(stage_func, number=1, repeat=repeat))
+
+    print("")
+    print("stage".ljust(30), "float64[ms]".rjust(12), "float32[ms]".rjust(12), "speedup".rjust(9))
+    total64 = 0
+    total32 = 0
+    for stage_name, stage_func in stages:
+        t64 = results[("float64", stage_name)]
+        t32 = results[("float32", stage_name)]
+        total64 += t64
+        total32 += t32
+        print(
+            stage_name.ljust(30),
+            str(round(t64 * 1000, 2)).rjust(12),
+            str(round(t32 * 1000, 2)).rjust(12),
+            ("x" + str(round(t64 / t32, 2))).rjust(9)
+        )
+    print(
+        "total".ljust(30),
+        str(round(total64 * 1000, 2)).rjust(12),
+        str(round(total32 * 1000, 2)).rjust(12),
+        ("x" + str(round(total64 / total32, 2))).rjust(9)
+    )
+    print("")
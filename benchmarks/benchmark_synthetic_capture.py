@@ -0,0 +1,122 @@
+# =============================================================
+# === 合成信号入力による 取得/解析パイプライン ベンチマーク ===
+# =============================================================
+# リポジトリTOPディレクトリにて「python -m benchmarks.benchmark_synthetic_capture」で実行する
+# (SyntheticPyAudioを使用するため、サウンドカードの無い環境でも実行可能)
+import contextlib
+import hashlib
+import io
+import time
+
+import numpy as np
+
+from modules.audio_ring_buffer import AudioRingBuffer
+from modules.audio_stream import audio_stream_start, audio_stream_stop
+from modules.gen_freq_domain_data import gen_fundamental_freq_data
+from modules.gen_time_domain_data import gen_time_domain_data
+from modules.get_mic_index import get_mic_index
+from modules.synthetic_audio import SyntheticPyAudio, SyntheticSignal
+
+
+def run_blocking_capture(signal, samplerate, frames_per_buffer, buffer_count):
+    # ==============================================================
+    # === Blockingモード 取得 → F0解析 実行関数 (realtime=False) ===
+    # ==============================================================
+    # signal                : 供給するSyntheticSignal
+    # samplerate            : サンプリング周波数[Hz]
+    # frames_per_buffer     : 入力音声ストリームバッファあたりのサンプリングデータ数
+    # buffer_count          : 処理する入力音声ストリームバッファ数
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        pa = SyntheticPyAudio(signal, realtime=False)
+        mic_list = get_mic_index(pa)
+        pa, stream = audio_stream_start(mic_list[0], 1, samplerate, frames_per_buffer, pa=pa)
+
+    digest = hashlib.sha1()
+    f0_list = []
+
+    start_time = time.perf_counter()
+    for i in range(buffer_count):
+        with contextlib.redirect_stdout(io.StringIO()):
+            data_normalized, time_normalized = gen_time_domain_data(
+                stream, frames_per_buffer, samplerate, 0)
+            f0, time_f0 = gen_fundamental_freq_data(data_normalized, samplerate)
+
+        digest.update(data_normalized.tobytes())
+        f0_list.append(f0[f0 > 0])
+    elapsed = time.perf_counter() - start_time
+
+    audio_stream_stop(pa, stream)
+
+    # elapsed   : 処理時間[s]
+    # f0        : 有声フレームの推定F0[Hz] 1次元配列
+    # digest    : 取得した時間領域波形データ(正規化済)のSHA-1
+    return elapsed, np.concatenate(f0_list), digest.hexdigest()
+
+
+def run_callback_capture(signal, samplerate, frames_per_buffer, time_length):
+    # ===========================================================
+    # === Callbackモード callback間隔計測関数 (realtime=True) ===
+    # ===========================================================
+    # signal                : 供給するSyntheticSignal
+    # samplerate            : サンプリング周波数[Hz]
+    # frames_per_buffer     : 入力音声ストリームバッファあたりのサンプリングデータ数
+    # time_length           : 計測時間[s]
+
+    ring_buffer = AudioRingBuffer(frames_per_buffer * 4)
+    arrival_times = []
+
+    class TimedRingBuffer:
+        # callback到着時刻を記録した上でリングバッファに書込む
+        def write(self, in_data):
+            arrival_times.append(time.monotonic())
+            ring_buffer.write(in_data)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        pa = SyntheticPyAudio(signal, realtime=True)
+        pa, stream = audio_stream_start(
+            0, 1, samplerate, frames_per_buffer, TimedRingBuffer(), pa=pa)
+
+    time.sleep(time_length)
+    audio_stream_stop(pa, stream)
+
+    # interval_error : callback間隔の理論値(frames_per_buffer / samplerate)との差[s] 1次元配列
+    return np.diff(arrival_times) - frames_per_buffer / samplerate
+
+
+if __name__ == '__main__':
+    # --- Parameters ---
+    samplerate = 8000           # サンプリング周波数[Hz] (リアルタイムモードと同じ設定)
+    frames_per_buffer = 1024 * 8
+    buffer_count = 16           # Blockingモードで処理する入力音声ストリームバッファ数
+    f0_true = 220.0             # 合成信号(harmonic)の基本周波数F0[Hz]
+    callback_frames = 256       # Callbackモード計測時の入力音声ストリームバッファあたりのサンプリングデータ数
+    callback_time = 2.0         # Callbackモード計測時間[s]
+    # ------------------
+
+    signal = SyntheticSignal("harmonic", freq=f0_true, amplitude=0.5, noise_level=0.01, seed=0)
+
+    # === Blockingモード 取得 → F0解析 スループット計測 ===
+    elapsed, f0, digest = run_blocking_capture(signal, samplerate, frames_per_buffer, buffer_count)
+    elapsed_2nd, f0_2nd, digest_2nd = run_blocking_capture(signal, samplerate, frames_per_buffer, buffer_count)
+
+    audio_time = buffer_count * frames_per_buffer / samplerate
+    print("")
+    print("--- Blocking capture + F0 analysis (realtime=False) ---")
+    print("audio time[s]          :", round(audio_time, 3))
+    print("elapsed time[s]        :", round(elapsed, 3), "/", round(elapsed_2nd, 3))
+    print("realtime factor        : x" + str(round(audio_time / elapsed, 2)))
+    print("F0 median[Hz]          :", round(float(np.median(f0)), 2), "( true :", f0_true, ")")
+    print("captured data SHA-1    :", digest)
+    print("reproducible           :", (digest == digest_2nd) and np.array_equal(f0, f0_2nd))
+
+    # === Callbackモード callback間隔計測 ===
+    interval_error = run_callback_capture(signal, samplerate, callback_frames, callback_time)
+
+    print("")
+    print("--- Callback timing (realtime=True) ---")
+    print("callback count         :", len(interval_error) + 1)
+    print("interval[ms]           :", round(callback_frames / samplerate * 1000, 3))
+    print("interval error mean[ms]:", round(float(np.mean(interval_error)) * 1000, 3))
+    print("interval error max[ms] :", round(float(np.max(np.abs(interval_error))) * 1000, 3))
+    print("")
@@ -0,0 +1,210 @@
+import collections
+import threading
+import time
+
+import numpy as np
+
+
+class ActivityDetector:
+    # =========================================
+    # === 入力音声 アクティビティ検出クラス ===
+    # =========================================
+    # 入力音声ストリームバッファ毎に、エネルギー(RMS)とスペクトル平坦度から有音/無音を判定し、
+    # 無音バッファでは負荷の大きい解析ステージ(基本周波数/ケプストラム/メルスペクトル等)を
+    # スキップ(前回結果の再利用) または 簡易処理に置換えるためのクラス
+    #   - 有音開始 : エネルギーがon_threshold_db以上、かつスペクトル平坦度がflatness_threshold以下
+    #                (白色雑音のような平坦なスペクトルの定常雑音は、エネルギーが大きくても有音としない)
+    #   - 有音継続 : エネルギーがoff_threshold_db以上 (on/offの閾値差によるヒステリシス)
+    #   - 有音終了 : 有音継続の条件を満たさない状態がhangover_time[s]続いた場合
+    #                (語尾/子音等の低エネルギー区間で解析が途切れないようにする)
+    # (スペクトル平坦度はエネルギーが閾値以上の場合のみ算出するため、無音時の判定コストはRMS算出のみとなる)
+
+    def __init__(
+        self,
+        samplerate,
+        on_threshold_db=-50.0,
+        off_threshold_db=-56.0,
+        flatness_threshold=0.5,
+        hangover_time=0.5
+    ):
+        # samplerate            : サンプリング周波数[Hz]
+        # on_threshold_db       : 有音開始と判定するエネルギー(RMS)の閾値[dB FS]
+        # off_threshold_db      : 有音継続と判定するエネルギー(RMS)の閾値[dB FS] (on_threshold_db以下とする)
+        # flatness_threshold    : 有音開始と判定するスペクトル平坦度の上限 (0.0:純音 ～ 1.0:白色雑音)
+        # hangover_time         : 有音継続の条件を満たさなくなってから有音状態を維持する時間[s]
+
+        if off_threshold_db > on_threshold_db:
+            raise ValueError(
+                "off_threshold_db (" + str(off_threshold_db) + ") must be less than or equal to "
+                "on_threshold_db (" + str(on_threshold_db) + ")"
+            )
+
+        self.samplerate = samplerate
+        self.on_threshold_db = on_threshold_db
+        self.off_threshold_db = off_threshold_db
+        self.flatness_threshold = flatness_threshold
+        self.hangover_time = hangover_time
+
+        # 判定状態
+        self.active = False
+        self.hangover_remaining = 0.0
+        self.energy_db = -np.inf
+        self.flatness = 1.0
+
+        # 判定カウンタ
+        self.block_count = 0
+        self.active_block_count = 0
+
+        # 解析ステージ毎の 実行回数/スキップ回数/累積処理時間[s] & 前回の解析結果
+        self.stage_stats = collections.OrderedDict()
+        self.last_results = {}
+
+        # (パイプラインの複数の解析ワーカースレッドから使用できるようにロックで保護する)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def gen_energy_db(data_normalized):
+        # =======================================
+        # === エネルギー(RMS)[dB FS] 算出関数 ===
+        # =======================================
+        mean_square = np.mean(np.square(data_normalized, dtype=np.float64))
+
+        with np.errstate(divide='ignore'):
+            energy_db = 10 * np.log10(mean_square)
+
+        # energy_db : エネルギー(RMS)[dB FS]
+        return energy_db
+
+    @staticmethod
+    def gen_spectral_flatness(data_normalized):
+        # =================================
+        # === スペクトル平坦度 算出関数 ===
+        # =================================
+        # (パワースペクトルの幾何平均 / 算術平均 : 0.0(純音) ～ 1.0(白色雑音))
+
+        power = np.square(np.abs(np.fft.rfft(np.ravel(data_normalized))), dtype=np.float64) + 1e-20
+        flatness = np.exp(np.mean(np.log(power))) / np.mean(power)
+
+        # flatness : スペクトル平坦度
+        return flatness
+
+    def update(self, data_normalized):
+        # ============================================
+        # === 入力音声バッファの有音/無音 判定関数 ===
+        # ============================================
+        # data_normalized : 時間領域波形データ(正規化済)
+
+        energy_db = self.gen_energy_db(data_normalized)
+        block_time = np.shape(data_normalized)[-1] / self.samplerate
+
+        with self.lock:
+            self.energy_db = energy_db
+
+            if not self.active:
+                # 有音開始の判定 (エネルギーが閾値以上の場合のみスペクトル平坦度を算出)
+                if energy_db >= self.on_threshold_db:
+                    self.flatness = self.gen_spectral_flatness(data_normalized)
+                    if self.flatness <= self.flatness_threshold:
+                        self.active = True
+                        self.hangover_remaining = self.hangover_time
+            elif energy_db >= self.off_threshold_db:
+                # 有音継続 (ハングオーバー時間をリセット)
+                self.hangover_remaining = self.hangover_time
+            else:
+                # ハングオーバー時間の経過後に有音終了
+                self.hangover_remaining -= block_time
+                if self.hangover_remaining <= 0:
+                    self.active = False
+
+            self.block_count += 1
+            if self.active:
+                self.active_block_count += 1
+
+            # active : 有音(True) / 無音(False)
+            return self.active
+
+    def run_stage(self, stage, active, stage_func, *args, downgrade_func=None):
+        # ========================================================
+        # === 解析ステージ実行関数 (無音時はスキップ/簡易処理) ===
+        # ========================================================
+        # stage             : 解析ステージ名 (例："f0" / "cepstrum" / "melscale")
+        # active            : update()の判定結果
+        # stage_func        : 解析関数 (第1引数は時間領域波形データ等の解析対象データ)
+        # args              : stage_funcへ渡す引数
+        # downgrade_func    : 無音時にstage_funcの代わりに実行する簡易処理関数 (stage_funcと同じ引数/戻り値)
+        #                     (Noneの場合は、同じデータ形状(チャンネル数, データ長)で算出した前回の解析結果を再利用する)
+
+        data_shape = np.shape(args[0])
+
+        with self.lock:
+            if stage not in self.stage_stats:
+                self.stage_stats[stage] = {"run": 0, "skip": 0, "time": 0.0}
+            stats = self.stage_stats[stage]
+            last_result = self.last_results.get(stage)
+
+        if not active:
+            if downgrade_func is not None:
+                with self.lock:
+                    stats["skip"] += 1
+                return downgrade_func(*args)
+
+            if (last_result is not None) and (last_result[0] == data_shape):
+                with self.lock:
+                    stats["skip"] += 1
+                return last_result[1]
+
+        start_time = time.perf_counter()
+        result = stage_func(*args)
+        processing_time = time.perf_counter() - start_time
+
+        with self.lock:
+            stats["run"] += 1
+            stats["time"] += processing_time
+            self.last_results[stage] = (data_shape, result)
+
+        # result : 解析結果 (stage_funcの戻り値 / 無音時はdowngrade_funcの戻り値 または 前回の解析結果)
+        return result
+
+    def get_stats(self):
+        # ==================================================
+        # === アクティビティ判定 & スキップ統計 取得関数 ===
+        # ==================================================
+
+        with self.lock:
+            stats = {
+                "blocks": self.block_count,
+                "active_blocks": self.active_block_count,
+                "stages": collections.OrderedDict(),
+            }
+            for stage, stage_stats in self.stage_stats.items():
+                mean_time = stage_stats["time"] / stage_stats["run"] if stage_stats["run"] > 0 else 0.0
+                stats["stages"][stage] = {
+                    "run": stage_stats["run"],
+                    "skip": stage_stats["skip"],
+                    "mean_time": mean_time,
+                    # スキップにより削減した処理時間の推定値[s] (スキップ回数 x 実行時の平均処理時間)
+                    "saved_time": stage_stats["skip"] * mean_time,
+                }
+
+        # stats : 判定したバッファ数/有音バッファ数/解析ステージ毎の実行回数・スキップ回数・平均処理時間・削減時間
+        return stats
+
+    def print_report(self):
+        # ==========================================================
+        # === アクティビティ判定 & スキップ統計 レポート出力関数 ===
+        # ==========================================================
+        stats = self.get_stats()
+
+        print("")
+        print("=== Activity Gating Report ===")
+        print("  blocks (active / total) : ", stats["active_blocks"], "/", stats["blocks"])
+        print("  stage".ljust(16), "run".rjust(7), "skip".rjust(7), "mean[ms]".rjust(10), "saved[s]".rjust(10))
+        for stage, stage_stats in stats["stages"].items():
+            print(
+                ("  " + stage).ljust(16),
+                str(stage_stats["run"]).rjust(7),
+                str(stage_stats["skip"]).rjust(7),
+                str(round(stage_stats["mean_time"] * 1000, 2)).rjust(10),
+                str(round(stage_stats["saved_time"], 2)).rjust(10)
+            )
+        print("")
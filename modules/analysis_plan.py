@@ -0,0 +1,141 @@
+import functools
+
+import numpy as np
+import scipy
+
+from .audio_signal_processing_basic import a_weighting, get_float_dtype
+
+# キャッシュする解析プランの最大数
+# (リアルタイムモード/レコーディングモード/バッファサイズ自動調整の候補サイズ等を切替えても、
+#  再生成せずにキャッシュから取得できる数とする)
+ANALYSIS_PLAN_CACHE_SIZE = 32
+
+
+class AnalysisPlan:
+    # ========================
+    # === 解析プランクラス ===
+    # ========================
+    # 設定値(サンプリング周波数, フレーム長, FFT点数, 窓関数, デシベル基準値, A特性補正, 浮動小数点型)のみで
+    # 決まる配列(時間軸/周波数軸データ, 窓関数, 振幅補正係数, 聴感補正曲線)を1度だけ生成して保持する
+    # (バッファ毎の再生成を行わないように、get_analysis_plan()でLRUキャッシュから取得して使用する)
+    #   - 不変(immutable) : 属性の変更は不可とし、保持する配列は全て読込み専用とする
+    #                       (キャッシュしたプランを複数のスレッド/解析ステージで共有しても、意図せず変更されない)
+    #   - ハッシュ可能    : 設定値のタプル(key)で比較/ハッシュ化できる
+
+    def __init__(self, samplerate, frame_size, nfft, window_func, dbref, A, float_dtype):
+        # samplerate    : サンプリング周波数[Hz]
+        # frame_size    : 解析フレーム長[sampling data count]
+        # nfft          : FFT点数 (両側スペクトルのデータ数)
+        # window_func   : 窓関数 ("hann" : Hanning窓 / "boxcar" : 矩形窓 / None : 窓関数なし)
+        # dbref         : デシベル基準値
+        # A             : 聴感補正(A特性)の有効(True)/無効(False)設定
+        # float_dtype   : 信号処理の浮動小数点型 ("float64" / "float32")
+
+        dt = 1 / samplerate  # サンプリング周期[s]
+
+        # 時間軸データ (gen_time_axis_data()と同じ算出式)
+        time_axis = np.arange(0, frame_size * dt, dt)
+
+        # 周波数軸データ (負の周波数領域を除外した「FFT点数 / 2」までの要素)
+        freq_axis = scipy.fft.rfftfreq(nfft, d=dt)[:int(nfft / 2)]
+
+        # 窓関数 & 振幅補正係数(Amplitude Correction Factor)
+        if window_func is None:
+            window, acf = None, None
+        else:
+            window, acf = get_window_data(frame_size, window_func, float_dtype)
+
+        # 聴感補正曲線 (dbrefが0以上、かつ、A=Trueの場合のみ / dB値に加算するため信号処理の浮動小数点型とする)
+        if (dbref > 0) and A:
+            a_scale = a_weighting(freq_axis).astype(float_dtype)
+        else:
+            a_scale = None
+
+        for array in (time_axis, freq_axis, a_scale):
+            if array is not None:
+                array.flags.writeable = False
+
+        # (__setattr__()を無効化しているため、__dict__へ直接設定する)
+        self.__dict__.update(
+            key=(samplerate, frame_size, nfft, window_func, dbref, A, float_dtype),
+            samplerate=samplerate,
+            frame_size=frame_size,
+            nfft=nfft,
+            window_func=window_func,
+            dbref=dbref,
+            A=A,
+            float_dtype=float_dtype,
+            time_axis=time_axis,
+            freq_axis=freq_axis,
+            window=window,
+            acf=acf,
+            a_scale=a_scale
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError("AnalysisPlan is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("AnalysisPlan is immutable")
+
+    def __eq__(self, other):
+        return isinstance(other, AnalysisPlan) and (self.key == other.key)
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return "AnalysisPlan" + repr(self.key)
+
+
+@functools.lru_cache(maxsize=ANALYSIS_PLAN_CACHE_SIZE)
+def get_window_data(frame_size, window_func, float_dtype):
+    # ===================================================
+    # === 窓関数 & 振幅補正係数 取得関数 (キャッシュ) ===
+    # ===================================================
+    # frame_size    : 窓関数長[sampling data count]
+    # window_func   : 窓関数 ("hann" : Hanning窓 / それ以外 : 矩形窓)
+    # float_dtype   : 信号処理の浮動小数点型 ("float64" / "float32")
+
+    if window_func == "hann":
+        # Hanning窓
+        window = scipy.signal.windows.hann(frame_size)
+    else:
+        # 矩形窓
+        window = scipy.signal.windows.boxcar(frame_size)
+
+    # 窓関数を信号処理の浮動小数点型に変換 (float32データへの乗算でfloat64に昇格させない)
+    window = window.astype(float_dtype)
+    window.flags.writeable = False
+
+    # 振幅補正係数(Amplitude Correction Factor)
+    acf = 1 / (np.sum(window) / frame_size)
+
+    # window    : 窓関数 1次元配列 (読込み専用)
+    # acf       : 振幅補正係数(Amplitude Correction Factor)
+    return window, acf
+
+
+@functools.lru_cache(maxsize=ANALYSIS_PLAN_CACHE_SIZE)
+def _get_analysis_plan(samplerate, frame_size, nfft, window_func, dbref, A, float_dtype):
+    # 設定値(信号処理の浮動小数点型を含む)をキーとしてLRUキャッシュする
+    return AnalysisPlan(samplerate, frame_size, nfft, window_func, dbref, A, float_dtype)
+
+
+def get_analysis_plan(samplerate, frame_size, nfft=None, window_func=None, dbref=0, A=False):
+    # =======================================
+    # === 解析プラン取得関数 (キャッシュ) ===
+    # =======================================
+    # samplerate    : サンプリング周波数[Hz]
+    # frame_size    : 解析フレーム長[sampling data count]
+    # nfft          : FFT点数 (Noneの場合はframe_size)
+    # window_func   : 窓関数 ("hann" : Hanning窓 / "boxcar" : 矩形窓 / None : 窓関数なし)
+    # dbref         : デシベル基準値
+    # A             : 聴感補正(A特性)の有効(True)/無効(False)設定
+    # (信号処理の浮動小数点型は、set_float_dtype()の現在の設定値とする)
+
+    if nfft is None:
+        nfft = frame_size
+
+    # plan  : 解析プラン (AnalysisPlan / 同じ設定値の場合はキャッシュ済のプラン)
+    return _get_analysis_plan(samplerate, frame_size, nfft, window_func, dbref, A, get_float_dtype())
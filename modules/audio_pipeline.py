@@ -0,0 +1,328 @@
+import collections
+import queue
+import threading
+import time
+
+# 有効なキュー溢れ時の動作ポリシー
+# "block"       : キューに空きができるまでput側を待機させる
+# "drop-oldest" : キューが満杯の場合は最も古いデータを破棄して追加する
+# "latest-only" : キューには常に最新の1データのみを保持する
+DROP_POLICIES = ("block", "drop-oldest", "latest-only")
+
+
+class DropQueue:
+    # =========================================
+    # === 破棄ポリシー付き 有界キュークラス ===
+    # =========================================
+
+    def __init__(self, maxsize, drop_policy="drop-oldest"):
+        # maxsize       : キューの最大保持データ数
+        # drop_policy   : キュー溢れ時の動作ポリシー ("block" / "drop-oldest" / "latest-only")
+
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(
+                "drop_policy must be one of " + str(DROP_POLICIES) + ", not '" + str(drop_policy) + "'"
+            )
+
+        if drop_policy == "latest-only":
+            maxsize = 1
+
+        self.maxsize = maxsize
+        self.drop_policy = drop_policy
+
+        self.items = collections.deque()
+        self.condition = threading.Condition()
+
+        # キュー状態カウンタ
+        self.put_count = 0      # 追加データ数
+        self.get_count = 0      # 取出しデータ数
+        self.drop_count = 0     # 破棄データ数
+        self.max_depth = 0      # 最大滞留データ数
+
+    def put(self, item, timeout=None):
+        # ================================
+        # === キューへのデータ追加関数 ===
+        # ================================
+        # item      : 追加するデータ
+        # timeout   : "block"ポリシー時の最大待機時間[s] (Noneの場合は無制限に待機)
+
+        with self.condition:
+            if len(self.items) >= self.maxsize:
+                if self.drop_policy == "block":
+                    if not self.condition.wait_for(
+                            lambda: len(self.items) < self.maxsize, timeout):
+                        raise queue.Full
+                else:
+                    # 最も古いデータを破棄して空きを作る
+                    while len(self.items) >= self.maxsize:
+                        self.items.popleft()
+                        self.drop_count += 1
+
+            self.items.append(item)
+            self.put_count += 1
+            self.max_depth = max(self.max_depth, len(self.items))
+            self.condition.notify_all()
+
+    def get(self, timeout=None):
+        # ====================================
+        # === キューからのデータ取出し関数 ===
+        # ====================================
+        # timeout   : 最大待機時間[s] (Noneの場合は無制限に待機)
+
+        with self.condition:
+            if not self.condition.wait_for(lambda: len(self.items) > 0, timeout):
+                raise queue.Empty
+
+            item = self.items.popleft()
+            self.get_count += 1
+            self.condition.notify_all()
+
+        # item : 取出したデータ
+        return item
+
+    def get_stats(self):
+        # ==================================
+        # === キュー状態カウンタ取得関数 ===
+        # ==================================
+
+        with self.condition:
+            stats = {
+                "depth": len(self.items),
+                "max_depth": self.max_depth,
+                "put_count": self.put_count,
+                "get_count": self.get_count,
+                "drop_count": self.drop_count,
+            }
+
+        # stats : キュー状態カウンタ (現在の滞留データ数/最大滞留データ数/追加数/取出し数/破棄数)
+        return stats
+
+
+class AudioPipeline:
+    # =================================================
+    # === 取得/解析/描画 並列パイプライン実行クラス ===
+    # =================================================
+    # 入力音声取得 / 解析 / 描画の各ステージを独立に動作させ、
+    # ステージ間を有界キュー(DropQueue)で接続する
+    #   - 取得ステージ : 専用スレッド (解析/描画処理中もデバイスバッファを読出し続ける)
+    #   - 解析ステージ : 1つ以上のワーカースレッド (numpy/scipyの演算はGILを解放するため並列に動作可能)
+    #   - 描画ステージ : run()を呼び出したスレッド (matplotlibの制約によりメインスレッドで実行する)
+
+    def __init__(
+        self,
+        capture_func,
+        analysis_func,
+        render_func,
+        analysis_queue_size=4,
+        analysis_drop_policy="drop-oldest",
+        render_queue_size=1,
+        render_drop_policy="latest-only",
+        analysis_workers=1,
+        latency_monitor=None,
+        stamp_func=None
+    ):
+        # capture_func          : 入力音声取得関数 (引数なし / 戻り値が解析ステージへ渡される)
+        # analysis_func         : 解析関数 (取得ステージの戻り値を引数とし、戻り値が描画ステージへ渡される)
+        # render_func           : 描画関数 (解析ステージの戻り値を引数とする)
+        # analysis_queue_size   : 取得→解析間キューの最大保持データ数
+        # analysis_drop_policy  : 取得→解析間キューの溢れ時の動作ポリシー
+        # render_queue_size     : 解析→描画間キューの最大保持データ数
+        # render_drop_policy    : 解析→描画間キューの溢れ時の動作ポリシー
+        # analysis_workers      : 解析ステージのワーカースレッド数
+        # latency_monitor       : ステージ毎のレイテンシを記録するLatencyMonitor (Noneの場合は計測しない)
+        # stamp_func            : 取得直後に呼び出すタイムスタンプ生成関数 (引数なし / gen_block_stamp()等)
+        #                         (Noneの場合は、取得完了時刻をADC時刻とみなす)
+
+        self.capture_func = capture_func
+        self.analysis_func = analysis_func
+        self.render_func = render_func
+        self.latency_monitor = latency_monitor
+        self.stamp_func = stamp_func
+
+        self.analysis_queue = DropQueue(analysis_queue_size, analysis_drop_policy)
+        self.render_queue = DropQueue(render_queue_size, render_drop_policy)
+
+        self.stop_event = threading.Event()
+        # 入力音声ソースの終端到達(EOFError)により取得ステージが終了した事を示すイベント
+        self.capture_finished = threading.Event()
+        self.errors = queue.Queue()
+
+        # 解析ワーカーが複数の場合、解析結果の到着順が入れ替わるため、
+        # 取得順の通し番号を付与し、描画済より古い解析結果は描画しない
+        self.last_rendered_seq = -1
+        self.stale_count = 0
+
+        self.threads = [
+            threading.Thread(target=self._capture_loop, name="audio-capture", daemon=True)
+        ]
+        for i in range(analysis_workers):
+            self.threads.append(
+                threading.Thread(target=self._analysis_loop, name="audio-analysis-" + str(i), daemon=True)
+            )
+
+    def _capture_loop(self):
+        # 入力音声取得ステージ
+        seq = 0
+        try:
+            while not self.stop_event.is_set():
+                captured = self.capture_func()
+                if not self._put(self.analysis_queue, (seq, captured, self._gen_stamp())):
+                    break
+                seq += 1
+        except EOFError:
+            # 入力音声ソース(AudioReplaySource等)が終端に到達した場合、取得ステージのみ終了し、
+            # 解析/描画ステージは取得済データを全て処理してから終了する
+            self.capture_finished.set()
+        except BaseException as e:
+            self.errors.put(e)
+            self.stop_event.set()
+
+    def _put(self, drop_queue, item):
+        # キューへのデータ追加 ("block"ポリシーでも停止要求を確認できるように、待機時間を区切って再試行する)
+        # (停止要求により追加できなかった場合はFalse)
+        while not self.stop_event.is_set():
+            try:
+                drop_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+
+        return False
+
+    def _gen_stamp(self):
+        # 取得ブロックのタイムスタンプ生成 (レイテンシ計測を行わない場合はNone)
+        if self.latency_monitor is None:
+            return None
+
+        if self.stamp_func is None:
+            now = time.monotonic()
+            stamp = {"adc_time": now, "arrival_time": now, "last_time": now}
+        else:
+            stamp = self.stamp_func()
+
+        self.latency_monitor.begin(stamp)
+        return stamp
+
+    def _mark(self, stamp, stage):
+        # 処理ステージ完了時刻の記録 (レイテンシ計測を行わない場合は何もしない)
+        if stamp is not None:
+            self.latency_monitor.mark(stamp, stage)
+
+    def _analysis_loop(self):
+        # 解析ステージ
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    seq, captured, stamp = self.analysis_queue.get(timeout=0.1)
+                except queue.Empty:
+                    # 取得ステージの終了は最後のデータの追加後に通知されるため、
+                    # 終了通知の確認後にキューを再確認し、残りデータが無い場合のみ終了する
+                    if self.capture_finished.is_set() and self.analysis_queue.get_stats()["depth"] == 0:
+                        break
+                    continue
+
+                self._mark(stamp, "analysis_queue")
+                result = self.analysis_func(captured)
+                self._mark(stamp, "analysis")
+
+                if not self._put(self.render_queue, (seq, result, stamp)):
+                    break
+        except BaseException as e:
+            self.errors.put(e)
+            self.stop_event.set()
+
+    def start(self):
+        # ==========================================
+        # === 取得/解析ステージ スレッド開始関数 ===
+        # ==========================================
+        for thread in self.threads:
+            thread.start()
+
+    def render_once(self, timeout=0.1):
+        # ====================================
+        # === 描画ステージ 1回分の実行関数 ===
+        # ====================================
+        # timeout : 解析結果の最大待機時間[s]
+
+        # 取得/解析ステージで発生した例外は、描画側スレッドで再送出する
+        if not self.errors.empty():
+            raise self.errors.get()
+
+        try:
+            seq, result, stamp = self.render_queue.get(timeout=timeout)
+        except queue.Empty:
+            return False
+
+        if seq < self.last_rendered_seq:
+            self.stale_count += 1
+            return False
+
+        self.last_rendered_seq = seq
+        self._mark(stamp, "render_queue")
+        self.render_func(result)
+        self._mark(stamp, "render")
+
+        if stamp is not None:
+            self.latency_monitor.finish(stamp)
+            self.latency_monitor.print_report_if_due()
+
+        # 描画を実施した場合はTrue
+        return True
+
+    def is_finished(self):
+        # =========================================================
+        # === パイプライン処理完了判定関数 (入力音声ソース終端) ===
+        # =========================================================
+
+        # 取得ステージが終端に到達し、解析ステージが全て終了し、描画待ちデータも無い場合に完了
+        finished = (
+            self.capture_finished.is_set()
+            and not any(thread.is_alive() for thread in self.threads)
+            and self.render_queue.get_stats()["depth"] == 0
+        )
+
+        # finished : パイプライン処理が完了した場合はTrue
+        return finished
+
+    def run(self):
+        # =================================================================
+        # === パイプライン実行関数 (キーボードインタラプトあるまで継続) ===
+        # =================================================================
+        # (入力音声ソースが終端に到達した場合は、取得済データを全て描画してから終了する)
+        self.start()
+
+        try:
+            while not (self.stop_event.is_set() or self.is_finished()):
+                self.render_once()
+        except KeyboardInterrupt:
+            # 「ctrl+c」が押下された場合、パイプラインを終了する
+            pass
+        finally:
+            self.stop()
+
+        if not self.errors.empty():
+            raise self.errors.get()
+
+    def stop(self):
+        # ============================
+        # === パイプライン停止関数 ===
+        # ============================
+        self.stop_event.set()
+
+        for thread in self.threads:
+            if thread.is_alive() and thread is not threading.current_thread():
+                thread.join(timeout=5.0)
+
+    def get_queue_stats(self):
+        # ===============================================
+        # === パイプライン キュー状態カウンタ取得関数 ===
+        # ===============================================
+
+        stats = {
+            "analysis_queue": self.analysis_queue.get_stats(),
+            "render_queue": self.render_queue.get_stats(),
+            "stale_count": self.stale_count,
+        }
+
+        # stats : 各キューの状態カウンタ / 描画されなかった古い解析結果の数
+        return stats
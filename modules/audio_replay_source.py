@@ -0,0 +1,185 @@
+import time
+
+import numpy as np
+import soundfile as sf
+import soxr
+
+from .audio_signal_processing_basic import (discrete_data_quantize,
+                                            get_sample_dtype)
+from .wav_memmap import load_wav_memmap
+
+
+class AudioReplaySource:
+    # ==============================================
+    # === 音声ファイル/配列 再生入力ソースクラス ===
+    # ==============================================
+    # pyaudio.PyAudio.Stream(入力)と同じread()インタフェースを持ち、
+    # WAV/FLACファイルまたはnumpy配列の音声データを入力音声ストリームとして供給する
+    # (gen_time_domain_data()等の既存の取得関数に、streamとしてそのまま渡せる)
+    #   - paced=True  : 実時間ペースで供給 (マイク入力と同じタイミング)
+    #   - paced=False : 待機せずに供給 (パイプラインの最大スループット計測向け)
+
+    def __init__(self, source, samplerate, channels=1, paced=True, loop=False, sample_format="int16"):
+        # source        : 音声ファイル名(WAV/FLAC) または 音声データ numpy配列
+        #                 (numpy配列の場合は、int16 または 正規化済(-1.0～+1.0)浮動小数点
+        #                  / (フレーム数,) または (フレーム数, チャンネル数))
+        # samplerate    : 供給するサンプリング周波数[Hz]
+        #                 (ファイルのサンプリング周波数と異なる場合はsoxrで変換する)
+        # channels      : 供給するチャンネル数 (1:モノラル / 2:ステレオ)
+        # paced         : 実時間ペースで供給する(True) / 待機せずに供給する(False)
+        # loop          : 終端到達時に先頭から繰返す(True) / EOFErrorを送出する(False)
+        # sample_format : 供給するサンプルフォーマット ("int16" / "int24" / "int32" / "float32")
+
+        self.samplerate = samplerate
+        self.channels = channels
+        self.paced = paced
+        self.loop = loop
+
+        get_sample_dtype(sample_format)
+        self.sample_format = sample_format
+
+        if isinstance(source, np.ndarray):
+            data = source
+            source_samplerate = samplerate
+        else:
+            data, source_samplerate = self._load_file(source)
+
+        if data.ndim == 1:
+            data = data[:, np.newaxis]
+
+        # 異なる場合のみ、サンプリング周波数/チャンネル数/型を変換
+        # (WAVファイルが16bit PCMで設定と一致する場合は、メモリマップのまま変換なしで供給する)
+        if source_samplerate != samplerate:
+            data = soxr.resample(self._to_float32(data), source_samplerate, samplerate)
+
+        if data.shape[1] != channels:
+            if channels == 1:
+                # モノラルへのダウンミックス
+                data = self._to_float32(data).mean(axis=1, keepdims=True)
+            elif data.shape[1] == 1:
+                data = np.repeat(data, channels, axis=1)
+            else:
+                raise ValueError(
+                    "cannot convert " + str(data.shape[1]) + " channels to " + str(channels) + " channels"
+                )
+
+        if sample_format != "int16":
+            # int16以外は正規化済float32で保持し、read()時に指定フォーマットへ量子化する
+            data = self._to_float32(data)
+        elif data.dtype != np.int16:
+            data = self._to_int16(data)
+
+        # 音声データ(int16 または 正規化済float32 / チャンネル間インターリーブ) 1次元配列
+        self.data = data.reshape(-1)
+        self.total_frames = len(self.data) // channels
+
+        # 供給位置 & 計測カウンタ
+        self.position = 0
+        self.frames_read = 0
+        self.start_time = None
+        self.active = True
+
+    @staticmethod
+    def _load_file(filename):
+        # WAVファイル(16bit/32bit整数PCM, 32bit浮動小数点)はメモリマップで読込み、
+        # その他の形式(FLAC等)はsoundfileでデコードして読込む
+        try:
+            return load_wav_memmap(filename)
+        except ValueError:
+            data, samplerate = sf.read(filename, dtype="int16", always_2d=True)
+            return data, samplerate
+
+    @staticmethod
+    def _to_float32(data):
+        if data.dtype == np.int16:
+            return data.astype(np.float32) / float((np.power(2, 16) / 2) - 1)
+        if data.dtype == np.int32:
+            return (data / float((np.power(2, 32) / 2) - 1)).astype(np.float32)
+        return data.astype(np.float32)
+
+    @staticmethod
+    def _to_int16(data):
+        data = AudioReplaySource._to_float32(data)
+        return np.round(np.clip(data, -1.0, 1.0) * float((np.power(2, 16) / 2) - 1)).astype(np.int16)
+
+    def read(self, num_frames, exception_on_overflow=True):
+        # ====================================================
+        # === 入力音声データ読出し関数 (Stream.read()互換) ===
+        # ====================================================
+        # num_frames                : 読出すフレーム数
+        # exception_on_overflow     : pyaudio.PyAudio.Stream.read()互換の引数 (未使用)
+
+        if self.start_time is None:
+            self.start_time = time.monotonic()
+
+        if (self.position >= self.total_frames) and not self.loop:
+            raise EOFError("replay source reached the end of data")
+
+        n = num_frames * self.channels
+        start = self.position * self.channels
+        block = self.data[start:start + n]
+
+        if len(block) < n:
+            if self.loop:
+                # 終端に到達した場合は先頭から繰返す
+                block = np.concatenate(
+                    [block, np.resize(self.data, n - len(block))])
+            else:
+                # 終端に到達した場合は不足分を0埋めする
+                block = np.concatenate(
+                    [block, np.zeros(n - len(block), dtype=self.data.dtype)])
+
+        self.position += num_frames
+        if self.loop:
+            self.position %= max(self.total_frames, 1)
+        self.frames_read += num_frames
+
+        # 実時間ペースの場合は、読出したデータの終端時刻まで待機する
+        if self.paced:
+            wait_time = self.start_time + (self.frames_read / self.samplerate) - time.monotonic()
+            if wait_time > 0:
+                time.sleep(wait_time)
+
+        if self.sample_format != "int16":
+            # block : 入力音声データ (sample_formatで量子化したbyte列)
+            return discrete_data_quantize(block, self.sample_format)
+
+        # block : 入力音声データ (int16 byte列)
+        return block.tobytes()
+
+    def get_realtime_factor(self, frames=None):
+        # ============================================
+        # === 実時間比 算出関数 (スループット計測) ===
+        # ============================================
+        # frames    : 処理(解析)したフレーム数 (Noneの場合は供給したフレーム数)
+        # (処理した音声データの時間長 / 経過時間 : "1"以上であれば実時間以上の速度で処理)
+        # (取得と解析が並列に動作する場合は、解析側で破棄したデータを含めないように、解析したフレーム数を指定する)
+
+        if self.start_time is None:
+            return 0.0
+
+        elapsed = time.monotonic() - self.start_time
+        if elapsed <= 0:
+            return 0.0
+
+        # realtime_factor : 実時間比
+        if frames is None:
+            frames = self.frames_read
+
+        return (frames / self.samplerate) / elapsed
+
+    # === pyaudio.PyAudio.Stream互換メソッド ===
+    def start_stream(self):
+        self.active = True
+
+    def stop_stream(self):
+        self.active = False
+
+    def is_active(self):
+        return self.active
+
+    def close(self):
+        self.active = False
+
+    def get_input_latency(self):
+        return 0.0
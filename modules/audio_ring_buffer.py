@@ -0,0 +1,146 @@
+import time
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    # ===================================================
+    # === 音声データ リングバッファクラス (Lock-free) ===
+    # ===================================================
+    # 書込み側(PyAudio callbackスレッド)が1つ、読出し側(解析ループ)が1つの
+    # Single-Producer / Single-Consumer構成を前提としたリングバッファ
+    # (書込み側はコピー開始前に書込み開始カウンタを、書込み完了後に総書込みデータ数を更新し(seqlock方式)、
+    #  読出し側はコピー前の総書込みデータ数とコピー後の書込み開始カウンタを比較して、
+    #  書込み途中のブロックによる上書きも検出するため、ロックを必要としない)
+
+    def __init__(self, frames, channels=1, dtype="int16"):
+        # frames    : リングバッファに保持するフレーム数 (1フレーム = 全チャンネル分の離散データ)
+        # channels  : チャンネル数 (1:モノラル / 2:ステレオ)
+        # dtype     : 保持する離散データの型 (例："int16" / 24bitの場合は3バイトの無構造型"V3")
+
+        self.channels = channels
+        self.dtype = np.dtype(dtype)
+
+        # リングバッファ本体(事前確保 / チャンネル間はインターリーブして保持)
+        self.size = frames * channels
+        self.buffer = np.zeros(self.size, dtype=self.dtype)
+
+        # 0埋め用の値 (無構造型"V3"にも整数0は代入できないため、同じ型の0値を使用する)
+        self.zero = np.zeros(1, dtype=self.dtype)
+
+        # 総書込みデータ数 (書込み側のみが書込み完了後に更新する)
+        self.write_count = 0
+
+        # 前回の読出し時点の総書込みデータ数 (読出し側のみが更新する)
+        self.read_count = 0
+
+        # 書込み開始カウンタ (書込み中のブロックの書込み完了後の総書込みデータ数 / 書込み側のみがコピー開始前に更新する)
+        self.write_start_count = 0
+
+        # 最新書込みブロックのタイムスタンプ (書込み側(stream_callback)が更新する)
+        # (ブロック先頭サンプルのADC時刻[s] (不明の場合はNone), フレーム数, 到着時刻[s]) ※time.monotonic()基準
+        self.block_time_info = None
+
+    def write(self, discrete_data):
+        # ==========================================
+        # === リングバッファへのデータ書込み関数 ===
+        # ==========================================
+        # discrete_data : 量子化により生成された離散データ (bytes or numpy.ndarray)
+
+        if isinstance(discrete_data, np.ndarray):
+            data = discrete_data.reshape(-1)
+        else:
+            data = np.frombuffer(discrete_data, self.dtype)
+
+        # リングバッファサイズを超えるデータは、末尾(最新)のsize分のみを書込む
+        skipped = max(len(data) - self.size, 0)
+        data = data[skipped:]
+
+        write_count = self.write_count + skipped
+        start = write_count % self.size
+        end = start + len(data)
+
+        # コピー開始前に書込み開始カウンタを更新 (読出し側が書込み途中の上書きを検出できるようにする)
+        self.write_start_count = write_count + len(data)
+
+        if end <= self.size:
+            self.buffer[start:end] = data
+        else:
+            # リングバッファ終端で折り返して書込み
+            first_len = self.size - start
+            self.buffer[start:] = data[:first_len]
+            self.buffer[:end - self.size] = data[first_len:]
+
+        # 書込み完了後に総書込みデータ数を更新 (読出し側への公開)
+        self.write_count = write_count + len(data)
+
+    def read_latest(self, frames, out=None):
+        # ================================================
+        # === リングバッファからの最新データ読出し関数 ===
+        # ================================================
+        # frames    : 読出すフレーム数 (最新のframesフレームを読出す)
+        # out       : 読出し先numpy.ndarray (Noneの場合は新規に確保)
+
+        n = frames * self.channels
+
+        if n > self.size:
+            raise ValueError(
+                "frames (" + str(frames) + ") must be less than or equal to "
+                "ring buffer frames (" + str(self.size // self.channels) + ")"
+            )
+
+        if out is None:
+            out = np.empty(n, dtype=self.dtype)
+
+        while True:
+            write_count = self.write_count
+
+            # 書込み済データ数がnに満たない場合は、不足分を0埋めする
+            available = min(n, write_count)
+            out[:n - available] = self.zero
+
+            end = write_count % self.size
+            start = end - available
+
+            if start >= 0:
+                out[n - available:] = self.buffer[start:end]
+            else:
+                # リングバッファ終端を跨ぐ場合は2回に分けてコピー
+                out[n - available:n - end] = self.buffer[start:]
+                out[n - end:] = self.buffer[:end]
+
+            # コピー中に読出し範囲が書込み側に上書きされていなければ確定
+            # (書込み途中のブロックも含めるため、書込み開始カウンタと比較する)
+            # (上書きされていた場合は、最新データで読出しをやり直す)
+            if self.write_start_count - write_count <= self.size - available:
+                break
+
+        self.read_count = write_count
+
+        # out           : 最新framesフレーム分の離散データ 1次元配列
+        # write_count   : 読出し時点の総書込みデータ数
+        return out, write_count
+
+    def wait_new_data(self, frames, timeout, poll_interval=0.001):
+        # =============================================
+        # === 新規データの書込み待機関数 (読出し側) ===
+        # =============================================
+        # frames        : 待機するフレーム数 (前回のread_latest()以降に書込まれたフレーム数)
+        # timeout       : 最大待機時間[s]
+        # poll_interval : 総書込みデータ数の確認間隔[s]
+        # (read_latest()は待機せずに最新データを返すため、取得ステージ専用スレッドで連続して読出す場合は、
+        #  本関数で新しいデータの到着を待ち、同じデータを繰り返し読出さないようにする)
+        # (書込み側(stream_callback)をブロックさせないように、通知ではなく総書込みデータ数を一定間隔で確認する)
+
+        n = frames * self.channels
+        deadline = time.monotonic() + timeout
+
+        arrived = True
+        while self.write_count - self.read_count < n:
+            if time.monotonic() >= deadline:
+                arrived = False
+                break
+            time.sleep(poll_interval)
+
+        # arrived : 新しいデータがframesフレーム分書込まれた場合はTrue (タイムアウトの場合はFalse)
+        return arrived
@@ -0,0 +1,201 @@
+import pyaudio
+
+from .audio_stream import audio_stream_open
+from .get_mic_index import gen_device_table, get_mic_index
+from .stream_resampler import ResampledInputStream
+
+
+class AudioSession:
+    # ==================================================
+    # === PortAudioインスタンス 共有セッションクラス ===
+    # ==================================================
+    # 1つのpyaudio.PyAudio(PortAudioインスタンス)をプロセス内で保持し続け、
+    # デバイス一覧の取得 / ストリームの生成・再生成(設定変更)で共有する
+    # (pyaudio.PyAudio()の生成は、PortAudioの初期化と全Host APIのデバイス走査を伴うため、
+    #  ストリーム毎/設定変更毎に生成/終了しない)
+    # pyaudio.PyAudioと同じopen()/terminate()を持つため、audio_stream_start()/audio_stream_stop()や
+    # MultiMicCaptureのpa引数にそのまま渡せる
+
+    def __init__(self, pa=None):
+        # pa : 使用するpyaudio.PyAudioクラスオブジェクト
+        #      (Noneの場合は新規に生成 / SyntheticPyAudio等の互換オブジェクトも指定可能)
+
+        self.owns_pa = pa is None
+        if pa is None:
+            pa = pyaudio.PyAudio()
+        self.pa = pa
+
+        # デバイス一覧キャッシュ (初回参照時に生成 / refresh()にて更新)
+        self.device_table = None
+
+        # 生成済ストリーム → pa.open()の引数 (再生成時に引き継ぐ)
+        self.streams = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_device_table(self):
+        # =========================================================
+        # === デバイス一覧取得関数 (キャッシュ済の場合は再利用) ===
+        # =========================================================
+        if self.device_table is None:
+            self.device_table = gen_device_table(self.pa)
+
+        # device_table : Host API情報(dict)のリスト (gen_device_table()の戻り値)
+        return self.device_table
+
+    def get_mic_index(self):
+        # ===================================================
+        # === Microphone Index取得関数 (キャッシュ使用版) ===
+        # ===================================================
+
+        # mic_list : microphone index list
+        return get_mic_index(device_table=self.get_device_table())
+
+    def get_device_samplerate(self, index):
+        # =======================================================
+        # === デバイスのネイティブサンプリング周波数 取得関数 ===
+        # =======================================================
+        # index : device index
+        # (デバイス一覧キャッシュのデフォルトサンプリング周波数(defaultSampleRate)を使用する)
+
+        for host_api_info in self.get_device_table():
+            for dev_info in host_api_info["devices"]:
+                if dev_info["index"] == index:
+                    # device_samplerate : デバイスのデフォルトサンプリング周波数[Hz]
+                    return int(dev_info["defaultSampleRate"])
+
+        raise ValueError("device index " + str(index) + " not found")
+
+    def refresh(self):
+        # ======================================
+        # === デバイス一覧キャッシュ更新関数 ===
+        # ======================================
+        # (PortAudioは初期化時点のデバイスしか認識しないため、接続/切断されたデバイスを反映するには
+        #  PortAudioの再初期化が必要となる / ストリームが全て閉じている場合のみ実行可能)
+
+        if self.streams:
+            raise RuntimeError("cannot refresh devices while streams are open")
+
+        if self.owns_pa:
+            self.pa.terminate()
+            self.pa = pyaudio.PyAudio()
+
+        self.device_table = gen_device_table(self.pa)
+
+        # device_table : 更新後のデバイス一覧
+        return self.device_table
+
+    def open(self, **kwargs):
+        # =======================================================
+        # === ストリーム生成関数 (pyaudio.PyAudio.open()互換) ===
+        # =======================================================
+        # kwargs : pyaudio.PyAudio.open()の引数 (rate, channels, format, input, frames_per_buffer 等)
+
+        stream = self.pa.open(**kwargs)
+        self.streams[stream] = kwargs
+
+        # stream : 生成したpyaudio.PyAudio.Streamオブジェクト
+        return stream
+
+    def open_stream(
+        self,
+        index,
+        mic_mode,
+        samplerate,
+        frames_per_buffer,
+        ring_buffer=None,
+        sample_format="int16",
+        overflow_monitor=None,
+        device_samplerate=None
+    ):
+        # ============================================
+        # === Microphone入力音声ストリーム生成関数 ===
+        # ============================================
+        # index                 : 使用するマイクのdevice index
+        # mic_mode              : マイクモード (1:モノラル / 2:ステレオ)
+        # samplerate            : サンプリング周波数[sampling data count/s)]
+        # frames_per_buffer     : 入力音声ストリームバッファあたりのサンプリングデータ数
+        # ring_buffer           : Callbackモード時の書込み先AudioRingBuffer (NoneはBlockingモード)
+        # sample_format         : サンプルフォーマット ("int16" / "int24" / "int32" / "float32")
+        # overflow_monitor      : Callbackモード時の入力オーバーフロー検出に使用するInputOverflowMonitor
+        # device_samplerate     : デバイスで取得するサンプリング周波数[Hz] (Noneの場合はsamplerateで取得)
+
+        # stream : 生成したpyaudio.PyAudio.Streamオブジェクト
+        return audio_stream_open(
+            self, index, mic_mode, samplerate, frames_per_buffer, ring_buffer, sample_format, overflow_monitor,
+            device_samplerate)
+
+    def reopen_stream(self, stream, **kwargs):
+        # =======================================================
+        # === ストリーム再生成関数 (設定変更 / PortAudio維持) ===
+        # =======================================================
+        # stream    : 再生成するストリーム (本セッションで生成したもの)
+        # kwargs    : 変更するpyaudio.PyAudio.open()の引数 (例：rate=16000, frames_per_buffer=512)
+        #             (指定しない引数は、元のストリームの設定を引き継ぐ)
+        # (サンプリング周波数変換ストリーム(ResampledInputStream)の場合は、kwargsをデバイスのストリームの
+        #  引数として再生成し、解析用のサンプリング周波数/サンプルフォーマットは元の設定を引き継いで変換し直す)
+
+        if isinstance(stream, ResampledInputStream):
+            if "format" in kwargs:
+                raise ValueError("cannot change the sample format of a resampled stream")
+
+            device_stream = self.reopen_stream(stream.stream, **kwargs)
+            device_kwargs = self.streams[device_stream]
+
+            # new_stream : 再生成したResampledInputStream
+            return ResampledInputStream(
+                device_stream, device_kwargs["rate"], stream.samplerate, device_kwargs["channels"],
+                stream.sample_format)
+
+        open_kwargs = dict(self.streams[stream])
+        open_kwargs.update(kwargs)
+
+        # 新しい設定がデバイスで使用可能かを、元のストリームを閉じる前に確認する
+        # (使用不可の場合はValueErrorとなり、元のストリームはそのまま使用できる)
+        if open_kwargs.get("input", False):
+            self.pa.is_format_supported(
+                open_kwargs["rate"],
+                input_device=open_kwargs.get("input_device_index"),
+                input_channels=open_kwargs["channels"],
+                input_format=open_kwargs["format"]
+            )
+
+        self.close_stream(stream)
+
+        # new_stream : 再生成したpyaudio.PyAudio.Streamオブジェクト
+        return self.open(**open_kwargs)
+
+    def close_stream(self, stream):
+        # =================================
+        # === ストリーム停止 & 終了関数 ===
+        # =================================
+        # stream : 停止するストリーム
+
+        # サンプリング周波数変換ストリームの場合は、本セッションに登録したデバイスのストリームを停止する
+        if isinstance(stream, ResampledInputStream):
+            self.close_stream(stream.stream)
+            return
+
+        if not stream.is_stopped():
+            stream.stop_stream()
+        stream.close()
+        self.streams.pop(stream, None)
+
+    def close(self):
+        # =========================================================
+        # === セッション終了関数 (全ストリーム & PortAudio終了) ===
+        # =========================================================
+        # (pyaudio.PyAudio.terminate()は、閉じていない全ストリームを閉じてからPortAudioを終了する)
+        self.streams = {}
+
+        if self.pa is not None:
+            self.pa.terminate()
+            self.pa = None
+
+    def terminate(self):
+        # pyaudio.PyAudio.terminate()互換 (audio_stream_stop()から呼び出される)
+        self.close()
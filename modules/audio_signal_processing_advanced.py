@@ -1,5 +1,8 @@
 import librosa
-import scipy
+import numpy as np
+
+from .analysis_plan import get_window_data
+from .audio_signal_processing_basic import get_float_dtype
 
 
 def overlap(discrete_data, samplerate, stft_frame_size, overlap_rate):
@@ -31,23 +34,25 @@ def overlap(discrete_data, samplerate, stft_frame_size, overlap_rate):
     # オーバーラップ処理における切り出しフレーム数
     N_ave = int((Ts - overlap_time) / non_overlap_time)
 
-    # オーバーラップ処理後 離散データ 1次元配列の初期化
-    data_overlaped = []
+    # 各切り出しフレームの切り出し位置 ps[sampling data count]
+    ps = (x_ol * np.arange(N_ave)).astype(int)
 
-    # forループでデータを抽出
-    for i in range(N_ave):
-        # 切り出し位置をループ毎に更新
-        ps = int(x_ol * i)
+    discrete_data = np.asarray(discrete_data)
 
-        # 切り出し位置psから入力音声ストリームバッファデータ数分抽出して配列に追加
-        # (discrete_data配列に対して、開始要素: ps / 終了要素: ps+stft_frame_size / スキップ間隔: 1 でスライスしてdata_overlaped.append)
-        data_overlaped.append(discrete_data[ps:ps + stft_frame_size:1])
+    if (x_ol >= 1) and (x_ol == int(x_ol)):
+        # ずらし幅が整数の場合、(切り出しフレーム数, STFTフレーム長)のストライドviewとして切り出す
+        # (全ての切り出し位置の1サンプル毎のviewから、ずらし幅間隔で抽出するため、データコピーは発生しない)
+        data_overlaped = np.lib.stride_tricks.sliding_window_view(
+            discrete_data, stft_frame_size)[::int(x_ol)][:N_ave]
+    else:
+        # ずらし幅が整数でない場合は、切り出し位置のインデックス配列で一括して切り出す
+        data_overlaped = discrete_data[ps[:, np.newaxis] + np.arange(stft_frame_size)]
 
-        # 切り出したデータの最終時刻[s]
-        # (= (切り出し位置 + STFTフレーム長) / (サンプリングデータ数 / 秒) )
-        final_time = (ps + stft_frame_size) / samplerate
+    # 切り出したデータの最終時刻[s]
+    # (= (最終フレームの切り出し位置 + STFTフレーム長) / (サンプリングデータ数 / 秒) )
+    final_time = (ps[-1] + stft_frame_size) / samplerate
 
-    # data_overlaped    : オーバーラップ処理後 離散データ 1次元配列
+    # data_overlaped    : オーバーラップ処理後 離散データ 2次元配列(切り出しフレーム数, STFTフレーム長)
     # N_ave             : オーバーラップ処理における切り出しフレーム数
     # final_time        : オーバーラップ処理後 離散データの最終時刻[s]
     return data_overlaped, N_ave, final_time
@@ -57,31 +62,19 @@ def window(data_overlaped, stft_frame_size, N_ave, window_func):
     # =============================================
     # === Hanning窓関数 (振幅補正係数計算付き) ===
     # =============================================
-    # data_overlaped    : オーバーラップ処理後 離散データ 1次元配列
+    # data_overlaped    : オーバーラップ処理後 離散データ 2次元配列(切り出しフレーム数, STFTフレーム長)
     # stft_frame_size   : STFT(短時間フーリエ変換)を行う離散データ数(=STFTフレーム長)
     # N_ave             : オーバーラップ処理における切り出しフレーム数
 
-    # 窓関数 1次元配列の作成
-    if window_func == "hann":
-        # Hanning窓
-        window = scipy.signal.hann(stft_frame_size)
-    else:
-        # 矩形窓
-        window = scipy.signal.boxcar(stft_frame_size)
-
-    # 振幅補正係数(Amplitude Correction Factor)
-    acf = 1 / (sum(window) / stft_frame_size)
-
-    # 窓関数適用後 離散データ 1次元配列の初期化
-    data_applied_window = [0 for _ in range(len(data_overlaped))]
-
-    # オーバーラップ処理における切り出しフレームの個々に窓関数を適用
-    for i in range(N_ave):
+    # 窓関数 1次元配列 & 振幅補正係数(Amplitude Correction Factor)の取得
+    # (STFTフレーム長/窓関数/信号処理の浮動小数点型毎に1度だけ生成し、以降はキャッシュから取得する)
+    window, acf = get_window_data(stft_frame_size, window_func, get_float_dtype())
 
-        # 切り出しフレーム(numpy.ndarray)と窓関数(numpy.ndarray)を要素毎に乗算
-        data_applied_window[i] = data_overlaped[i] * window
+    # 全切り出しフレームに窓関数を一括で適用
+    # (切り出しフレーム(2次元配列)と窓関数(1次元配列)を、フレーム毎にブロードキャストして要素毎に乗算)
+    data_applied_window = np.asarray(data_overlaped)[:N_ave] * window
 
-    # data_applied_window   : 窓関数適用後 離散データ 1次元配列
+    # data_applied_window   : 窓関数適用後 離散データ 2次元配列(切り出しフレーム数, STFTフレーム長)
     # acf                   : 振幅補正係数(Amplitude Correction Factor)
     return data_applied_window, acf
 
@@ -97,11 +90,13 @@ def gen_mel_filter_bank(discrete_data, samplerate, mel_filter_number):
     mel_filter_bank = librosa.filters.mel(
         sr=samplerate,
         n_fft=len(discrete_data) - 1,
-        n_mels=mel_filter_number
+        n_mels=mel_filter_number,
+        dtype=get_float_dtype()
     )
     # sr : sampling rate of the incoming signal
     # n_fft : number of FFT components
     # n_mels : number of Mel bands to generate
+    # dtype : data type of the output basis (信号処理の浮動小数点型に合わせる)
 
     # mel_filter_bank : メルフィルタバンク伝達関数(周波数特性) 1次元配列
     return mel_filter_bank
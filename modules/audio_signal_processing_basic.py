@@ -1,5 +1,47 @@
 import numpy as np
 
+# 信号処理(正規化/窓関数/FFT/dB変換/メル・ケプストラム解析)で使用する浮動小数点型
+# (パイプライン全体の設定値 / set_float_dtype()にて変更する)
+FLOAT_DTYPE = np.float64
+
+
+# 入力音声ストリームのサンプルフォーマット毎のnumpy型 / 量子化ビット数
+# ("int24"はnumpyに対応する整数型が無いため、3バイトの無構造型として扱う)
+SAMPLE_DTYPES = {"int16": "<i2", "int24": "V3", "int32": "<i4", "float32": "<f4"}
+SAMPLE_BITS = {"int16": 16, "int24": 24, "int32": 32, "float32": 32}
+
+# 聴感補正(A特性カーブ)の極周波数[Hz]の2乗 (a_weighting()での呼出し毎のnp.power()の算出を省く)
+A_WEIGHTING_F1_SQ = 20.6 ** 2
+A_WEIGHTING_F2_SQ = 107.7 ** 2
+A_WEIGHTING_F3_SQ = 737.9 ** 2
+A_WEIGHTING_F4_SQ = 12194.0 ** 2
+
+
+def set_float_dtype(dtype):
+    # =======================================
+    # === 信号処理 浮動小数点型の設定関数 ===
+    # =======================================
+    # dtype : 信号処理で使用する浮動小数点型 (np.float32 / np.float64)
+    #         (16bit量子化データの解析ではfloat32で精度は十分であり、
+    #          float64に比べてメモリ帯域およびFFT演算量を削減できる)
+
+    global FLOAT_DTYPE
+
+    dtype = np.dtype(dtype)
+    if dtype not in (np.dtype(np.float32), np.dtype(np.float64)):
+        raise ValueError("dtype must be float32 or float64, not " + str(dtype))
+
+    FLOAT_DTYPE = dtype.type
+
+
+def get_float_dtype():
+    # =======================================
+    # === 信号処理 浮動小数点型の取得関数 ===
+    # =======================================
+
+    # FLOAT_DTYPE : 信号処理で使用する浮動小数点型
+    return FLOAT_DTYPE
+
 
 def db(x, dbref):
     # ================================
@@ -10,7 +52,13 @@ def db(x, dbref):
 
     # dbref[pa]を基準としたx[pa]の音圧レベル[dB]の算出
     with np.errstate(divide='ignore'):
-        y = 20 * np.log10(x / dbref)
+        if np.iscomplexobj(x):
+            # 複素数の場合は、log10(z) = (log|z| + j * arg(z)) / log(10) として実数演算に分解して算出
+            # (numpyの複素数対数は、単精度複素数(complex64)で特に低速なため)
+            z = x / dbref
+            y = float(20 / np.log(10)) * (np.log(np.abs(z)) + 1j * np.angle(z))
+        else:
+            y = 20 * np.log10(x / dbref)
 
     # y : 音圧レベル変換値[dB]
     return y
@@ -24,45 +72,146 @@ def liner(x, dbref):
     # dbref : 基準値[pa]
 
     # dbref[pa]を基準としたx[dB]の音圧レベル[pa]の算出
+    # (10 ** (x / 20) = exp(x * log(10) / 20) として算出し、単精度複素数でも低速なべき乗演算を避ける)
     with np.errstate(divide='ignore'):
-        y = dbref * 10 ** (x / 20)
+        y = dbref * np.exp(x * float(np.log(10) / 20))
 
     # y : 音圧レベル変換値[pa]
     return y
 
 
-def discrete_data_normalize(discrete_data, dtype):
+def get_sample_dtype(sample_format):
+    # ==============================================
+    # === サンプルフォーマットのnumpy型 取得関数 ===
+    # ==============================================
+    # sample_format : サンプルフォーマット ("int16" / "int24" / "int32" / "float32")
+
+    if sample_format not in SAMPLE_DTYPES:
+        raise ValueError(
+            "sample_format must be one of " + str(tuple(SAMPLE_DTYPES)) + ", not '" + str(sample_format) + "'"
+        )
+
+    # sample_dtype : 1サンプル分のnumpy型 (24bitの場合は3バイトの無構造型"V3")
+    return np.dtype(SAMPLE_DTYPES[sample_format])
+
+
+def unpack_int24(discrete_data):
+    # =================================================
+    # === 24bit量子化 離散データの32bit整数展開関数 ===
+    # =================================================
+    # discrete_data : 24bit量子化 離散データ (リトルエンディアン3バイト/サンプル)
+
+    data_uint8 = np.frombuffer(discrete_data, np.uint8).reshape(-1, 3)
+
+    # 各サンプルの3バイトを32bit整数の上位3バイトに配置してint32として解釈し、
+    # 算術右シフトで符号拡張する (サンプル毎のPythonループを使わずに一括変換)
+    data_int32 = np.zeros((len(data_uint8), 4), dtype=np.uint8)
+    data_int32[:, 1:] = data_uint8
+    data_int32 = data_int32.view("<i4").reshape(-1) >> 8
+
+    # data_int32 : 24bit量子化値(-8388608～+8388607) 32bit整数 1次元配列
+    return data_int32
+
+
+def discrete_data_normalize(discrete_data, dtype, out=None):
     # ====================================================
     # === 量子化により生成された離散データの正規化関数 ===
     # ====================================================
     # discrete_data     : 量子化により生成された離散データ 1次元配列
-    # dtype             : 変換する1次元配列の型 (例："int16")
+    # dtype             : 離散データのサンプルフォーマット ("int16" / "int24" / "int32" / "float32")
+    # out               : 正規化結果の書込み先numpy.ndarray
+    #                     (Noneの場合は新規に確保 / 指定時は中間配列を生成せずに直接書込む)
+
+    get_sample_dtype(dtype)
+
+    if dtype == "float32":
+        # 浮動小数点フォーマットは正規化済(-1.0～+1.0)のため、除算せずにそのまま使用する
+        # (FLOAT_DTYPEがfloat32の場合は、入力バッファのview(データコピーなし/読取り専用)を返す)
+        discrete_data_ndarray = np.frombuffer(discrete_data, "<f4")
+
+        if out is not None:
+            out[...] = discrete_data_ndarray
+            return out
+
+        # data_normalized : 正規化済 離散データ 1次元配列
+        return discrete_data_ndarray.astype(FLOAT_DTYPE, copy=False)
 
     # 離散データ 1次元配列を、dtype引数で指定された整数型のnumpy.ndarrayに変換
-    discrete_data_ndarray = np.frombuffer(discrete_data, dtype)
+    if dtype == "int24":
+        discrete_data_ndarray = unpack_int24(discrete_data)
+    else:
+        discrete_data_ndarray = np.frombuffer(discrete_data, get_sample_dtype(dtype))
 
     # === 離散データの正規化 ===
-    # discrete_data_ndarrayは、振幅成分が16bit量子化されたデータであり、かつ正負符号を持ち、
-    # ±32767(=±((2^16 / 2) - 1))の範囲にデータが入る事から、
-    # dataを((2^16 / 2) - 1)で除算する事で、振幅成分を"-1.0～+1.0"の範囲に正規化する
-    data_normalized = discrete_data_ndarray / float((np.power(2, 16) / 2) - 1)
+    # discrete_data_ndarrayは、振幅成分がNbit量子化されたデータであり、かつ正負符号を持ち、
+    # ±((2^N / 2) - 1)の範囲にデータが入る事から(16bitの場合は±32767)、
+    # dataを((2^N / 2) - 1)で除算する事で、振幅成分を"-1.0～+1.0"の範囲に正規化する
+    # (out未指定の場合は、FLOAT_DTYPEで指定された浮動小数点型で算出する)
+    full_scale = float((np.power(2, SAMPLE_BITS[dtype]) / 2) - 1)
+    if out is None:
+        data_normalized = np.divide(discrete_data_ndarray, full_scale, dtype=FLOAT_DTYPE)
+    else:
+        data_normalized = np.divide(discrete_data_ndarray, full_scale, out=out)
 
     # data_normalized : 正規化済 離散データ 1次元配列
     return data_normalized
 
 
+def discrete_data_quantize(data_normalized, dtype):
+    # =======================================================
+    # === 正規化済データの量子化関数 (正規化関数の逆変換) ===
+    # =======================================================
+    # data_normalized   : 正規化済(-1.0～+1.0) 離散データ
+    # dtype             : 量子化するサンプルフォーマット ("int16" / "int24" / "int32" / "float32")
+
+    get_sample_dtype(dtype)
+    data_normalized = np.clip(data_normalized, -1.0, 1.0)
+
+    if dtype == "float32":
+        discrete_data = data_normalized.astype("<f4").tobytes()
+    elif dtype == "int24":
+        # 32bit整数に量子化した上で、リトルエンディアンの下位3バイトを抽出して詰める
+        full_scale = float((np.power(2, 24) / 2) - 1)
+        data_int32 = np.round(data_normalized * full_scale).astype("<i4")
+        discrete_data = data_int32.view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+    else:
+        full_scale = float((np.power(2, SAMPLE_BITS[dtype]) / 2) - 1)
+        discrete_data = np.round(data_normalized * full_scale).astype(get_sample_dtype(dtype)).tobytes()
+
+    # discrete_data : 量子化済 離散データ (bytes)
+    return discrete_data
+
+
+def deinterleave_channels(discrete_data, channels):
+    # ==================================================================
+    # === マルチチャンネル離散データのチャンネル分離関数(コピーなし) ===
+    # ==================================================================
+    # discrete_data     : チャンネル間がインターリーブされた離散データ 1次元配列
+    #                     (例：ステレオの場合 [L0, R0, L1, R1, ...])
+    # channels          : チャンネル数
+
+    # (フレーム数, チャンネル数)の2次元配列として解釈した上で転置する事で、
+    # 各行が1チャンネル分のデータを指すストライド付きview(データコピーなし)を生成する
+    discrete_data = np.asarray(discrete_data)
+    channel_data = discrete_data.reshape(-1, channels).T
+
+    # channel_data : チャンネル毎の離散データ 2次元配列 (チャンネル数, フレーム数) ※入力のview
+    return channel_data
+
+
 def gen_time_axis_data(discrete_data, samplerate):
     # ========================================================
     # === 時間領域波形データに対応した時間軸データ生成関数 ===
     # ========================================================
     # discrete_data     : 時間領域波形 離散データ 1次元配列
+    #                     (2次元配列(チャンネル数, フレーム数)の場合は、フレーム数分の時間軸データを生成)
     # samplerate        : サンプリング周波数[sampling data count/s)]
 
     # サンプリング周期[s]を算出
     dt = 1 / samplerate
 
     # 時間領域波形データに対応した時間軸データ 1次元配列の生成
-    time_axis_data = np.arange(0, len(discrete_data) * dt, dt)
+    time_axis_data = np.arange(0, np.shape(discrete_data)[-1] * dt, dt)
 
     # time_axis_data : 時間領域波形データに対応した時間軸データ 1次元配列
     return time_axis_data
@@ -128,17 +277,21 @@ def a_weighting(f):
     # === 聴感補正関数 (A特性カーブ) ===
     # ==================================
     # f : 周波数特性 周波数軸データ
+    # (0[Hz]の要素は1e-6[Hz]として算出する / 引数の周波数軸データは変更しない)
 
+    f = np.asarray(f)
     if f[0] == 0:
+        f = f.copy()
         f[0] = 1e-6
-    else:
-        pass
 
-    ra = (np.power(12194, 2) * np.power(f, 4)) / \
-         ((np.power(f, 2) + np.power(20.6, 2)) *
-          np.sqrt((np.power(f, 2) + np.power(107.7, 2)) *
-                  (np.power(f, 2) + np.power(737.9, 2))) *
-          (np.power(f, 2) + np.power(12194, 2)))
+    # 周波数の2乗を1度だけ算出し、各項で共有する
+    f2 = f * f
+
+    ra = (A_WEIGHTING_F4_SQ * (f2 * f2)) / \
+         ((f2 + A_WEIGHTING_F1_SQ) *
+          np.sqrt((f2 + A_WEIGHTING_F2_SQ) *
+                  (f2 + A_WEIGHTING_F3_SQ)) *
+          (f2 + A_WEIGHTING_F4_SQ))
 
     a = 20 * np.log10(ra) + 2.00
 
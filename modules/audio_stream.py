@@ -1,7 +1,31 @@
+import time
+
 import pyaudio
 
+from .audio_signal_processing_basic import discrete_data_quantize
+from .stream_resampler import ResampledInputStream, StreamResampler
+
+# サンプルフォーマット → PortAudioのサンプルフォーマット定数
+# (24bit/32bit/浮動小数点はデバイス/ドライバ側での16bitへの変換を避け、ダイナミックレンジを維持する)
+SAMPLE_FORMATS = {
+    "int16": pyaudio.paInt16,
+    "int24": pyaudio.paInt24,
+    "int32": pyaudio.paInt32,
+    "float32": pyaudio.paFloat32,
+}
+
 
-def audio_stream_start(index, mic_mode, samplerate, frames_per_buffer):
+def audio_stream_start(
+    index,
+    mic_mode,
+    samplerate,
+    frames_per_buffer,
+    ring_buffer=None,
+    pa=None,
+    sample_format="int16",
+    overflow_monitor=None,
+    device_samplerate=None
+):
     # ================================================
     # === Microphone入力音声ストリーム取得開始関数 ===
     # ================================================
@@ -9,29 +33,156 @@ def audio_stream_start(index, mic_mode, samplerate, frames_per_buffer):
     # mic_mode              : マイクモード (1:モノラル / 2:ステレオ)
     # samplerate            : サンプリング周波数[sampling data count/s)]
     # frames_per_buffer     : 入力音声ストリームバッファあたりのサンプリングデータ数
+    # ring_buffer           : Callbackモード時の書込み先AudioRingBuffer
+    #                         (Noneの場合はBlockingモード(stream.read()による取得)とする)
+    # pa                    : 使用するpyaudio.PyAudioクラスオブジェクト
+    #                         (Noneの場合は新規に生成 / SyntheticPyAudio等の互換オブジェクトも指定可能)
+    # sample_format         : サンプルフォーマット ("int16" / "int24" / "int32" / "float32")
+    # overflow_monitor      : Callbackモード時の入力オーバーフロー検出に使用するInputOverflowMonitor (Noneは検出なし)
+    # device_samplerate     : デバイスで取得するサンプリング周波数[Hz] (Noneの場合はsamplerateで取得)
+    #                         (samplerateと異なる場合は、取得したデータをsamplerateへストリーミング変換して供給する)
 
-    pa = pyaudio.PyAudio()
+    if pa is None:
+        pa = pyaudio.PyAudio()
     print("pa = ", pa)
     print("type(pa) = ", type(pa))
 
+    stream = audio_stream_open(
+        pa, index, mic_mode, samplerate, frames_per_buffer, ring_buffer, sample_format, overflow_monitor,
+        device_samplerate)
+
+    # pa        : 生成したpyaudio.PyAudioクラスオブジェクト
+    #             (pyaudio.PyAudio object)
+    # stream    : 生成したpyaudio.PyAudio.Streamオブジェクト
+    #             (pyaudio.PyAudio.Stream object)
+    return pa, stream
+
+
+def audio_stream_open(
+    pa,
+    index,
+    mic_mode,
+    samplerate,
+    frames_per_buffer,
+    ring_buffer=None,
+    sample_format="int16",
+    overflow_monitor=None,
+    device_samplerate=None
+):
+    # ============================================================
+    # === Microphone入力音声ストリーム生成関数 (PyAudio共有版) ===
+    # ============================================================
+    # pa                    : 生成済のpyaudio.PyAudioクラスオブジェクト
+    #                         (複数ストリームで1つのPortAudioインスタンスを共有する)
+    # index                 : 使用するマイクのdevice index
+    # mic_mode              : マイクモード (1:モノラル / 2:ステレオ)
+    # samplerate            : サンプリング周波数[sampling data count/s)]
+    # frames_per_buffer     : 入力音声ストリームバッファあたりのサンプリングデータ数
+    # ring_buffer           : Callbackモード時の書込み先AudioRingBuffer
+    #                         (Noneの場合はBlockingモード(stream.read()による取得)とする)
+    # sample_format         : サンプルフォーマット ("int16" / "int24" / "int32" / "float32")
+    # overflow_monitor      : Callbackモード時の入力オーバーフロー検出に使用するInputOverflowMonitor (Noneは検出なし)
+    # device_samplerate     : デバイスで取得するサンプリング周波数[Hz] (Noneの場合はsamplerateで取得)
+    #                         (samplerateと異なる場合は、取得したデータをsamplerateへストリーミング変換して供給する)
+
+    if sample_format not in SAMPLE_FORMATS:
+        raise ValueError(
+            "sample_format must be one of " + str(tuple(SAMPLE_FORMATS)) + ", not '" + str(sample_format) + "'"
+        )
+
+    # デバイスのサンプリング周波数が解析用と異なる場合は、ストリーミングリサンプラで変換する
+    # (デバイスバッファは、解析用のframes_per_bufferと同じ時間長となるフレーム数とする)
+    if (device_samplerate is None) or (device_samplerate == samplerate):
+        device_samplerate = samplerate
+        resampler = None
+    else:
+        resampler = StreamResampler(device_samplerate, samplerate, mic_mode, sample_format)
+    device_frames_per_buffer = round(frames_per_buffer * device_samplerate / samplerate)
+
+    if ring_buffer is None:
+        stream_callback = None
+    else:
+        stream_callback = gen_ring_buffer_stream_callback(ring_buffer, overflow_monitor, resampler)
+
     stream = pa.open(
-        format=pyaudio.paInt16,
+        format=SAMPLE_FORMATS[sample_format],
         # pyaudio.paInt16 = 16bit量子化モード (音声時間領域波形の振幅を-32767～+32767に量子化)
+        # pyaudio.paInt24 / paInt32 = 24bit / 32bit量子化モード
+        # pyaudio.paFloat32 = 32bit浮動小数点モード (振幅を-1.0～+1.0で取得)
         channels=mic_mode,
-        rate=samplerate,
+        rate=device_samplerate,
         input=True,
         input_device_index=index,
-        frames_per_buffer=frames_per_buffer
+        frames_per_buffer=device_frames_per_buffer,
+        stream_callback=stream_callback
     )
+
+    # Blockingモードでサンプリング周波数変換する場合は、read()で変換済データを返すストリームとする
+    # (Callbackモードの場合は、stream_callback内で変換してからリングバッファに書込む)
+    if (resampler is not None) and (ring_buffer is None):
+        stream = ResampledInputStream(stream, device_samplerate, samplerate, mic_mode, sample_format)
     print("stream = ", stream)
     print("type(stream) = ", type(stream))
     print("")
 
-    # pa        : 生成したpyaudio.PyAudioクラスオブジェクト
-    #             (pyaudio.PyAudio object)
     # stream    : 生成したpyaudio.PyAudio.Streamオブジェクト
     #             (pyaudio.PyAudio.Stream object)
-    return pa, stream
+    return stream
+
+
+def gen_ring_buffer_stream_callback(ring_buffer, overflow_monitor=None, resampler=None):
+    # ======================================================
+    # === リングバッファ書込み用 stream_callback生成関数 ===
+    # ======================================================
+    # ring_buffer       : 入力音声データの書込み先AudioRingBuffer
+    # overflow_monitor  : 入力オーバーフロー検出に使用するInputOverflowMonitor (Noneは検出なし)
+    # resampler         : デバイス → 解析用のサンプリング周波数変換に使用するStreamResampler (Noneは変換なし)
+
+    def stream_callback(in_data, frame_count, time_info, status):
+        # PyAudioの別スレッドから入力音声ストリームバッファ毎に呼び出され、
+        # 入力音声データを事前確保済のリングバッファにコピーする
+        # (解析/描画処理の遅延に関わらず、デバイスバッファは常に読出される)
+        arrival_time = time.monotonic()
+
+        # デバイスのサンプリング周波数で到着したデータを、解析用のサンプリング周波数に変換する
+        # (以降のフレーム数は、解析用サンプリング周波数でのフレーム数とする)
+        # (ストリーミング変換の出力フレーム数はブロック毎に異なり、初回は変換フィルタの遅延分だけ少ないため、
+        #  リングバッファへ書込むフレーム数は変換後の実際のフレーム数とし、ADC時刻の連続性判定には
+        #  デバイスブロックの時間長を解析用サンプリング周波数で換算したフレーム数を使用する)
+        if resampler is not None:
+            block_frames = frame_count * resampler.out_rate / resampler.in_rate
+            resampled = resampler.process(in_data)
+            frame_count = len(resampled)
+            in_data = discrete_data_quantize(resampled.reshape(-1), resampler.sample_format)
+        else:
+            block_frames = frame_count
+
+        # 入力オーバーフローを検出し、欠落フレーム数分の無音をリングバッファに挿入する
+        # (欠落区間の前後が詰めて連結されないように、波形上で欠落区間を無音として表示する)
+        if overflow_monitor is not None:
+            dropped_frames = overflow_monitor.check_callback(
+                frame_count, time_info, status, arrival_time, block_frames)
+            if (dropped_frames > 0) and overflow_monitor.fill_gaps:
+                ring_buffer.write(overflow_monitor.gen_silence(dropped_frames, ring_buffer.dtype.itemsize))
+
+        ring_buffer.write(in_data)
+
+        # time_info(PortAudioのストリーム時刻基準)のADC時刻を、到着時刻との差分でmonotonic基準に換算し、
+        # 最新ブロックのタイムスタンプとしてリングバッファに保持する (レイテンシ計測用)
+        # (ADC時刻を提供しないHost APIでは"0"となるため、その場合はNoneとする)
+        adc_time = time_info.get("input_buffer_adc_time", 0)
+        current_time = time_info.get("current_time", 0)
+        if (adc_time > 0) and (current_time > 0):
+            adc_time_first = arrival_time - (current_time - adc_time)
+        else:
+            adc_time_first = None
+        ring_buffer.block_time_info = (adc_time_first, frame_count, arrival_time)
+
+        # 入力専用ストリームのため、出力データはNoneとする
+        return (None, pyaudio.paContinue)
+
+    # stream_callback : pyaudio.PyAudio.open()に渡すstream_callback関数
+    return stream_callback
 
 
 def audio_stream_stop(pa, stream):
@@ -48,20 +199,45 @@ def audio_stream_stop(pa, stream):
     stream.close()
 
     # 生成したpyaudio.PyAudioクラスオブジェクトを削除
-    pa.terminate()
+    # (paがNoneの場合(AudioReplaySource等のPyAudio以外の入力ソース)は不要)
+    if pa is not None:
+        pa.terminate()
 
 
-def gen_discrete_data_from_audio_stream(stream, frames_per_buffer):
+def gen_discrete_data_from_audio_stream(stream, frames_per_buffer, overflow_monitor=None):
     # ==================================================
     # === 時間領域波形 離散データ 1次元配列 生成関数 ===
     # ==================================================
+    # stream                : マイク入力音声データストリーム
+    # frames_per_buffer     : 取得するサンプリングデータ数
+    # overflow_monitor      : 入力オーバーフロー検出に使用するInputOverflowMonitor (Noneは検出なし)
+    #                         (今回のデータの直前で欠落したフレーム数は、overflow_monitor.last_gap_framesで取得する)
 
     # 時間領域波形 離散データ 1次元配列の生成
     # (「OSError: [Errno -9981] Input overflowed」エラー対策のために「exception_on_overflow = False」を設定)
+    # (例外を送出させると読出したデータが破棄されるため、オーバーフローはoverflow_monitorで検出する)
     discrete_data = stream.read(
         frames_per_buffer,
         exception_on_overflow=False
     )
 
+    if overflow_monitor is not None:
+        overflow_monitor.check_read(stream, frames_per_buffer)
+
+    # discrete_data     : 時間領域波形 離散データ 1次元配列
+    return discrete_data
+
+
+def gen_discrete_data_from_ring_buffer(ring_buffer, frames_per_buffer):
+    # ===============================================================
+    # === 時間領域波形 離散データ 1次元配列 生成関数 (Callback版) ===
+    # ===============================================================
+    # ring_buffer           : Callbackモードで入力音声データが書込まれるAudioRingBuffer
+    # frames_per_buffer     : 取得するサンプリングデータ数
+
+    # リングバッファから最新のframes_per_bufferフレーム分を取得
+    # (stream.read()と異なり、入力音声データの到着を待たずに即時に返る)
+    discrete_data, write_count = ring_buffer.read_latest(frames_per_buffer)
+
     # discrete_data     : 時間領域波形 離散データ 1次元配列
     return discrete_data
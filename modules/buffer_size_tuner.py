@@ -0,0 +1,143 @@
+import threading
+import time
+
+import numpy as np
+
+
+class BufferSizeTuner:
+    # =============================================
+    # === 入力音声バッファサイズ 自動調整クラス ===
+    # =============================================
+    # 入力音声ストリームバッファ毎の処理時間(解析/描画)を計測し、
+    # 処理時間がバッファ時間長のtarget_ratio以下に収まる最小のバッファサイズを選択する
+    # (ホスト毎に維持可能な最小レイテンシで動作させるため、実行中も処理時間に応じてサイズを変更する)
+    #   - 起動時(キャリブレーション) : 最小サイズから開始し、処理が間に合うサイズまで少数の計測で拡大
+    #   - 実行中                     : 処理が間に合わなくなれば拡大し、1段小さいサイズでも余裕を持って
+    #                                  間に合う処理時間であれば縮小する
+    # (候補サイズはmin_frames～max_framesの2のべき乗)
+
+    def __init__(
+        self,
+        samplerate,
+        min_frames=512,
+        max_frames=8192,
+        target_ratio=0.5,
+        window=16,
+        calibration_window=3,
+        step_down_margin=0.8
+    ):
+        # samplerate            : サンプリング周波数[Hz]
+        # min_frames            : 最小バッファサイズ[sample] (起動時のバッファサイズ)
+        # max_frames            : 最大バッファサイズ[sample]
+        # target_ratio          : 処理時間の目標上限 (バッファ時間長に対する比率)
+        # window                : 実行中にバッファサイズを判定する計測数
+        # calibration_window    : 起動時(キャリブレーション中)にバッファサイズを判定する計測数
+        # step_down_margin      : 縮小判定の余裕率 (縮小後の目標上限 x step_down_margin以下の場合のみ縮小)
+
+        if min_frames > max_frames:
+            raise ValueError(
+                "min_frames (" + str(min_frames) + ") must be less than or equal to "
+                "max_frames (" + str(max_frames) + ")"
+            )
+
+        self.samplerate = samplerate
+        self.target_ratio = target_ratio
+        self.window = window
+        self.calibration_window = calibration_window
+        self.step_down_margin = step_down_margin
+
+        # 候補バッファサイズ (min_frames以上の2のべき乗 / 最大値はmax_frames)
+        self.candidates = []
+        frames = min_frames
+        while frames < max_frames:
+            self.candidates.append(frames)
+            frames = 1 << frames.bit_length() if frames & (frames - 1) else frames * 2
+        self.candidates.append(max_frames)
+
+        self.index = 0
+        self.frames_per_buffer = self.candidates[0]
+        self.calibrating = True
+
+        # 現在のバッファサイズでの処理時間の計測値[s] & 直近の判定に用いた処理時間(p90)[s]
+        self.samples = []
+        self.processing_time = None
+        self.change_count = 0
+
+        # (パイプラインの複数の解析ワーカースレッドから記録できるようにロックで保護する)
+        self.lock = threading.Lock()
+
+    def begin(self, frames=None):
+        # ==============================
+        # === 処理時間の計測開始関数 ===
+        # ==============================
+        # frames    : 処理するバッファサイズ[sample] (Noneの場合は現在のバッファサイズ)
+        #             (パイプライン等で取得時とサイズが異なり得る場合は、取得したデータのサイズを指定する)
+        # (入力音声データの取得完了後に呼び出す / 戻り値をend()に渡す)
+
+        if frames is None:
+            frames = self.frames_per_buffer
+
+        # token : (計測対象のバッファサイズ, 計測開始時刻[s])
+        return frames, time.perf_counter()
+
+    def end(self, token):
+        # ==============================
+        # === 処理時間の計測終了関数 ===
+        # ==============================
+        # token : begin()の戻り値
+        # (解析/描画の完了後に呼び出す)
+
+        frames, start_time = token
+
+        # frames_per_buffer : 次に取得するバッファサイズ[sample]
+        return self.record(frames, time.perf_counter() - start_time)
+
+    def record(self, frames, processing_time):
+        # ===============================================
+        # === 処理時間の記録 & バッファサイズ判定関数 ===
+        # ===============================================
+        # frames            : 処理したバッファサイズ[sample]
+        # processing_time   : 処理時間[s]
+
+        with self.lock:
+            # バッファサイズ変更前に取得したデータの計測値は破棄する
+            if frames != self.frames_per_buffer:
+                return self.frames_per_buffer
+
+            self.samples.append(processing_time)
+            window = self.calibration_window if self.calibrating else self.window
+            if len(self.samples) < window:
+                return self.frames_per_buffer
+
+            # 処理時間の揺らぎ(GC/描画の間引き等)を考慮してp90で判定する
+            self.processing_time = np.percentile(self.samples, 90)
+            self.samples = []
+
+            index = self.index
+            budget = self.target_ratio * self.candidates[index] / self.samplerate
+
+            if (self.processing_time > budget) and (index < len(self.candidates) - 1):
+                # 処理が間に合わない場合は拡大
+                index += 1
+            elif (not self.calibrating) and (index > 0) and (
+                self.processing_time < self.step_down_margin * self.target_ratio
+                * self.candidates[index - 1] / self.samplerate
+            ):
+                # 1段小さいサイズでも余裕を持って間に合う場合は縮小
+                index -= 1
+            else:
+                # 処理が間に合うサイズに到達した場合はキャリブレーション完了
+                self.calibrating = False
+
+            if index != self.index:
+                print(
+                    "frames_per_buffer auto-tuned :", self.candidates[self.index], "->", self.candidates[index],
+                    "( processing time[ms] =", round(self.processing_time * 1000, 2),
+                    "/ buffer time[ms] =", round(self.candidates[self.index] / self.samplerate * 1000, 2), ")"
+                )
+                self.index = index
+                self.frames_per_buffer = self.candidates[index]
+                self.change_count += 1
+
+            # frames_per_buffer : 次に取得するバッファサイズ[sample]
+            return self.frames_per_buffer
@@ -0,0 +1,231 @@
+import time
+
+import numpy as np
+import pyaudio
+import scipy
+
+from .audio_signal_processing_basic import (discrete_data_normalize,
+                                            discrete_data_quantize,
+                                            get_sample_dtype)
+from .audio_stream import SAMPLE_FORMATS
+
+
+class DuplexProcessor:
+    # ===================================================
+    # === 全二重(入出力)ストリーム ブロック処理クラス ===
+    # ===================================================
+    # input=True/output=Trueの1つのストリームのstream_callbackで、入力ブロックを受取り、
+    # 登録したプロセッサ(ゲイン/フィルタ/解析タップ等)を順に適用して、同じstream_callbackの戻り値として出力する
+    #   - プロセッサ : 正規化済float32ブロック(フレーム数, チャンネル数)を引数とするベクトル化された関数
+    #                  (ブロックをin-placeで更新してNoneを返すか、処理後のブロックを返す)
+    #   - レイテンシ : time_infoの入力ADC時刻/出力DAC時刻から、入力サンプルが出力されるまでの
+    #                  ラウンドトリップレイテンシをブロック毎にLatencyMonitorへ記録する
+    # (正規化/量子化の作業バッファは事前確保し、float32フォーマットの場合はブロック毎のメモリ確保を行わない)
+
+    def __init__(
+        self,
+        processors,
+        samplerate,
+        frames_per_buffer,
+        channels=1,
+        sample_format="float32",
+        latency_monitor=None
+    ):
+        # processors        : ブロック毎に順に適用するプロセッサのリスト
+        # samplerate        : サンプリング周波数[Hz]
+        # frames_per_buffer : ストリームバッファあたりのフレーム数
+        # channels          : チャンネル数 (入力/出力共通)
+        # sample_format     : サンプルフォーマット ("int16" / "int24" / "int32" / "float32")
+        #                     (float32の場合は量子化の変換/メモリ確保が不要となり、stream_callbackの処理時間が最小となる)
+        # latency_monitor   : ラウンドトリップ/処理時間を記録するLatencyMonitor (Noneは記録なし)
+
+        get_sample_dtype(sample_format)
+
+        self.processors = list(processors)
+        self.samplerate = samplerate
+        self.frames_per_buffer = frames_per_buffer
+        self.channels = channels
+        self.sample_format = sample_format
+        self.latency_monitor = latency_monitor
+
+        # 正規化済ブロックの作業バッファ (事前確保 / プロセッサはin-placeで更新できる)
+        self.work = np.zeros(frames_per_buffer * channels, dtype=np.float32)
+
+        # float32出力用の読込み専用view (pyaudioはstream_callbackの戻り値として読込み専用のbytes-likeのみを受け付ける)
+        self.work_view = memoryview(self.work).cast("B").toreadonly()
+
+        # 計測カウンタ
+        self.callback_count = 0
+        self.input_overflow_count = 0
+        self.output_underflow_count = 0
+
+    def callback(self, in_data, frame_count, time_info, status):
+        # ============================================
+        # === 全二重ストリーム stream_callback関数 ===
+        # ============================================
+        # (pyaudio.PyAudio.open()のstream_callbackに指定する / 引数はpyaudioのstream_callbackと同じ)
+        start_time = time.perf_counter()
+
+        n = frame_count * self.channels
+        if n > len(self.work):
+            self.work = np.zeros(n, dtype=np.float32)
+            self.work_view = memoryview(self.work).cast("B").toreadonly()
+
+        # 入力ブロックを作業バッファへ正規化しながら書込む (フレーム数, チャンネル数)
+        block = discrete_data_normalize(in_data, self.sample_format, out=self.work[:n]).reshape(frame_count, -1)
+
+        for processor in self.processors:
+            result = processor(block)
+            if result is not None:
+                block = result
+
+        # 出力ブロックの量子化 (float32の場合は作業バッファのviewをそのまま出力する)
+        if self.sample_format == "float32":
+            # (プロセッサが新しい配列を返した場合も、クリップしながら作業バッファへ書戻す)
+            np.clip(block.reshape(-1), -1.0, 1.0, out=self.work[:n])
+            out_data = self.work_view[:n * self.work.itemsize]
+        else:
+            out_data = discrete_data_quantize(block.reshape(-1), self.sample_format)
+
+        # 計測
+        self.callback_count += 1
+        if status & pyaudio.paInputOverflow:
+            self.input_overflow_count += 1
+        if status & pyaudio.paOutputUnderflow:
+            self.output_underflow_count += 1
+
+        if self.latency_monitor is not None:
+            self.record_latency(time_info, time.perf_counter() - start_time)
+
+        # (出力ブロック, paContinue)
+        return (out_data, pyaudio.paContinue)
+
+    def record_latency(self, time_info, processing_time):
+        # ====================================================
+        # === ラウンドトリップ/処理時間 レイテンシ記録関数 ===
+        # ====================================================
+        # time_info         : stream_callbackのtime_info
+        # processing_time   : stream_callbackの処理時間[s]
+
+        adc_time = time_info.get("input_buffer_adc_time", 0)
+        dac_time = time_info.get("output_buffer_dac_time", 0)
+        current_time = time_info.get("current_time", 0)
+
+        # "round_trip" : 入力ブロック先頭サンプルのADC時刻 → 同じサンプルの出力DAC時刻
+        # "input"      : ADC時刻 → stream_callback呼出し / "output" : stream_callback呼出し → DAC時刻
+        # (ADC/DAC時刻を提供しないHost APIでは"0"となるため、その場合は記録しない)
+        if (adc_time > 0) and (dac_time > 0):
+            self.latency_monitor.record("round_trip", dac_time - adc_time)
+        if (adc_time > 0) and (current_time > 0):
+            self.latency_monitor.record("input", current_time - adc_time)
+        if (dac_time > 0) and (current_time > 0):
+            self.latency_monitor.record("output", dac_time - current_time)
+
+        # "processing" : stream_callback内の処理時間 (バッファ時間長を超えると出力アンダーフローとなる)
+        self.latency_monitor.record("processing", processing_time)
+
+    def print_report(self, stream=None):
+        # =============================================
+        # === 全二重ストリーム 計測カウンタ出力関数 ===
+        # =============================================
+        # stream : 全二重ストリーム (指定時はPortAudioの公称入出力レイテンシも出力する)
+
+        print("")
+        print("=== Duplex Stream Report ===")
+        print("  buffer time[ms]        : ", round(self.frames_per_buffer / self.samplerate * 1000, 2))
+        if stream is not None:
+            print(
+                "  nominal latency[ms]    : ",
+                "input", round(stream.get_input_latency() * 1000, 2),
+                "/ output", round(stream.get_output_latency() * 1000, 2)
+            )
+        print("  callback count         : ", self.callback_count)
+        print("  input overflow count   : ", self.input_overflow_count)
+        print("  output underflow count : ", self.output_underflow_count)
+
+        if self.latency_monitor is not None:
+            self.latency_monitor.print_report()
+        else:
+            print("")
+
+
+def duplex_stream_open(pa, input_index, output_index, duplex_processor):
+    # ========================================
+    # === 全二重(入出力)ストリーム生成関数 ===
+    # ========================================
+    # pa                : 生成済のpyaudio.PyAudioクラスオブジェクト (またはAudioSession)
+    # input_index       : 使用するマイクのdevice index
+    # output_index      : 使用する出力デバイスのdevice index (Noneの場合はデフォルト出力デバイス)
+    # duplex_processor  : stream_callbackで入力ブロックを処理するDuplexProcessor
+    #                     (チャンネル数/サンプリング周波数/バッファサイズ/サンプルフォーマットはDuplexProcessorの設定とする)
+    # (pyaudioは入出力デバイスのdefaultLowInput/OutputLatencyを推奨レイテンシとしてストリームを生成する)
+
+    stream = pa.open(
+        format=SAMPLE_FORMATS[duplex_processor.sample_format],
+        channels=duplex_processor.channels,
+        rate=duplex_processor.samplerate,
+        input=True,
+        output=True,
+        input_device_index=input_index,
+        output_device_index=output_index,
+        frames_per_buffer=duplex_processor.frames_per_buffer,
+        stream_callback=duplex_processor.callback
+    )
+
+    # stream    : 生成したpyaudio.PyAudio.Streamオブジェクト (全二重)
+    return stream
+
+
+def gen_gain_processor(gain_db):
+    # =================================
+    # === ゲイン プロセッサ生成関数 ===
+    # =================================
+    # gain_db : ゲイン[dB]
+
+    gain = np.float32(np.power(10, gain_db / 20))
+
+    def processor(block):
+        # ブロックをin-placeで増幅する
+        block *= gain
+
+    # processor : DuplexProcessorに登録するプロセッサ
+    return processor
+
+
+def gen_butter_filter_processor(samplerate, cutoff, btype="highpass", order=2, channels=1):
+    # ===============================================
+    # === バターワースフィルタ プロセッサ生成関数 ===
+    # ===============================================
+    # samplerate    : サンプリング周波数[Hz]
+    # cutoff        : カットオフ周波数[Hz] (bandpass/bandstopの場合は[下限, 上限])
+    # btype         : フィルタタイプ ("lowpass" / "highpass" / "bandpass" / "bandstop")
+    # order         : フィルタ次数
+    # channels      : チャンネル数
+    # (フィルタの内部状態をブロック間で引き継ぐため、ブロック境界で過渡応答が生じない)
+
+    sos = scipy.signal.butter(order, cutoff, btype=btype, fs=samplerate, output="sos").astype(np.float32)
+
+    # フィルタの内部状態 (セクション数, 2, チャンネル数)
+    zi = np.zeros((sos.shape[0], 2, channels), dtype=np.float32)
+
+    def processor(block):
+        # 全チャンネルを一括でフィルタリングする (時間軸 = axis 0)
+        filtered, zi[...] = scipy.signal.sosfilt(sos, block, axis=0, zi=zi)
+        return filtered
+
+    # processor : DuplexProcessorに登録するプロセッサ
+    return processor
+
+
+def gen_ring_buffer_tap_processor(ring_buffer):
+    # =====================================
+    # === 解析タップ プロセッサ生成関数 ===
+    # =====================================
+    # ring_buffer : 処理後のブロックを書込むAudioRingBuffer (dtype="float32")
+    # (出力ブロックを変更せずにリングバッファへ書込み、解析/描画ループから参照できるようにする)
+
+    def processor(block):
+        ring_buffer.write(block)
+
+    # processor : DuplexProcessorに登録するプロセッサ
+    return processor
@@ -3,7 +3,8 @@ import numpy as np
 import scipy
 
 from .audio_signal_processing_advanced import gen_mel_filter_bank
-from .audio_signal_processing_basic import db, dft_normalize, liner
+from .audio_signal_processing_basic import (db, dft_normalize,
+                                            get_float_dtype, liner)
 
 
 def gen_cepstrum_data(discrete_data, samplerate, dbref):
@@ -14,6 +15,9 @@ def gen_cepstrum_data(discrete_data, samplerate, dbref):
     # samplerate        : サンプリング周波数[Hz]
     # dbref             : デシベル基準値
 
+    # 時間領域波形 離散データを信号処理の浮動小数点型に変換
+    discrete_data = np.asarray(discrete_data, dtype=get_float_dtype())
+
     # 時間領域波形 離散データ 1次元配列のDFT(離散フーリエ変換)を実施
     # (scipy.fft.fft()の出力結果spectrumは複素数)
     spectrum_data = scipy.fft.fft(discrete_data)
@@ -23,10 +27,12 @@ def gen_cepstrum_data(discrete_data, samplerate, dbref):
         spectrum_data_log = db(spectrum_data, dbref)
     else:
         # DFTデータ(複素数)を対数パワースペクトル(=10 * log10(spectrum_data^2))に変換
-        spectrum_data_log = 20 * np.log10(spectrum_data)
+        # (基準値1としたdB変換と等価)
+        spectrum_data_log = db(spectrum_data, 1)
 
     # 対数DFTデータ(複素数対数)に対して、IDFT(逆離散フーリエ変換)を実施
-    spectrum_idft = scipy.ifft(spectrum_data_log)
+    # (scipy.fft.ifft()は入力の精度を保持するため、complex64の場合は単精度で実行される)
+    spectrum_idft = scipy.fft.ifft(spectrum_data_log)
 
     # IDFTデータの実数値を抽出し、ケプストラム波形データを作成
     cepstrum_data = np.real(spectrum_idft)
@@ -66,7 +72,8 @@ def gen_cepstrum_data(discrete_data, samplerate, dbref):
         spectrum_envelope_data = liner(spectrum_envelope_log, dbref)
     else:
         # スペクトル包絡データ(=対数DFTデータ(複素数対数))が、対数パワースペクトル(dB FS)の場合
-        spectrum_envelope_data = 10 ** (spectrum_envelope_log / 20)
+        # (10 ** (x / 20) = exp(x * log(10) / 20) として算出し、単精度複素数でも低速なべき乗演算を避ける)
+        spectrum_envelope_data = np.exp(spectrum_envelope_log * float(np.log(10) / 20))
 
     # スペクトル包絡データ(=DFT(離散フーリエ変換)データ)の正規化を実施
     # (振幅成分の正規化 & 負の周波数領域の除外)
@@ -100,6 +107,9 @@ def gen_melscale_spctrm_env_data(discrete_data, samplerate, mel_filter_number, d
     mel_filter_bank = gen_mel_filter_bank(discrete_data, samplerate, mel_filter_number)
     # mel_filter_bank : メルフィルタバンク伝達関数(周波数特性) 1次元配列
 
+    # 時間領域波形 離散データを信号処理の浮動小数点型に変換
+    discrete_data = np.asarray(discrete_data, dtype=get_float_dtype())
+
     # 時間領域波形 離散データ 1次元配列のDFT(離散フーリエ変換)を実施
     # (scipy.fft.fft()の出力結果spectrumは複素数)
     spectrum_data = scipy.fft.fft(discrete_data)
@@ -145,11 +155,12 @@ def gen_mfcc_spctrm_env_data(melscale_amp_normalized, mfcc_dim, mel_filter_numbe
     # === メル周波数ケプストラム係数(MFCC)スペクトル包絡データ生成関数 ===
     # ====================================================================
     # melscale_amp_normalized       : メルスケール(メル尺度)スペクトル包絡データ振幅成分 1次元配列
+    #                                 (2次元配列(チャンネル数, メル周波数軸データ数)の場合は、チャンネル毎に算出する)
     # mfcc_dim                      : メル周波数ケプストラム係数(MFCC) 次元数
     # mel_filter_number             : メルフィルタバンク フィルタ数
 
     mfcc = scipy.fft.dct(melscale_amp_normalized, norm='ortho')
-    mfcc = mfcc[:mfcc_dim]
+    mfcc = mfcc[..., :mfcc_dim]
     mfcc_amp_normalized = scipy.fft.idct(mfcc, n=mel_filter_number, norm='ortho')
 
     # mfcc_amp_normalized : MFCCスペクトル包絡データ振幅成分 1次元配列
@@ -2,9 +2,9 @@ import numpy as np
 import pyworld
 import scipy
 
-from .audio_signal_processing_basic import (a_weighting, db,
-                                            dft_negative_freq_domain_exlusion,
-                                            dft_normalize)
+from .analysis_plan import get_analysis_plan
+from .audio_signal_processing_basic import a_weighting, db, get_float_dtype
+from .rfft_spectrum import RfftSpectrum
 
 
 def gen_freq_domain_data(discrete_data, samplerate, dbref, A):
@@ -16,33 +16,14 @@ def gen_freq_domain_data(discrete_data, samplerate, dbref, A):
     # dbref             : デシベル基準値
     # A                 : 聴感補正(A特性)の有効(True)/無効(False)設定
 
-    # 時間領域波形 離散データ 1次元配列のDFT(離散フーリエ変換)を実施
-    # (scipy.fft.fft()の出力結果spectrumは複素数)
-    spectrum_data = scipy.fft.fft(discrete_data)
+    # 実数入力のDFT(scipy.fft.rfft)を実施し、正規化後の各成分を算出
+    # (各成分の参照が不要な場合は、RfftSpectrumを直接使用することで算出を省略できる)
+    spectrum = RfftSpectrum(discrete_data, samplerate, dbref, A)
 
-    # DFT(離散フーリエ変換)データに対応した周波数軸データを作成
-    dt = 1 / samplerate  # サンプリング周期[s]
-    freq_data = scipy.fft.fftfreq(len(discrete_data), d=dt)
-
-    # DFT(離散フーリエ変換)データの正規化を実施
-    # (振幅成分の正規化 & 負の周波数領域の除外)
-    spectrum_normalized, amp_normalized, phase_normalized = dft_normalize(
-        spectrum_data
-    )
-
-    # 周波数軸データの正規化(負の周波数領域の除外)を実施
-    freq_normalized = dft_negative_freq_domain_exlusion(freq_data)
-
-    # dbrefが0以上の場合、音圧レベル(dB SPL)に変換
-    if dbref > 0:
-        amp_normalized = db(amp_normalized, dbref)
-
-        # dB変換されていてAがTrueの時に聴感補正する
-        if A:
-            amp_normalized += a_weighting(freq_normalized)
-    else:
-        # 正規化後 DFTデータ振幅成分を対数パワースペクトル(=10 * log10(amp^2))に変換
-        amp_normalized = 20 * np.log10(amp_normalized)
+    amp_normalized = spectrum.amp_normalized
+    spectrum_normalized = spectrum.spectrum_normalized
+    phase_normalized = spectrum.phase_normalized
+    freq_normalized = spectrum.freq_normalized
 
     # spectrum_normalized   : 正規化後 DFTデータ 1次元配列
     # amp_normalized        : 正規化後 DFTデータ振幅成分 1次元配列
@@ -63,6 +44,7 @@ def gen_freq_domain_data_of_signal_spctrgrm(
     # === 周波数特性データ生成関数 (scipy.signal.spectrogram版) ===
     # =============================================================
     # data_normalized       : 時間領域 波形データ(正規化済)
+    #                         (2次元配列(チャンネル数, フレーム数)の場合は、全チャンネルを一括で算出)
     # samplerate            : サンプリング周波数[Hz]
     # stft_frame_size       : STFT(短時間フーリエ変換)を行う時系列データ数(=STFTフレーム長)
     # overlap_rate          : オーバーラップ率 [%]
@@ -73,7 +55,8 @@ def gen_freq_domain_data_of_signal_spctrgrm(
     freq_spctrgrm, time_spctrgrm, spectrogram = scipy.signal.spectrogram(
         # xは、「Time series of measurement values」
         # (= スペクトログラムデータの元となる時系列データ配列)
-        x=data_normalized,
+        # (信号処理の浮動小数点型に変換し、float32の場合は単精度で算出する)
+        x=np.asarray(data_normalized, dtype=get_float_dtype()),
         # fsは、「Sampling frequency of the x time series」
         # (= サンプリング周波数)
         fs=samplerate,
@@ -99,10 +82,6 @@ def gen_freq_domain_data_of_signal_spctrgrm(
     print("time_spctrgrm.shape = ", time_spctrgrm.shape)
     print("spectrogram.shape [scipy org] = ", spectrogram.shape)
 
-    # 聴感補正曲線を計算
-    a_scale = a_weighting(freq_spctrgrm)
-    print("a_scale.shape = ", a_scale.shape)
-
     # dbrefが0以上の場合、音圧レベル(dB SPL)に変換
     if dbref > 0:
         spectrogram = db(spectrogram, dbref)
@@ -110,9 +89,13 @@ def gen_freq_domain_data_of_signal_spctrgrm(
 
         # A=Trueの場合に、A特性補正を行う
         if A:
-            for i in range(len(time_spctrgrm)):
-                # 各時間軸データ(freq_spctrgrmと同じ次元サイズ)に対して、A特性補正を実施
-                spectrogram[:, i] += a_scale
+            # 聴感補正曲線を計算 (a_weighting()は周波数軸データを変更しない)
+            a_scale = a_weighting(freq_spctrgrm).astype(get_float_dtype())
+            print("a_scale.shape = ", a_scale.shape)
+
+            # 各時間軸データ(freq_spctrgrmと同じ次元サイズ)に対して、A特性補正を実施
+            # (周波数軸方向にブロードキャストし、マルチチャンネル(チャンネル, 周波数, 時間)にも対応)
+            spectrogram += a_scale[:, np.newaxis]
 
             print("spectrogram.shape [dB SPL(A)]= ", spectrogram.shape)
     else:
@@ -141,6 +124,7 @@ def gen_freq_domain_data_of_stft(
     # === 周波数特性データ生成関数 (Full Scratch STFT Function版) ===
     # ===============================================================
     # time_array_after_window   : 時間領域 波形データ(正規化/オーバーラップ処理/hanning窓関数適用済)
+    #                             2次元配列(切り出しフレーム数, STFTフレーム長)
     # samplerate                : サンプリング周波数[Hz]
     # stft_frame_size           : STFT(短時間フーリエ変換)を行う時系列データ数(=STFTフレーム長)
     # N_ave                     : オーバーラップ処理における切り出しフレーム数
@@ -152,21 +136,14 @@ def gen_freq_domain_data_of_stft(
     print("N_ave = ", N_ave)
     print("final_time = ", final_time)
 
-    # スペクトログラムデータ格納配列の初期化
-    spectrogram = []
-
-    # DFT(離散フーリエ変換)データに対応した周波数軸データを作成
-    dt = 1 / samplerate  # サンプリング周期[s]
+    # 解析プラン (周波数軸データ/聴感補正曲線 / 同じ設定値の場合はキャッシュ済のプラン)
+    # (FFT点数を、stft_frame_sizeの2倍とする事で、周波数分解能をscipy.signal.spectrogramと同じとする)
+    # (聴感補正曲線は、dbrefが0以上、かつ、A=Trueの場合のみ(それ以外はNone))
+    plan = get_analysis_plan(samplerate, stft_frame_size, stft_frame_size * 2, None, dbref, A)
 
-    freq_data = scipy.fft.fftfreq(
-        # nを、stft_frame_sizeの2倍とする事で、周波数分解能をscipy.signal.spectrogramと同じとする
-        n=(stft_frame_size * 2),
-        # dをサンプリング周期の2倍とする(scipy.signal.spectrogramと合わせる)
-        d=dt
-    )
-
-    # 周波数軸データの正規化(負の周波数領域の除外)を実施
-    freq_spctrgrm = dft_negative_freq_domain_exlusion(freq_data)
+    # DFT(離散フーリエ変換)データに対応した周波数軸データ
+    # (負の周波数領域を除外した「要素数 / 2」までの要素とする)
+    freq_spctrgrm = plan.freq_axis
     print("freq_spctrgrm.shape = ", freq_spctrgrm.shape)
 
     # DFT(離散フーリエ変換)データに対応した時間軸データを作成
@@ -175,63 +152,76 @@ def gen_freq_domain_data_of_stft(
     time_spctrgrm = np.linspace(0, final_time, N_ave)
     print("time_spctrgrm.shape = ", time_spctrgrm.shape)
 
-    # 聴感補正曲線を計算
-    a_scale = a_weighting(freq_spctrgrm)
-    print("a_scale.shape = ", a_scale.shape)
-
-    # 時間軸方向データ数分のループ処理
-    for i in range(N_ave):
-
-        # 時間領域 波形データのSTFTフレーム[i] に対して、フーリエ変換を実施
-        # (scipy.fft.fft()の出力結果spectrumは複素数)
-        spectrum_data = scipy.fft.fft(
-            # xは「Input array, can be complex」
-            x=time_array_after_window[i],
-            # nは「Length of the transformed axis of the output」
-            # (nを、stft_frame_sizeの2倍とする事で、周波数分解能をscipy.signal.spectrogramと同じとする)
-            n=stft_frame_size * 2
-        )
-
-        # DFT(離散フーリエ変換)データの正規化を実施
-        spectrum_normalized, amp_normalized, phase_normalized = dft_normalize(
-            spectrum_data
-        )
-
-        # 窓関数補正値(acf)を乗算
-        amp_normaliazed_acf = amp_normalized * acf
-
-        # dbrefが0以上の場合、音圧レベル(dB SPL)に変換
-        if dbref > 0:
-            amp_normaliazed_acf = db(
-                amp_normaliazed_acf, dbref
-            )
-        else:
-            # DFT(離散フーリエ変換)データ 振幅成分を対数パワースペクトル(=10 * log10(amp^2))に変換
-            amp_normaliazed_acf = 20 * np.log10(amp_normaliazed_acf)
-
-        # spectrogram配列に追加
-        spectrogram.append(amp_normaliazed_acf)
-
-    # numpy.ndarray変換を行う
-    spectrogram = np.array(spectrogram)
-    print("spectrogram.shape = ", spectrogram.shape)
-
-    # dbrefが0以上、かつ、A=Trueの場合に、A特性補正を行う
-    if (dbref > 0) and A:
-        spectrogram = spectrogram + a_scale
-        print("spectrogram.shape [dB(A)] = ", spectrogram.shape)
-
-    # 縦軸周波数、横軸時間にするためにデータを転置
-    spectrogram = spectrogram.T
-    print("spectrogram.shape [dB(A) and Transposed] = ", spectrogram.shape)
+    # 全STFTフレームのスペクトログラム 振幅データを一括で算出 (縦軸周波数、横軸時間)
+    # (解析プランの聴感補正曲線(信号処理の浮動小数点型)で、dbrefが0以上、かつ、A=Trueの場合に、A特性補正を行う)
+    spectrogram = gen_spectrogram_of_stft_frames(
+        time_array_after_window, stft_frame_size, N_ave, acf, dbref, plan.a_scale)
+    print("spectrogram.shape [Transposed] = ", spectrogram.shape)
 
     print("")
     # freq_spctrgrm         : スペクトログラム y軸向けデータ[Hz]
     # time_spctrgrm         : スペクトログラム x軸向けデータ[s]
-    # spectrogram           : スペクトログラム 振幅データ
+    # spectrogram           : スペクトログラム 振幅データ (周波数, 時間)
     return freq_spctrgrm, time_spctrgrm, spectrogram
 
 
+def gen_spectrogram_of_stft_frames(
+    time_array_after_window,
+    stft_frame_size,
+    N_ave,
+    acf,
+    dbref,
+    a_scale=None
+):
+    # ============================================================
+    # === STFTフレーム一括 スペクトログラム 振幅データ生成関数 ===
+    # ============================================================
+    # time_array_after_window   : 時間領域 波形データ(正規化/オーバーラップ処理/窓関数適用済)
+    #                             2次元配列(切り出しフレーム数, STFTフレーム長)
+    # stft_frame_size           : STFT(短時間フーリエ変換)を行う時系列データ数(=STFTフレーム長)
+    # N_ave                     : 切り出しフレーム数
+    # acf                       : 振幅補正係数(Amplitude Correction Factor)
+    # dbref                     : デシベル基準値
+    # a_scale                   : 聴感補正曲線 (dB値に加算するA特性補正値 / Noneの場合は補正なし)
+
+    # 全STFTフレームに対して、実数入力のフーリエ変換をフレーム方向(axis -1)で一括して実施
+    # (scipy.fft.rfft()の出力結果spectrumは複素数 / 負の周波数領域を除外した「要素数 / 2」までの要素とする)
+    spectrum_data = scipy.fft.rfft(
+        # xは「Input array, can be complex」
+        x=np.asarray(time_array_after_window)[:N_ave],
+        # nは「Length of the transformed axis of the output」
+        # (nを、stft_frame_sizeの2倍とする事で、周波数分解能をscipy.signal.spectrogramと同じとする)
+        n=stft_frame_size * 2,
+        axis=-1
+    )[:, :stft_frame_size]
+
+    # DFT(離散フーリエ変換)データ振幅成分の正規化 & 窓関数補正値(acf)を乗算
+    # (dft_normalize()と同じく 1/N 倍 & 対称成分の2倍の正規化を、窓関数補正値と合わせて1回の乗算で施す)
+    # (以降の処理は全フレーム分の配列に対してin-placeで行い、一時配列の生成を抑える)
+    spectrogram = np.abs(spectrum_data)
+    spectrogram *= 2 * acf / (stft_frame_size * 2)
+
+    # dbrefが0以上の場合、音圧レベル(dB SPL)に変換
+    if dbref > 0:
+        spectrogram = db(spectrogram, dbref)
+    else:
+        # DFT(離散フーリエ変換)データ 振幅成分を対数パワースペクトル(=10 * log10(amp^2))に変換
+        with np.errstate(divide='ignore'):
+            np.log10(spectrogram, out=spectrogram)
+        spectrogram *= 20
+
+    # A特性補正を行う
+    # (各STFTフレームに対して、周波数軸方向にブロードキャストして加算)
+    if a_scale is not None:
+        spectrogram += a_scale
+
+    # 縦軸周波数、横軸時間にするためにデータを転置 (転置viewのため、データコピーは発生しない)
+    spectrogram = spectrogram.T
+
+    # spectrogram   : スペクトログラム 振幅データ (周波数, 時間)
+    return spectrogram
+
+
 def gen_fundamental_freq_data(discrete_data, samplerate):
     # =======================================
     # === 基本周波数 時系列データ生成関数 ===
@@ -239,6 +229,9 @@ def gen_fundamental_freq_data(discrete_data, samplerate):
     # discrete_data     : 時間領域波形 離散データ 1次元配列
     # samplerate        : サンプリング周波数[Hz]
 
+    # pyworldはfloat64(C double)配列のみを受け付けるため、float64配列に変換
+    discrete_data = np.ascontiguousarray(discrete_data, dtype=np.float64)
+
     # === 基本周波数Rawデータの抽出
 
     # 基本周波数Rawデータ抽出における時間分解能 frame_period(ms単位)
@@ -256,3 +249,27 @@ def gen_fundamental_freq_data(discrete_data, samplerate):
     # f0        : 基本周波数 時系列データ 1次元配列
     # time_f0   : 基本周波数 時系列データに対応した時間軸データ 1次元配列
     return f0, time_f0
+
+
+def gen_unvoiced_fundamental_freq_data(discrete_data, samplerate):
+    # ======================================================
+    # === 基本周波数 時系列データ生成関数 (無音区間向け) ===
+    # ======================================================
+    # discrete_data     : 時間領域波形 離散データ 1次元配列
+    # samplerate        : サンプリング周波数[Hz]
+    # (無音と判定したバッファ向けに、pyworldによる抽出を行わずに全フレームを無声(基本周波数"0")とする
+    #  gen_fundamental_freq_data()の簡易版 / 時間軸データはgen_fundamental_freq_data()と同一とする)
+
+    # 基本周波数Rawデータ抽出における時間分解能 frame_period(ms単位)
+    # (gen_fundamental_freq_data()と同じく、サンプリング周期の20倍の時間長とする)
+    frame_period = (np.float64(1 / samplerate) * 1000) * 20
+
+    # pyworld.dio()と同じ算出式でフレーム数を算出
+    f0_length = int(1000 * len(discrete_data) / samplerate / frame_period) + 1
+
+    time_f0 = np.arange(f0_length) * frame_period / 1000
+    f0 = np.zeros(f0_length)
+
+    # f0        : 基本周波数 時系列データ 1次元配列 (全て"0")
+    # time_f0   : 基本周波数 時系列データに対応した時間軸データ 1次元配列
+    return f0, time_f0
@@ -0,0 +1,124 @@
+import concurrent.futures
+
+import numpy as np
+
+from .gen_cepstrum_data import gen_cepstrum_data, gen_melscale_spctrm_env_data
+from .gen_freq_domain_data import (gen_fundamental_freq_data,
+                                   gen_unvoiced_fundamental_freq_data)
+
+# [*] スペクトログラム(scipy.signal.spectrogram版)は、2次元配列(チャンネル数, フレーム数)を
+#     gen_freq_domain_data_of_signal_spctrgrm()に渡す事で、全チャンネルを一括(バッチ)で算出できる
+
+
+def gen_multi_channel_executor(max_workers):
+    # ===================================================
+    # === チャンネル毎解析向け ワーカープール生成関数 ===
+    # ===================================================
+    # max_workers : ワーカースレッド数 (例：チャンネル数)
+
+    # numpy/scipy/pyworldの演算中はGILが解放されるため、スレッドプールでチャンネル毎の解析を並列に実行できる
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="channel-analysis")
+
+    # executor : チャンネル毎解析向けワーカープール (concurrent.futures.Executor)
+    return executor
+
+
+def gen_multi_channel_data(analysis_func, channel_data, *args, executor=None):
+    # =======================================
+    # === チャンネル毎 解析データ生成関数 ===
+    # =======================================
+    # analysis_func     : 1チャンネル分の離散データを第1引数とする解析関数
+    # channel_data      : チャンネル毎の離散データ 2次元配列 (チャンネル数, フレーム数)
+    # args              : analysis_funcへ渡す第2引数以降
+    # executor          : 解析を実行するワーカープール (Noneの場合は逐次実行)
+
+    if executor is None:
+        results = [analysis_func(data, *args) for data in channel_data]
+    else:
+        futures = [executor.submit(analysis_func, data, *args) for data in channel_data]
+        results = [future.result() for future in futures]
+
+    # results : チャンネル毎のanalysis_func戻り値のリスト
+    return results
+
+
+def gen_fundamental_freq_data_of_multi_channel(channel_data, samplerate, executor=None):
+    # ======================================================
+    # === 基本周波数 時系列データ生成関数 (チャンネル毎) ===
+    # ======================================================
+    # channel_data      : チャンネル毎の離散データ 2次元配列 (チャンネル数, フレーム数)
+    # samplerate        : サンプリング周波数[Hz]
+    # executor          : 解析を実行するワーカープール (Noneの場合は逐次実行)
+
+    results = gen_multi_channel_data(
+        gen_fundamental_freq_data, channel_data, samplerate, executor=executor)
+
+    f0 = np.stack([result[0] for result in results])
+    time_f0 = results[0][1]
+
+    # f0        : 基本周波数 時系列データ 2次元配列 (チャンネル数, 時間軸データ数)
+    # time_f0   : 基本周波数 時系列データに対応した時間軸データ 1次元配列
+    return f0, time_f0
+
+
+def gen_unvoiced_fundamental_freq_data_of_multi_channel(channel_data, samplerate):
+    # =====================================================================
+    # === 基本周波数 時系列データ生成関数 (チャンネル毎 / 無音区間向け) ===
+    # =====================================================================
+    # channel_data      : チャンネル毎の離散データ 2次元配列 (チャンネル数, フレーム数)
+    # samplerate        : サンプリング周波数[Hz]
+    # (全チャンネルを無声(基本周波数"0")とするため、時間軸データは1チャンネル分のみ算出する)
+
+    f0, time_f0 = gen_unvoiced_fundamental_freq_data(channel_data[0], samplerate)
+    f0 = np.zeros((len(channel_data), len(f0)))
+
+    # f0        : 基本周波数 時系列データ 2次元配列 (チャンネル数, 時間軸データ数 / 全て"0")
+    # time_f0   : 基本周波数 時系列データに対応した時間軸データ 1次元配列
+    return f0, time_f0
+
+
+def gen_cepstrum_data_of_multi_channel(channel_data, samplerate, dbref, executor=None):
+    # =================================================
+    # === ケプストラムデータ生成関数 (チャンネル毎) ===
+    # =================================================
+    # channel_data      : チャンネル毎の離散データ 2次元配列 (チャンネル数, フレーム数)
+    # samplerate        : サンプリング周波数[Hz]
+    # dbref             : デシベル基準値
+    # executor          : 解析を実行するワーカープール (Noneの場合は逐次実行)
+
+    results = gen_multi_channel_data(
+        gen_cepstrum_data, channel_data, samplerate, dbref, executor=executor)
+
+    amp_envelope_normalized = np.stack([result[0] for result in results])
+    cepstrum_data = np.stack([result[1] for result in results])
+    cepstrum_data_lpl = np.stack([result[2] for result in results])
+
+    # amp_envelope_normalized   : 正規化後 スペクトル包絡データ振幅成分 2次元配列 (チャンネル数, 周波数軸データ数)
+    # cepstrum_data             : ケプストラムデータ(対数値)[dB] 2次元配列 (チャンネル数, ケフレンシー軸データ数)
+    # cepstrum_data_lpl         : LPL(=Low-Pass-Lifter)適用後
+    #                             ケプストラムデータ(対数値)[dB] 2次元配列 (チャンネル数, ケフレンシー軸データ数)
+    return amp_envelope_normalized, cepstrum_data, cepstrum_data_lpl
+
+
+def gen_melscale_spctrm_env_data_of_multi_channel(
+        channel_data, samplerate, mel_filter_number, dbref, executor=None):
+    # =========================================================================
+    # === メルスケール(メル尺度)スペクトル包絡データ生成関数 (チャンネル毎) ===
+    # =========================================================================
+    # channel_data      : チャンネル毎の離散データ 2次元配列 (チャンネル数, フレーム数)
+    # samplerate        : サンプリング周波数[Hz]
+    # mel_filter_number : メルフィルタバンクのフィルタ数
+    # dbref             : デシベル基準値
+    # executor          : 解析を実行するワーカープール (Noneの場合は逐次実行)
+
+    results = gen_multi_channel_data(
+        gen_melscale_spctrm_env_data, channel_data, samplerate, mel_filter_number, dbref, executor=executor)
+
+    melscale_amp_normalized = np.stack([result[0] for result in results])
+
+    # melscale_amp_normalized   : メルスケール(メル尺度)スペクトル包絡データ振幅成分
+    #                             2次元配列 (チャンネル数, メル周波数軸データ数)
+    # melscale_freq_normalized  : メル周波数軸データ 1次元配列 (全チャンネル共通)
+    # mel_filter_bank           : メルフィルタバンク伝達関数(周波数特性) (全チャンネル共通)
+    return melscale_amp_normalized, results[0][1], results[0][2]
@@ -1,11 +1,26 @@
 import math
 
-from .audio_signal_processing_basic import (discrete_data_normalize,
-                                            gen_time_axis_data)
-from .audio_stream import gen_discrete_data_from_audio_stream
-
-
-def gen_time_domain_data(stream, frames_per_buffer, samplerate, time):
+import numpy as np
+
+from .analysis_plan import get_analysis_plan
+from .audio_signal_processing_basic import (deinterleave_channels,
+                                            discrete_data_normalize,
+                                            gen_time_axis_data,
+                                            get_float_dtype, get_sample_dtype)
+from .audio_stream import (gen_discrete_data_from_audio_stream,
+                           gen_discrete_data_from_ring_buffer)
+
+
+def gen_time_domain_data(
+    stream,
+    frames_per_buffer,
+    samplerate,
+    time,
+    ring_buffer=None,
+    channels=1,
+    sample_format="int16",
+    overflow_monitor=None
+):
     # ==============================================
     # === 時間領域波形データ生成関数(時間指定版) ===
     # ==============================================
@@ -13,42 +28,89 @@ def gen_time_domain_data(stream, frames_per_buffer, samplerate, time):
     # frames_per_buffer     : 入力音声ストリームバッファあたりのサンプリングデータ数
     # samplerate            : サンプリングレート [sampling data count/s)]
     # time                  : 録音時間[s] ("0"の場合は、リアルタイムモードとしてデータ生成)
+    # ring_buffer           : Callbackモードで入力音声データが書込まれるAudioRingBuffer
+    #                         (リアルタイムモード時のみ使用 / Noneの場合はstreamから直接読出す)
+    # channels              : チャンネル数 (マイクモード 1:モノラル / 2:ステレオ 等)
+    # sample_format         : 入力音声ストリームのサンプルフォーマット ("int16" / "int24" / "int32" / "float32")
+    # overflow_monitor      : Blockingモード時の入力オーバーフロー検出に使用するInputOverflowMonitor
+    #                         (録音時間指定モードでfill_gaps=Trueの場合は、欠落区間に無音を挿入する)
+    #                         (リアルタイムモードでは、バッファ長を一定とするため無音を挿入せず、
+    #                          呼出し側がoverflow_monitor.last_gap_framesで後段の時間軸を進める)
 
     if time > 0:
         # ==========================
         # === 録音時間指定モード ===
         # ==========================
 
-        # 時間領域波形 離散データ 1次元配列を格納する配列の初期化
-        audio_data_united = []
-        # ループ変数初期化
-        i = 0
-
         # サンプリング周期[s]の算出
         dt = 1 / samplerate
 
+        # 録音する入力音声ストリームバッファ数
+        buffer_count = int(((time / dt) / frames_per_buffer))
+
+        # 時間領域波形データ(正規化済)を格納する配列
+        # (1バッファ目の取得時に、録音時間分の配列を一括で事前確保する)
+        # (int32は仮数部24bitのfloat32では精度が落ちるため、float64とする / それ以外は信号処理の浮動小数点型)
+        if sample_format == "int32":
+            record_dtype = np.float64
+        else:
+            record_dtype = get_float_dtype()
+        data_normalized = np.empty(0, dtype=record_dtype)
+        itemsize = get_sample_dtype(sample_format).itemsize
+
         print("Audio Stream Recording START")
 
         # 入力音声ストリームバッファ毎に時間領域波形 離散データ 1次元配列を生成
-        for i in range(int(((time / dt) / frames_per_buffer))):
+        # (欠落区間に無音を挿入した場合は、その分だけ読出すバッファ数が減り、録音データの時間軸は実時間と一致する)
+        position = 0        # 書込み済の離散データ数
+        frame_channels = 1  # 1フレームあたりの離散データ数 (1バッファ目の取得時に確定)
+        i = 0
+        while (buffer_count > 0) and ((i == 0) or (position < len(data_normalized))):
             # 標準出力への経過時間表示
             erapsed_time = math.floor(
-                ((i * frames_per_buffer) / samplerate) * 100) / 100
+                ((position // frame_channels) / samplerate) * 100) / 100
             print("  - Erapsed Time[s]: ", erapsed_time)
 
             # 時間領域波形 離散データ 1次元配列 生成の生成
             audio_data_per_buffer = gen_discrete_data_from_audio_stream(
-                stream, frames_per_buffer
+                stream, frames_per_buffer, overflow_monitor
             )
 
-            audio_data_united.append(audio_data_per_buffer)
+            # 1バッファあたりの離散データ数 (=サンプリングデータ数 x チャンネル数)
+            buffer_len = len(audio_data_per_buffer) // itemsize
+
+            if i == 0:
+                data_normalized = np.empty(
+                    buffer_count * buffer_len, dtype=record_dtype)
+                frame_channels = buffer_len // frames_per_buffer
+            i += 1
+
+            # 入力オーバーフローで欠落した区間を無音で埋める (欠落区間の前後を詰めて連結しない)
+            if (overflow_monitor is not None) and overflow_monitor.fill_gaps and (overflow_monitor.last_gap_frames > 0):
+                print("  - Input Overflow : ", overflow_monitor.last_gap_frames, "frames dropped")
+                gap_len = min(
+                    overflow_monitor.last_gap_frames * frame_channels,
+                    len(data_normalized) - position
+                )
+                data_normalized[position:position + gap_len] = 0
+                position += gap_len
+
+            # 事前確保した配列の該当スライスへ、正規化しながら直接書込む
+            # (byte列のリスト連結や、録音データ全体の中間コピーを生成しない)
+            # (無音を挿入した場合、録音時間を超える末尾のデータは破棄する)
+            block_len = min(buffer_len, len(data_normalized) - position)
+            if block_len < buffer_len:
+                audio_data_per_buffer = audio_data_per_buffer[:block_len * itemsize]
+            discrete_data_normalize(
+                audio_data_per_buffer,
+                sample_format,
+                out=data_normalized[position:position + block_len]
+            )
+            position += block_len
 
         print("Audio Stream Recording END\n")
 
-        # 入力音声ストリームバッファ毎の時間領域波形 離散データ 1次元配列を連結
-        # (入力音声ストリームバッファ毎に、要素が分かれていたdataを、要素間でbyte列連結)
-        audio_discrete_data = b"".join(audio_data_united)
-        print("Length of Discrete All-DATA = ", len(audio_discrete_data))
+        print("Length of Discrete All-DATA = ", len(data_normalized))
         print("")
 
     else:
@@ -57,20 +119,41 @@ def gen_time_domain_data(stream, frames_per_buffer, samplerate, time):
         # ==========================
 
         # 時間領域波形 離散データ 1次元配列 生成の生成
-        audio_discrete_data = gen_discrete_data_from_audio_stream(
-            stream, frames_per_buffer
-        )
+        if ring_buffer is None:
+            # Blockingモード (入力音声ストリームバッファ分のデータ到着まで待機)
+            audio_discrete_data = gen_discrete_data_from_audio_stream(
+                stream, frames_per_buffer, overflow_monitor
+            )
+            if (overflow_monitor is not None) and (overflow_monitor.last_gap_frames > 0):
+                print("  - Input Overflow : ", overflow_monitor.last_gap_frames, "frames dropped")
+        else:
+            # Callbackモード (リングバッファから最新データを待機なしで取得)
+            audio_discrete_data = gen_discrete_data_from_ring_buffer(
+                ring_buffer, frames_per_buffer
+            )
         print(
             "Length of Discrete DATA per Buffer = ",
             len(audio_discrete_data)
         )
 
-    # 時間領域波形データの正規化
-    data_normalized = discrete_data_normalize(audio_discrete_data, "int16")
+        # 時間領域波形データの正規化
+        # (float32フォーマットかつFLOAT_DTYPEがfloat32の場合は、データコピーなしのviewとなる)
+        data_normalized = discrete_data_normalize(audio_discrete_data, sample_format)
 
-    # 時間領域波形データ(正規化済)に対応した時間軸データを作成
-    time_normalized = gen_time_axis_data(data_normalized, samplerate)
+    # マルチチャンネルの場合は、チャンネル毎のview(データコピーなし)に分離
+    if channels > 1:
+        data_normalized = deinterleave_channels(data_normalized, channels)
+
+    # 時間領域波形データ(正規化済)に対応した時間軸データを取得
+    if time > 0:
+        # 録音時間指定モードの場合は、録音データ長が毎回異なり再利用されないため、
+        # 解析プランにキャッシュせずに生成する (録音データ長の配列をキャッシュに残さない)
+        time_normalized = gen_time_axis_data(data_normalized, samplerate)
+    else:
+        # リアルタイムモードの場合は、バッファサイズ(固定フレーム数)毎に1度だけ生成した解析プランの読込み専用配列とする
+        time_normalized = get_analysis_plan(samplerate, np.shape(data_normalized)[-1]).time_axis
 
     # data_normalized : 時間領域波形データ(正規化済)
+    #                   (マルチチャンネルの場合は2次元配列(チャンネル数, フレーム数))
     # time_normalized : 時間領域波形データ(正規化済)に対応した時間軸データ
     return data_normalized, time_normalized
@@ -1,18 +1,53 @@
 import pyaudio
 
 
-def get_mic_index():
+def gen_device_table(pa):
+    # ======================================
+    # === オーディオデバイス一覧生成関数 ===
+    # ======================================
+    # pa : 使用するpyaudio.PyAudioクラスオブジェクト (SyntheticPyAudio等の互換オブジェクトも指定可能)
+
+    device_table = []
+
+    for host_index in range(0, pa.get_host_api_count()):  # Host APIで大分類
+
+        host_api_info = pa.get_host_api_info_by_index(host_index)
+
+        host_api_info["devices"] = [
+            pa.get_device_info_by_host_api_device_index(host_index, device_index)
+            for device_index in range(0, host_api_info['deviceCount'])
+        ]  # Deviceで小分類
+
+        device_table.append(host_api_info)
+
+    # device_table : Host API情報(dict)のリスト (各Host API情報の"devices"にデバイス情報(dict)のリストを格納)
+    return device_table
+
+
+def get_mic_index(pa=None, device_table=None):
     # ================================
     # === Microphone Index取得関数 ===
     # ================================
-    pa = pyaudio.PyAudio()
+    # pa            : 使用するpyaudio.PyAudioクラスオブジェクト
+    #                 (Noneの場合は新規に生成し、デバイス一覧取得後に終了する
+    #                  / SyntheticPyAudio等の互換オブジェクトも指定可能)
+    # device_table  : gen_device_table()で生成済のデバイス一覧
+    #                 (指定時はPortAudioによるデバイス走査を行わない / AudioSessionのキャッシュ等)
+
+    if device_table is None:
+        if pa is None:
+            pa = pyaudio.PyAudio()
+            device_table = gen_device_table(pa)
+            pa.terminate()
+        else:
+            device_table = gen_device_table(pa)
+
     mic_list = []
 
     print("=== Audio Input Devices (Microphone) ===\n")
 
-    for host_index in range(0, pa.get_host_api_count()):  # Host APIで大分類
+    for host_api_info in device_table:  # Host APIで大分類
 
-        host_api_info = pa.get_host_api_info_by_index(host_index)
         print(
             "  --- Host API :",
             host_api_info["name"],
@@ -23,14 +58,7 @@ def get_mic_index():
             "] ---"
         )
 
-        for device_index in range(
-                0, pa.get_host_api_info_by_index(host_index)['deviceCount']
-        ):  # Deviceで小分類
-
-            dev_info = pa.get_device_info_by_host_api_device_index(
-                host_index,
-                device_index
-            )
+        for dev_info in host_api_info["devices"]:  # Deviceで小分類
 
             if dev_info["maxInputChannels"] != 0:
                 print(
@@ -44,8 +72,7 @@ def get_mic_index():
                     dev_info["maxOutputChannels"],
                     ")"
                 )
-                mic_list.append(
-                    pa.get_device_info_by_index(device_index)['index'])
+                mic_list.append(dev_info["index"])
 
         print("")
 
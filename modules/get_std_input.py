@@ -67,3 +67,35 @@ def get_selected_mic_index_by_std_input(mic_list):
     else:
         # selected_index : 標準入力にて選択されたmicrophone index
         return selected_index
+
+
+def get_selected_mic_indices_by_std_input(mic_list):
+    # ==========================================================
+    # === 標準入力にて選択された複数Microphone index取得関数 ===
+    # ==========================================================
+    # mic_list : microphone index list
+
+    # input関数で入力された値(カンマ区切り)を変数mic_indicesに代入
+    mic_indices = input(">>> Please INPUT Microphone-indices (comma separated) : ")
+
+    try:
+        selected_indices = [int(mic_index) for mic_index in mic_indices.split(",")]
+
+    except BaseException:
+        print("\n!!! Input Value Error, please Re-Input !!!\n")
+        return get_selected_mic_indices_by_std_input(mic_list)
+
+    if (len(selected_indices) == 0) or any(
+            selected_index not in mic_list for selected_index in selected_indices):
+        # 選択されたmicrophon indexが、mic index listに含まれない場合はinvalid
+        print("\n!!! Invalid input value range, please Re-Input !!!\n")
+        return get_selected_mic_indices_by_std_input(mic_list)
+
+    if len(set(selected_indices)) != len(selected_indices):
+        # 同じmicrophone indexが複数回選択された場合はinvalid
+        print("\n!!! Duplicated Microphone-index, please Re-Input !!!\n")
+        return get_selected_mic_indices_by_std_input(mic_list)
+
+    else:
+        # selected_indices : 標準入力にて選択されたmicrophone indexリスト
+        return selected_indices
@@ -0,0 +1,200 @@
+import threading
+import time
+
+# PortAudioのstream_callback status flag (pyaudio.paInputOverflow等と同値)
+# (pyaudio/PortAudioが使用できない環境でも動作するように、本モジュール内で定義する)
+paInputUnderflow = 1
+paInputOverflow = 2
+
+
+class InputOverflowMonitor:
+    # =====================================================
+    # === 入力オーバーフロー検出 & 欠落データ計数クラス ===
+    # =====================================================
+    # 入力音声ストリームのオーバーフロー(デバイスバッファ溢れによる入力音声の欠落)を検出し、
+    # オーバーフロー発生回数と欠落フレーム数を累積する
+    #   - Callbackモード : stream_callbackのstatus flag(paInputOverflow)と、
+    #                      time_infoのADC時刻(無い場合は到着時刻)の連続性から欠落フレーム数を算出
+    #   - Blockingモード : stream.read()は"exception_on_overflow=False"ではオーバーフローを通知しないため、
+    #                      ストリーム時刻(stream.get_time())の経過分と、受信済+読出し待ちフレーム数の差から算出
+    # (fill_gaps=Trueの場合、取得側は欠落フレーム数分の無音を挿入し、録音データの時間軸を実時間と一致させる)
+
+    def __init__(self, samplerate, frames_per_buffer, channels=1, fill_gaps=True, tolerance_frames=None):
+        # samplerate        : サンプリング周波数[Hz]
+        # frames_per_buffer : 入力音声ストリームバッファあたりのサンプリングデータ数
+        # channels          : チャンネル数 (1:モノラル / 2:ステレオ)
+        # fill_gaps         : 欠落区間に無音を挿入する(True) / 欠落区間を詰めて連結する(False)
+        # tolerance_frames  : 欠落と判定しない時刻ずれの許容フレーム数
+        #                     (Noneの場合は読出し/callback毎のフレーム数 / ストリーム時刻の揺らぎを欠落と誤検出しないため)
+        #                     (バッファサイズ自動調整で読出しサイズが変わっても、読出しサイズに応じた許容値とする)
+
+        self.samplerate = samplerate
+        self.frames_per_buffer = frames_per_buffer
+        self.channels = channels
+        self.fill_gaps = fill_gaps
+        self.tolerance_frames = tolerance_frames
+
+        # 累積カウンタ
+        self.overflow_count = 0         # オーバーフロー発生回数
+        self.dropped_frames = 0         # 欠落フレーム数 (推定値)
+        self.captured_frames = 0        # 受信済フレーム数
+        # 欠落区間のリスト [(欠落開始位置[frame], 欠落フレーム数), ...]
+        # (欠落開始位置は、欠落分を含めた実時間軸上の先頭からのフレーム数)
+        self.gaps = []
+
+        # 直近に受信したブロックの直前で欠落したフレーム数 (取得側での無音挿入に使用)
+        self.last_gap_frames = 0
+
+        # 直前ブロックの時刻情報 (連続性の判定に使用)
+        self.last_stream_time = None
+        self.last_read_available = 0
+        self.last_adc_time = None
+        self.last_arrival_time = None
+        self.last_frame_count = 0
+
+        # (Callbackモードではcallbackスレッドから記録されるため、ロックで保護する)
+        self.lock = threading.Lock()
+
+    def _get_tolerance_frames(self, frame_count):
+        # 欠落と判定しない時刻ずれの許容フレーム数 (tolerance_frames未指定の場合は今回のフレーム数)
+        if self.tolerance_frames is None:
+            return frame_count
+
+        return self.tolerance_frames
+
+    def _record(self, frame_count, dropped_frames, overflowed):
+        # 受信したブロックと、その直前の欠落を記録する
+        with self.lock:
+            if overflowed or (dropped_frames > 0):
+                self.overflow_count += 1
+            if dropped_frames > 0:
+                self.gaps.append((self.captured_frames + self.dropped_frames, dropped_frames))
+                self.dropped_frames += dropped_frames
+
+            self.captured_frames += frame_count
+            self.last_gap_frames = dropped_frames
+
+    def check_read(self, stream, frame_count):
+        # =============================================
+        # === Blockingモード オーバーフロー検出関数 ===
+        # =============================================
+        # stream        : 入力音声ストリーム (stream.read()の完了直後に呼び出す)
+        # frame_count   : stream.read()で読出したフレーム数
+        #
+        # (get_time()/get_read_available()を持たない入力ソース(AudioReplaySource等)は
+        #  オーバーフローが発生しないため、受信済フレーム数のみを計数する)
+
+        if not (hasattr(stream, "get_time") and hasattr(stream, "get_read_available")):
+            self._record(frame_count, 0, False)
+            return 0
+
+        stream_time = stream.get_time()
+        read_available = stream.get_read_available()
+
+        dropped_frames = 0
+        if self.last_stream_time is not None:
+            # デバイス側で経過したフレーム数 - (今回受信したフレーム数 + 読出し待ちフレーム数の増分)
+            elapsed_frames = round((stream_time - self.last_stream_time) * self.samplerate)
+            received_frames = frame_count + read_available - self.last_read_available
+            if elapsed_frames - received_frames > self._get_tolerance_frames(frame_count):
+                dropped_frames = elapsed_frames - received_frames
+
+        self.last_stream_time = stream_time
+        self.last_read_available = read_available
+
+        self._record(frame_count, dropped_frames, False)
+
+        # dropped_frames : 今回受信したブロックの直前で欠落したフレーム数
+        return dropped_frames
+
+    def check_callback(self, frame_count, time_info, status, arrival_time=None, block_frames=None):
+        # =============================================
+        # === Callbackモード オーバーフロー検出関数 ===
+        # =============================================
+        # frame_count   : stream_callbackのframe_count
+        # time_info     : stream_callbackのtime_info
+        # status        : stream_callbackのstatus flag
+        # arrival_time  : callbackの到着時刻[s] (time.monotonic()基準 / Noneの場合は現在時刻)
+        # block_frames  : ADC時刻の連続性判定に使用するブロックの時間長[frames] (Noneの場合はframe_count)
+        #                 (サンプリング周波数変換時は、変換後のフレーム数がブロック毎に異なるため、
+        #                  デバイスブロックの時間長を解析用サンプリング周波数で換算した値を指定する)
+
+        if block_frames is None:
+            block_frames = frame_count
+
+        if arrival_time is None:
+            arrival_time = time.monotonic()
+
+        overflowed = bool(status & paInputOverflow)
+
+        # (ADC時刻を提供しないHost APIでは"0"となるため、その場合はNoneとする)
+        adc_time = time_info.get("input_buffer_adc_time", 0)
+        if adc_time <= 0:
+            adc_time = None
+
+        dropped_frames = 0
+        if (adc_time is not None) and (self.last_adc_time is not None):
+            # ADC時刻の連続性から算出 (直前ブロックの先頭 + 直前ブロック長 = 今回ブロックの先頭)
+            elapsed_frames = round((adc_time - self.last_adc_time) * self.samplerate)
+            dropped_frames = round(elapsed_frames - self.last_frame_count)
+            if dropped_frames <= self._get_tolerance_frames(block_frames) // 2:
+                dropped_frames = 0
+        elif overflowed and (self.last_arrival_time is not None):
+            # ADC時刻が無い場合は、status flagでオーバーフローが通知された時のみ到着時刻の間隔から推定する
+            elapsed_frames = round((arrival_time - self.last_arrival_time) * self.samplerate)
+            dropped_frames = max(round(elapsed_frames - block_frames), 0)
+
+        self.last_adc_time = adc_time
+        self.last_arrival_time = arrival_time
+        self.last_frame_count = block_frames
+
+        self._record(frame_count, dropped_frames, overflowed)
+
+        # dropped_frames : 今回受信したブロックの直前で欠落したフレーム数
+        return dropped_frames
+
+    def gen_silence(self, frames, itemsize):
+        # ====================================
+        # === 欠落区間の無音データ生成関数 ===
+        # ====================================
+        # frames    : 無音のフレーム数
+        # itemsize  : 1サンプルあたりのバイト数
+        # (整数/浮動小数点のいずれのフォーマットも、全ビット0が無音となる)
+
+        # silence : 無音の離散データ (bytes / チャンネル間インターリーブ)
+        return bytes(frames * self.channels * itemsize)
+
+    def get_stats(self):
+        # ==========================================
+        # === オーバーフロー累積カウンタ取得関数 ===
+        # ==========================================
+
+        with self.lock:
+            stats = {
+                "overflow_count": self.overflow_count,
+                "dropped_frames": self.dropped_frames,
+                "dropped_time": self.dropped_frames / self.samplerate,
+                "captured_frames": self.captured_frames,
+                "gaps": list(self.gaps),
+            }
+
+        # stats : オーバーフロー発生回数/欠落フレーム数/欠落時間[s]/受信済フレーム数/欠落区間のリスト
+        return stats
+
+    def print_report(self):
+        # ===================================================
+        # === オーバーフロー累積カウンタ レポート出力関数 ===
+        # ===================================================
+        stats = self.get_stats()
+
+        print("")
+        print("=== Input Overflow Report ===")
+        print("  overflow count   : ", stats["overflow_count"])
+        print("  dropped frames   : ", stats["dropped_frames"], "(", round(stats["dropped_time"], 3), "[s] )")
+        print("  captured frames  : ", stats["captured_frames"])
+        for position, frames in stats["gaps"]:
+            print(
+                "  - gap at", round(position / self.samplerate, 3), "[s] :",
+                frames, "frames", "(filled with silence)" if self.fill_gaps else ""
+            )
+        print("")
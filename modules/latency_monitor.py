@@ -0,0 +1,158 @@
+import collections
+import threading
+import time
+
+import numpy as np
+
+
+def gen_block_stamp(stream, samplerate, ring_buffer=None):
+    # ================================================
+    # === 入力音声ブロックのタイムスタンプ生成関数 ===
+    # ================================================
+    # stream        : 入力音声ストリーム (get_input_latency()を使用)
+    # samplerate    : サンプリング周波数[Hz]
+    # ring_buffer   : Callbackモードで入力音声データが書込まれるAudioRingBuffer
+    #                 (Noneの場合はBlockingモードとして、stream.read()の完了直後に呼び出す)
+    #
+    # 時刻は全てtime.monotonic()基準[s]とする
+    # (PortAudioのtime_infoはストリーム時刻基準のため、callback到着時刻との差分でmonotonic基準に換算する)
+
+    block_time_info = None if ring_buffer is None else ring_buffer.block_time_info
+
+    if block_time_info is None:
+        # Blockingモード (または、callbackが未到着) の場合、データ到着時刻は現在時刻とし、
+        # 最新サンプルのADC時刻は、ストリームの入力レイテンシから推定する
+        arrival_time = time.monotonic()
+        adc_time = arrival_time - stream.get_input_latency()
+    else:
+        # Callbackモードの場合、最新のcallbackのtime_infoからADC時刻を算出する
+        adc_time_first, frame_count, arrival_time = block_time_info
+        if adc_time_first is None:
+            # time_infoにADC時刻が無いHost APIの場合は、入力レイテンシから推定する
+            adc_time = arrival_time - stream.get_input_latency()
+        else:
+            # ブロック先頭サンプルのADC時刻 + ブロック長 = 最新サンプルのADC時刻
+            adc_time = adc_time_first + frame_count / samplerate
+
+    stamp = {
+        "adc_time": adc_time,
+        "arrival_time": arrival_time,
+        "last_time": arrival_time,
+    }
+
+    # stamp : 入力音声ブロックのタイムスタンプ
+    #         (adc_time     : ブロック内最新サンプルのADC時刻[s]
+    #          arrival_time : ブロックがアプリケーションに到着した時刻[s]
+    #          last_time    : 直前の処理ステージの完了時刻[s] (LatencyMonitor.mark()で更新))
+    return stamp
+
+
+class LatencyMonitor:
+    # ========================================
+    # === 取得 → 表示 レイテンシ計測クラス ===
+    # ========================================
+    # 入力音声ブロックのタイムスタンプ(gen_block_stamp())を解析/描画まで持ち回り、
+    # ステージ毎のレイテンシとADC時刻から表示までのEnd-to-Endレイテンシを記録する
+    #   - "input"       : ADC時刻 → アプリケーション到着 (デバイス/ドライバのレイテンシ)
+    #   - mark()の各ステージ : 直前のステージ完了 → 当該ステージ完了
+    #   - "end_to_end"  : ADC時刻 → 表示完了 (表示データの古さ)
+    # (複数スレッドから記録できるようにロックで保護する)
+
+    def __init__(self, max_samples=10000, report_interval=0):
+        # max_samples       : ステージ毎に保持する計測値の最大数 (古いものから破棄)
+        # report_interval   : print_report_if_due()によるレポート出力間隔[s] ("0"以下の場合は出力しない)
+
+        self.max_samples = max_samples
+        self.report_interval = report_interval
+
+        self.samples = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.last_report_time = time.monotonic()
+
+    def record(self, stage, latency):
+        # ==================================
+        # === レイテンシ計測値の記録関数 ===
+        # ==================================
+        # stage     : ステージ名
+        # latency   : レイテンシ[s]
+
+        with self.lock:
+            if stage not in self.samples:
+                self.samples[stage] = collections.deque(maxlen=self.max_samples)
+            self.samples[stage].append(latency)
+
+    def begin(self, stamp):
+        # =====================================================
+        # === 入力音声ブロックの計測開始関数 (到着時に呼出) ===
+        # =====================================================
+        # stamp : gen_block_stamp()で生成したタイムスタンプ
+        self.record("input", stamp["arrival_time"] - stamp["adc_time"])
+
+    def mark(self, stamp, stage):
+        # ======================================
+        # === 処理ステージ完了時刻の記録関数 ===
+        # ======================================
+        # stamp : gen_block_stamp()で生成したタイムスタンプ
+        # stage : 完了したステージ名 (例："analysis" / "render")
+
+        now = time.monotonic()
+        self.record(stage, now - stamp["last_time"])
+        stamp["last_time"] = now
+
+    def finish(self, stamp):
+        # =========================================================
+        # === 入力音声ブロックの計測終了関数 (表示完了時に呼出) ===
+        # =========================================================
+        # stamp : gen_block_stamp()で生成したタイムスタンプ
+        self.record("end_to_end", time.monotonic() - stamp["adc_time"])
+
+    def get_stats(self):
+        # =============================================
+        # === ステージ毎のレイテンシ統計値 取得関数 ===
+        # =============================================
+
+        with self.lock:
+            samples = {stage: np.array(values) for stage, values in self.samples.items()}
+
+        stats = collections.OrderedDict()
+        for stage, values in samples.items():
+            if len(values) == 0:
+                continue
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            stats[stage] = {
+                "count": len(values),
+                "p50": p50,
+                "p95": p95,
+                "p99": p99,
+                "max": np.max(values),
+            }
+
+        # stats : ステージ名 → 計測数/p50/p95/p99/最大値[s]
+        return stats
+
+    def print_report(self):
+        # =========================================
+        # === レイテンシ統計値 レポート出力関数 ===
+        # =========================================
+        print("")
+        print("=== Latency Report [ms] ===")
+        print("  stage".ljust(16), "count".rjust(7), "p50".rjust(9), "p95".rjust(9), "p99".rjust(9), "max".rjust(9))
+
+        for stage, stat in self.get_stats().items():
+            print(
+                ("  " + stage).ljust(16),
+                str(stat["count"]).rjust(7),
+                *[str(round(stat[key] * 1000, 2)).rjust(9) for key in ("p50", "p95", "p99", "max")]
+            )
+        print("")
+
+        self.last_report_time = time.monotonic()
+
+    def print_report_if_due(self):
+        # =============================================
+        # === レイテンシ統計値 定期レポート出力関数 ===
+        # =============================================
+        # (report_intervalが経過している場合のみ出力する)
+
+        if (self.report_interval > 0) and (time.monotonic() - self.last_report_time >= self.report_interval):
+            self.print_report()
@@ -0,0 +1,161 @@
+import numpy as np
+import pyaudio
+
+from .audio_ring_buffer import AudioRingBuffer
+from .audio_signal_processing_basic import (deinterleave_channels,
+                                            discrete_data_normalize,
+                                            get_sample_dtype)
+from .audio_stream import audio_stream_open
+from .gen_multi_channel_data import gen_multi_channel_executor
+
+
+class MultiMicCapture:
+    # =======================================================
+    # === 複数Microphone 同時入力音声ストリーム取得クラス ===
+    # =======================================================
+    # 1つのPortAudioインスタンス(pyaudio.PyAudio)上で複数のマイク入力ストリームを
+    # Callbackモードで同時に開き、マイク毎のリングバッファに入力音声を書込む
+    # (解析は全マイク共通のワーカープールで実行するため、scipy/librosa/pyworldの
+    #  import/初期化コストおよびメモリ使用量は、マイク数に関わらず1プロセス分となる)
+
+    def __init__(
+        self,
+        indices,
+        mic_mode,
+        samplerate,
+        frames_per_buffer,
+        ring_buffer_count=4,
+        max_workers=None,
+        pa=None,
+        sample_format="int16"
+    ):
+        # indices               : 使用するマイクのdevice indexリスト
+        # mic_mode              : マイクモード (1:モノラル / 2:ステレオ)
+        # samplerate            : サンプリング周波数[sampling data count/s)]
+        # frames_per_buffer     : 入力音声ストリームバッファあたりのサンプリングデータ数
+        # ring_buffer_count     : リングバッファに保持する入力音声ストリームバッファ数
+        # max_workers           : 解析ワーカースレッド数 (Noneの場合はマイク数)
+        # pa                    : 使用するpyaudio.PyAudioクラスオブジェクト
+        #                         (Noneの場合はstart()時に新規に生成 / AudioSession等も指定可能)
+        #                         (stop()時にterminate()する)
+        # sample_format         : サンプルフォーマット ("int16" / "int24" / "int32" / "float32")
+
+        self.indices = list(indices)
+        self.mic_mode = mic_mode
+        self.samplerate = samplerate
+        self.frames_per_buffer = frames_per_buffer
+        self.sample_format = sample_format
+
+        # マイク毎のリングバッファ (device index → AudioRingBuffer)
+        self.ring_buffers = {
+            index: AudioRingBuffer(
+                frames_per_buffer * ring_buffer_count, mic_mode, get_sample_dtype(sample_format))
+            for index in self.indices
+        }
+
+        if max_workers is None:
+            max_workers = len(self.indices)
+        self.executor = gen_multi_channel_executor(max_workers)
+
+        self.pa = pa
+        self.streams = {}
+
+    def start(self):
+        # ==================================================
+        # === 全Microphone入力音声ストリーム取得開始関数 ===
+        # ==================================================
+        if self.pa is None:
+            self.pa = pyaudio.PyAudio()
+
+        for index in self.indices:
+            self.streams[index] = audio_stream_open(
+                self.pa,
+                index,
+                self.mic_mode,
+                self.samplerate,
+                self.frames_per_buffer,
+                self.ring_buffers[index],
+                self.sample_format
+            )
+
+    def stop(self):
+        # ==================================================
+        # === 全Microphone入力音声ストリーム取得停止関数 ===
+        # ==================================================
+        for stream in self.streams.values():
+            stream.stop_stream()
+            stream.close()
+        self.streams = {}
+
+        if self.pa is not None:
+            self.pa.terminate()
+            self.pa = None
+
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def gen_time_domain_data(self, index, frames=None):
+        # ==========================================================
+        # === 時間領域波形データ生成関数 (マイク指定/最新データ) ===
+        # ==========================================================
+        # index     : マイクのdevice index
+        # frames    : 取得するフレーム数 (Noneの場合はframes_per_buffer)
+
+        if frames is None:
+            frames = self.frames_per_buffer
+
+        discrete_data, write_count = self.ring_buffers[index].read_latest(frames)
+        data_normalized = discrete_data_normalize(discrete_data, self.sample_format)
+
+        # ステレオの場合は、チャンネル毎のview(データコピーなし)に分離
+        if self.mic_mode > 1:
+            data_normalized = deinterleave_channels(data_normalized, self.mic_mode)
+
+        # data_normalized : 時間領域波形データ(正規化済)
+        return data_normalized
+
+    def analyze(self, analysis_func, *args, frames=None, index_args=None):
+        # ========================================================
+        # === 全Microphone 解析データ生成関数 (ワーカープール) ===
+        # ========================================================
+        # analysis_func     : 時間領域波形データ(正規化済)を第1引数とする解析関数
+        # args              : analysis_funcへ渡す第2引数以降
+        # frames            : 解析するフレーム数 (Noneの場合はframes_per_buffer)
+        # index_args        : マイク毎にargsの後に追加で渡す引数 (device index → tuple)
+        #                     (マイク毎に状態を持つ判定器等を渡す場合に使用する)
+
+        if index_args is None:
+            index_args = {}
+
+        futures = {
+            index: self.executor.submit(
+                analysis_func, self.gen_time_domain_data(index, frames), *args, *index_args.get(index, ()))
+            for index in self.indices
+        }
+
+        results = {index: future.result() for index, future in futures.items()}
+
+        # results : マイク毎の解析結果 (device index → analysis_func戻り値)
+        return results
+
+
+def gen_level_data(data_normalized):
+    # ===========================================
+    # === 入力音声レベル(RMS)[dB FS] 算出関数 ===
+    # ===========================================
+    # data_normalized : 時間領域波形データ(正規化済)
+    #                   (2次元配列(チャンネル数, フレーム数)の場合はチャンネル毎に算出する)
+
+    rms = np.sqrt(np.mean(np.square(data_normalized, dtype=np.float64), axis=-1))
+
+    with np.errstate(divide='ignore'):
+        level = 20 * np.log10(rms)
+
+    # level : 入力音声レベル(RMS)[dB FS] (2次元配列の場合はチャンネル毎の1次元配列)
+    return level
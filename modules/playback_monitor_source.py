@@ -0,0 +1,195 @@
+import time
+
+import numpy as np
+import pyaudio
+
+from .audio_replay_source import AudioReplaySource
+from .audio_signal_processing_basic import (discrete_data_quantize,
+                                            get_sample_dtype)
+from .audio_stream import SAMPLE_FORMATS
+
+
+class PlaybackMonitorSource(AudioReplaySource):
+    # =======================================================
+    # === 音声ファイル 再生 & 解析モニタ 入力ソースクラス ===
+    # =======================================================
+    # 音声ファイルをCallbackモードの出力ストリームでスピーカーから再生しつつ、
+    # 再生中(聴こえている)位置の音声データを、AudioReplaySourceと同じread()インタフェースで解析側へ供給する
+    # (マイクでの再取得(別スクリプトでの再生/録音)を行わずに、再生音と解析結果の表示を同期させる)
+    #   - 再生側(stream_callback) : 再生バッファ(読込み専用memoryview)のスライスを返し、出力位置と
+    #                               time_info(DAC時刻)を公開する
+    #   - 解析側(read())          : 出力位置とDAC時刻から現在聴こえている位置を算出し、その位置までの
+    #                               最新num_framesフレームを、同じ再生バッファのスライスとして返す
+    # (再生と解析は同じ再生バッファを共有するため、出力した音声データそのものを解析し、データコピーも発生しない)
+    # (再生バッファは、ファイル読込み時にsamplerate/channels/sample_formatへ1度だけ変換して保持する)
+
+    def __init__(
+        self,
+        source,
+        samplerate,
+        channels=1,
+        sample_format="int16",
+        output_frames_per_buffer=512,
+        latest_only=True
+    ):
+        # source                    : 音声ファイル名(WAV/FLAC) または 音声データ numpy配列
+        # samplerate                : 再生/解析のサンプリング周波数[Hz]
+        #                             (ファイルのサンプリング周波数と異なる場合はsoxrで変換する)
+        # channels                  : 再生/解析のチャンネル数 (1:モノラル / 2:ステレオ)
+        # sample_format             : 再生/解析のサンプルフォーマット ("int16" / "int24" / "int32" / "float32")
+        # output_frames_per_buffer  : 出力ストリームバッファあたりのフレーム数
+        # latest_only               : 解析が再生に遅れた場合に、最新の再生位置まで読飛ばす(True) /
+        #                             読飛ばさずに連続して読出す(False / レコーディングモード向け)
+
+        super().__init__(source, samplerate, channels, paced=False, loop=False, sample_format=sample_format)
+
+        self.output_frames_per_buffer = output_frames_per_buffer
+        self.latest_only = latest_only
+
+        # 再生バッファ (sample_formatで量子化済 / チャンネル間インターリーブ)
+        # (AudioReplaySourceはint16以外を正規化済float32で保持するため、sample_formatへ1度だけ量子化する)
+        if sample_format == "int16":
+            play_data = self.data
+        else:
+            play_data = np.frombuffer(discrete_data_quantize(self.data, sample_format), np.uint8)
+        self.frame_bytes = get_sample_dtype(sample_format).itemsize * channels
+        self.play_buffer = memoryview(np.ascontiguousarray(play_data)).cast("B").toreadonly()
+
+        # 出力位置とDAC時刻 (stream_callbackが更新する)
+        # (ブロック先頭の出力位置[frame], ブロック末尾の出力位置[frame],
+        #  ブロック先頭サンプルのDAC時刻 - callback時刻[s] (不明の場合はNone), callback到着時刻[s]) ※time.monotonic()基準
+        self.output_info = None
+        self.output_position = 0
+
+        # 解析が再生に遅れて読飛ばしたフレーム数
+        self.skipped_frames = 0
+
+        self.pa = None
+        self.output_stream = None
+
+    def open(self, pa, output_device_index=None):
+        # ====================================
+        # === 再生用出力ストリーム生成関数 ===
+        # ====================================
+        # pa                    : 使用するpyaudio.PyAudio (またはAudioSession)
+        # output_device_index   : 出力デバイスのdevice index (Noneの場合はデフォルト出力デバイス)
+        # (生成と同時に再生を開始する)
+
+        self.pa = pa
+        self.output_stream = pa.open(
+            format=SAMPLE_FORMATS[self.sample_format],
+            channels=self.channels,
+            rate=self.samplerate,
+            frames_per_buffer=self.output_frames_per_buffer,
+            output=True,
+            output_device_index=output_device_index,
+            stream_callback=self.callback
+        )
+        self.start_time = time.monotonic()
+
+        # output_stream : 生成したpyaudio.PyAudio.Streamオブジェクト (出力)
+        return self.output_stream
+
+    def callback(self, in_data, frame_count, time_info, status):
+        # ==================================================
+        # === 再生用stream_callback関数 (Callbackモード) ===
+        # ==================================================
+        arrival_time = time.monotonic()
+
+        start = self.output_position
+        end = min(start + frame_count, self.total_frames)
+        self.output_position = end
+
+        # DAC時刻を提供しないHost APIでは"0"となるため、その場合はNoneとする
+        dac_time = time_info.get("output_buffer_dac_time", 0)
+        if dac_time > 0:
+            dac_delay = dac_time - time_info.get("current_time", 0)
+        else:
+            dac_delay = None
+
+        # 出力位置の公開 (タプルの代入のみのため、解析側はロックなしで参照できる)
+        self.output_info = (start, end, dac_delay, arrival_time)
+
+        block = self.play_buffer[start * self.frame_bytes:end * self.frame_bytes]
+
+        if end >= self.total_frames:
+            return (block, pyaudio.paComplete)
+
+        # (再生ブロック(読込み専用memoryview), paContinue / 最終ブロックの場合はpaComplete)
+        return (block, pyaudio.paContinue)
+
+    def get_heard_position(self):
+        # ================================================
+        # === 現在聴こえている再生位置[frame] 算出関数 ===
+        # ================================================
+        output_info = self.output_info
+        if output_info is None:
+            return 0
+
+        start, end, dac_delay, arrival_time = output_info
+
+        # DAC時刻が不明の場合は、出力ストリームの出力レイテンシから推定する
+        if dac_delay is None:
+            dac_delay = self.output_stream.get_output_latency()
+
+        # 直前に出力したブロック先頭のDAC時刻からの経過時間分だけ進める (ブロック末尾を上限とする)
+        elapsed = time.monotonic() - arrival_time - dac_delay
+        heard_position = start + int(elapsed * self.samplerate)
+
+        # heard_position : 現在聴こえている再生位置[frame]
+        return min(max(heard_position, 0), end)
+
+    def read(self, num_frames, exception_on_overflow=True):
+        # ========================================================
+        # === 再生中の音声データ読出し関数 (Stream.read()互換) ===
+        # ========================================================
+        # num_frames                : 読出すフレーム数
+        # exception_on_overflow     : pyaudio.PyAudio.Stream.read()互換の引数 (未使用)
+
+        if self.position >= self.total_frames:
+            raise EOFError("playback reached the end of data")
+
+        target = self.position + num_frames
+
+        # 前回の読出し位置からnum_frames分が再生される(聴こえる)まで待機する
+        # (再生が終了/停止した場合は、出力済の位置までとする)
+        while True:
+            heard_position = self.get_heard_position()
+            if heard_position >= min(target, self.total_frames):
+                break
+            if not self.output_stream.is_active():
+                heard_position = self.output_position
+                break
+            time.sleep(min(target - heard_position, self.output_frames_per_buffer) / self.samplerate)
+
+        # 解析が再生に遅れた場合は、現在聴こえている位置までの最新num_framesフレームとする
+        if self.latest_only:
+            end = max(heard_position, target)
+        else:
+            end = target
+        self.skipped_frames += end - target
+        start = end - num_frames
+        self.position = end
+        self.frames_read += num_frames
+
+        if end > self.total_frames:
+            # 終端に到達した場合は不足分を0埋めする (終端ブロックのみデータコピーが発生する)
+            block = bytearray(num_frames * self.frame_bytes)
+            valid = self.play_buffer[start * self.frame_bytes:]
+            block[:len(valid)] = valid
+            return bytes(block)
+
+        # block : 入力音声データ (再生バッファのスライス / 読込み専用memoryview)
+        return self.play_buffer[start * self.frame_bytes:end * self.frame_bytes]
+
+    # === pyaudio.PyAudio.Stream互換メソッド ===
+    def stop_stream(self):
+        self.active = False
+        if self.output_stream is not None:
+            self.output_stream.stop_stream()
+
+    def close(self):
+        self.active = False
+        if self.output_stream is not None:
+            self.output_stream.close()
+            self.output_stream = None
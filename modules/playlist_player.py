@@ -0,0 +1,233 @@
+import queue
+import threading
+
+import numpy as np
+import soundfile as sf
+import soxr
+
+from .audio_signal_processing_basic import (discrete_data_quantize,
+                                            get_sample_dtype)
+
+# stream_callbackの戻り値 (pyaudio.paContinue等と同値)
+# (pyaudio/PortAudioが使用できない環境でも動作するように、本モジュール内で定義する)
+paContinue = 0
+paComplete = 1
+
+
+class PlaylistPlayer:
+    # ===========================================
+    # === プレイリスト ギャップレス再生クラス ===
+    # ===========================================
+    # 1つの出力ストリームを開いたまま、複数の音声ファイル(WAV/FLAC/OGG等)を連続再生する
+    #   - デコードスレッド : 次以降のファイルをsoundfileでデコードし、出力ストリームのチャンネル数/
+    #                        サンプリング周波数(soxr)/サンプルフォーマットに変換して、上限付きの先読みキューに格納する
+    #   - stream_callback  : 先読みキューから取出したデコード済データを切出して返す
+    #                        (ファイル境界をまたぐブロックは前後のファイルを連結するため、無音の挿入なく
+    #                         サンプル単位で連続して再生される / ディスク読込み・デコードを待つことはない)
+    # (先読みが間に合わない場合は、stream_callbackを待たせずに無音を出力してアンダーランとして計数する)
+
+    def __init__(
+        self,
+        filenames,
+        samplerate=None,
+        channels=None,
+        sample_format="float32",
+        frames_per_buffer=1024,
+        prefetch_count=2,
+        quality="HQ"
+    ):
+        # filenames         : 再生する音声ファイル名のリスト (再生順)
+        # samplerate        : 出力ストリームのサンプリング周波数[Hz] (Noneの場合は先頭ファイルのサンプリング周波数)
+        # channels          : 出力ストリームのチャンネル数 (Noneの場合は先頭ファイルのチャンネル数)
+        # sample_format     : 出力ストリームのサンプルフォーマット ("int16" / "int24" / "int32" / "float32")
+        # frames_per_buffer : 出力ストリームバッファあたりのフレーム数
+        # prefetch_count    : 先読みキューに保持するデコード済ファイル数の上限
+        # quality           : サンプリング周波数変換(soxr)の変換品質 ("QQ" / "LQ" / "MQ" / "HQ" / "VHQ")
+
+        if len(filenames) == 0:
+            raise ValueError("filenames must not be empty")
+
+        if (samplerate is None) or (channels is None):
+            info = sf.info(filenames[0])
+            if samplerate is None:
+                samplerate = info.samplerate
+            if channels is None:
+                channels = info.channels
+
+        self.filenames = list(filenames)
+        self.samplerate = samplerate
+        self.channels = channels
+        self.sample_format = sample_format
+        self.frames_per_buffer = frames_per_buffer
+        self.quality = quality
+        self.frame_bytes = channels * get_sample_dtype(sample_format).itemsize
+
+        # 先読みキュー (要素：(ファイルインデックス, デコード済データのmemoryview) / 終端はNone)
+        self.prefetch_queue = queue.Queue(maxsize=prefetch_count)
+
+        # 再生中のファイル (stream_callbackスレッドのみが更新する)
+        self.current = None
+        self.current_position = 0
+        self.now_playing = None
+
+        # ファイル境界をまたぐブロック/アンダーラン時の出力バッファ (stream_callbackの戻り値は読込み専用とする)
+        self.out_buffer = bytearray(frames_per_buffer * self.frame_bytes)
+        self.out_view = memoryview(self.out_buffer).toreadonly()
+
+        # 計測カウンタ
+        self.played_frames = 0
+        self.underrun_count = 0
+        self.underrun_frames = 0
+        self.skipped_files = []
+        self.finished = False
+
+        self.stop_event = threading.Event()
+        self.decode_thread = threading.Thread(target=self._decode_loop, daemon=True)
+
+    def start(self):
+        # =======================================
+        # === デコード/先読みスレッド開始関数 ===
+        # =======================================
+        # (出力ストリーム生成前に呼び出し、先頭ファイルのデコード完了まで待機する)
+
+        self.decode_thread.start()
+
+        # 先頭ファイルを先読みキューから取出しておく (再生開始直後のアンダーランを防ぐ)
+        self._next_file(block=True)
+
+    def stop(self):
+        # =======================================
+        # === デコード/先読みスレッド停止関数 ===
+        # =======================================
+        self.stop_event.set()
+        self.decode_thread.join()
+
+    def decode_file(self, filename):
+        # ====================================================
+        # === 音声ファイル デコード & フォーマット変換関数 ===
+        # ====================================================
+        # filename : 音声ファイル名 (WAV/FLAC/OGG等 soundfileでデコードできる形式)
+
+        data, samplerate = sf.read(filename, dtype="float32", always_2d=True)
+
+        # チャンネル数を出力ストリームに合わせる (モノラル → 複数チャンネルは複製 / 複数チャンネル → モノラルは平均)
+        if data.shape[1] != self.channels:
+            if data.shape[1] == 1:
+                data = np.repeat(data, self.channels, axis=1)
+            elif self.channels == 1:
+                data = np.mean(data, axis=1, keepdims=True)
+            else:
+                raise ValueError(
+                    "cannot convert " + str(data.shape[1]) + " channels to " + str(self.channels) + " channels"
+                )
+
+        # サンプリング周波数を出力ストリームに合わせる
+        if samplerate != self.samplerate:
+            data = soxr.resample(data, samplerate, self.samplerate, quality=self.quality)
+
+        # discrete_data : 出力ストリームのサンプルフォーマットで量子化した離散データ (bytes / チャンネル間インターリーブ)
+        return discrete_data_quantize(data.reshape(-1), self.sample_format)
+
+    def _decode_loop(self):
+        # デコード/先読みスレッド本体
+        # (先読みキューが上限に達している間は待機し、再生の進行に合わせて次のファイルをデコードする)
+        for index, filename in enumerate(self.filenames):
+            try:
+                discrete_data = self.decode_file(filename)
+            except (RuntimeError, ValueError) as e:
+                # デコードできないファイルはスキップする
+                print("Playlist : skipped", filename, "(", e, ")")
+                self.skipped_files.append(filename)
+                continue
+
+            if not self._put((index, memoryview(discrete_data))):
+                return
+
+        # 終端
+        self._put(None)
+
+    def _put(self, item):
+        # 先読みキューへ格納 (停止要求があるまで空きを待つ)
+        while not self.stop_event.is_set():
+            try:
+                self.prefetch_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _next_file(self, block=False):
+        # 先読みキューから次のファイルを取出す
+        # (stream_callbackからはblock=Falseで呼び出し、デコード済データが無い場合は待たずにFalseを返す)
+        try:
+            item = self.prefetch_queue.get(block=block)
+        except queue.Empty:
+            return False
+
+        if item is None:
+            self.finished = True
+            self.current = None
+            return False
+
+        self.now_playing, self.current = item
+        self.current_position = 0
+        return True
+
+    def callback(self, in_data, frame_count, time_info, status):
+        # ==================================================
+        # === 再生用stream_callback関数 (Callbackモード) ===
+        # ==================================================
+        # (pyaudio.PyAudio.open()のstream_callbackに指定する / 引数はpyaudioのstream_callbackと同じ)
+
+        block_bytes = frame_count * self.frame_bytes
+        position = self.current_position
+
+        # 再生中のファイル内で完結するブロックは、デコード済データをそのまま切出して返す (コピーなし)
+        if (self.current is not None) and (position + block_bytes <= len(self.current)):
+            self.current_position = position + block_bytes
+            self.played_frames += frame_count
+            return (self.current[position:self.current_position], paContinue)
+
+        if block_bytes > len(self.out_buffer):
+            self.out_buffer = bytearray(block_bytes)
+            self.out_view = memoryview(self.out_buffer).toreadonly()
+
+        # ファイル境界をまたぐブロックは、次のファイルの先頭を連結して返す (ギャップレス)
+        filled = 0
+        while filled < block_bytes:
+            if (self.current is None) or (self.current_position >= len(self.current)):
+                if self.finished or not self._next_file():
+                    break
+
+            length = min(block_bytes - filled, len(self.current) - self.current_position)
+            self.out_buffer[filled:filled + length] = \
+                self.current[self.current_position:self.current_position + length]
+            self.current_position += length
+            filled += length
+
+        self.played_frames += filled // self.frame_bytes
+
+        if self.finished:
+            # 全ファイルの再生完了 (要求フレーム数未満のデータを返すと、ストリームはそのデータの再生後に停止する)
+            return (self.out_view[:filled], paComplete)
+
+        if filled < block_bytes:
+            # 先読みが間に合わない場合は、残りを無音で埋める (アンダーラン)
+            # (整数/浮動小数点のいずれのフォーマットも、全ビット0が無音となる)
+            self.out_buffer[filled:block_bytes] = bytes(block_bytes - filled)
+            self.underrun_count += 1
+            self.underrun_frames += (block_bytes - filled) // self.frame_bytes
+
+        # (再生ブロック(読込み専用memoryview), paContinue / 全ファイルの再生完了時はpaComplete)
+        return (self.out_view[:block_bytes], paContinue)
+
+    def print_report(self):
+        # =============================================
+        # === プレイリスト再生 計測カウンタ出力関数 ===
+        # =============================================
+        print("")
+        print("=== Playlist Playback Report ===")
+        print("  files            : ", len(self.filenames), "( skipped :", len(self.skipped_files), ")")
+        print("  played frames    : ", self.played_frames, "(", round(self.played_frames / self.samplerate, 3), "[s] )")
+        print("  underrun count   : ", self.underrun_count, "(", self.underrun_frames, "frames )")
+        print("")
@@ -266,9 +266,10 @@ def plot_time_and_freq(
     fig.tight_layout()
 
     # 時間領域波形データプロット
+    # (マルチチャンネル(チャンネル数, データ数)の場合は、以降の各データを転置してチャンネル毎に重ねてプロットする)
     wave_fig.plot(
         time_normalized,
-        data_normalized,
+        np.transpose(data_normalized),
         label="Time Waveform",
         lw=1,
         color="blue")
@@ -276,7 +277,7 @@ def plot_time_and_freq(
     # 周波数特性データプロット
     freq_fig.plot(
         freq_normalized,
-        amp_normalized,
+        np.transpose(amp_normalized),
         label="Spectrum",
         lw=1,
         color="dodgerblue")
@@ -311,7 +312,8 @@ def plot_time_and_spectrogram(
     dbref,
     A,
     selected_mode,
-    spctrgrm_mode
+    spctrgrm_mode,
+    spctrgrm_history=None
 ):
     # ==========================================================
     # === 時間領域波形 & スペクトログラム グラフプロット関数 ===
@@ -335,6 +337,8 @@ def plot_time_and_spectrogram(
     # selected_mode     : 動作モード (0:レコーディングモード / 1:リアルタイムモード)
     # spctrgrm_mode     : スペクトログラムデータ算出モード
     #                     (0:scipy.signal.spectrogram()関数を使用 / 1:自作STFT関数を使用)
+    # spctrgrm_history  : スペクトログラム履歴を保持するSpectrogramHistory (リアルタイムモードのみ)
+    #                     (指定時は、time_spctrgrm/spectrogramの代わりにスペクトログラム履歴をスクロール表示する)
 
     # フォントサイズ設定
     plt.rcParams['font.size'] = 10
@@ -487,25 +491,68 @@ def plot_time_and_spectrogram(
             colorbar_min = -100     # カラーバー最小値[dB]
             colorvar_max = 0        # カラーバー最大値[dB]
 
-        # スペクトログラムデータプロット
-        spctrgrm_im = spctrgrm_fig.pcolormesh(
-            time_spctrgrm,
-            freq_spctrgrm,
-            spectrogram,
-            vmin=colorbar_min,
-            vmax=colorvar_max,
-            cmap="jet"
-        )
+        if spctrgrm_history is None:
+            # スペクトログラムデータプロット
+            spctrgrm_im = spctrgrm_fig.pcolormesh(
+                time_spctrgrm,
+                freq_spctrgrm,
+                spectrogram,
+                vmin=colorbar_min,
+                vmax=colorvar_max,
+                cmap="jet"
+            )
+        else:
+            # スペクトログラム履歴プロット (最新列を右端としたスクロール表示)
+            # (表示画像は履歴と同じく2倍の列数でミラーリングして保持し、前回の描画以降に更新された列のみを
+            #  2箇所に書込む / 画像の表示位置(extent)をずらし、X軸表示レンジで最新の保持列数分のみを表示する)
+            # (描画毎に保持列数分の全体をset_data()で画像へコピーしない)
+            columns = spctrgrm_history.columns
+            time_step = spctrgrm_history.time_step
+            first_index, column_data, end_index, time_end = spctrgrm_history.get_updated_columns()
+
+            if len(spctrgrm_fig.images) == 0:
+                spctrgrm_im = spctrgrm_fig.imshow(
+                    np.full((len(freq_spctrgrm), columns * 2), np.nan),
+                    origin="lower",
+                    aspect="auto",
+                    interpolation="nearest",
+                    vmin=colorbar_min,
+                    vmax=colorvar_max,
+                    cmap="jet"
+                )
+                history_im = spctrgrm_im
+            else:
+                history_im = spctrgrm_fig.images[0]
+
+                # カラーバーは初回のみ設定する
+                spctrgrm_im = None
+
+            # 更新列を表示画像の列位置(列番号 % 保持列数)とミラー位置(+保持列数)に書込む
+            if len(column_data) > 0:
+                image_data = history_im.get_array()
+                positions = (first_index + np.arange(len(column_data))) % columns
+                column_data = np.ma.masked_invalid(column_data.T)
+                image_data[:, positions] = column_data
+                image_data[:, positions + columns] = column_data
+                history_im.changed()
+
+            # 表示画像の先頭列は、最新列を含む周回(列番号が保持列数の倍数の列から始まる)の1周前の先頭列とする
+            image_start = time_end - (end_index % columns + columns) * time_step
+            history_im.set_extent(
+                (image_start, image_start + columns * 2 * time_step, freq_spctrgrm[0], freq_spctrgrm[-1]))
+
+            spctrgrm_fig.set_xlim(time_end - columns * time_step, time_end)
 
         # カラーバー設定
-        cbar = plt.colorbar(spctrgrm_im, orientation='vertical', cax=cbar_fig)
+        if spctrgrm_im is not None:
+            cbar = plt.colorbar(spctrgrm_im, orientation='vertical', cax=cbar_fig)
 
-        if (dbref > 0) and not (A):
-            cbar.set_label("Sound Pressure [dB spl]")
-        elif (dbref > 0) and (A):
-            cbar.set_label("Sound Pressure [dB spl(A)]")
-        else:
-            cbar.set_label("Log Power Spectrum [dB FS]")
+            if (dbref > 0) and not (A):
+                cbar.set_label("Sound Pressure [dB spl]")
+            elif (dbref > 0) and (A):
+                cbar.set_label("Sound Pressure [dB spl(A)]")
+            else:
+                cbar.set_label("Log Power Spectrum [dB FS]")
 
         # 基本周波数データプロット
         f0_fig.plot(
@@ -635,9 +682,10 @@ def plot_time_freq_quef(
     fig.tight_layout()
 
     # 時間領域波形データプロット
+    # (マルチチャンネル(チャンネル数, データ数)の場合は、以降の各データを転置してチャンネル毎に重ねてプロットする)
     wave_fig.plot(
         time_normalized,
-        data_normalized,
+        np.transpose(data_normalized),
         label="Time Waveform",
         lw=1,
         color="blue"
@@ -646,7 +694,7 @@ def plot_time_freq_quef(
     # 周波数特性データプロット
     freq_fig.plot(
         freq_normalized,
-        amp_normalized,
+        np.transpose(amp_normalized),
         label="Spectrum",
         lw=1,
         color="dodgerblue"
@@ -655,7 +703,7 @@ def plot_time_freq_quef(
     # スペクトル包絡データプロット
     freq_fig.plot(
         freq_normalized,
-        amp_envelope_normalized,
+        np.transpose(amp_envelope_normalized),
         label="Spectrum Envelope",
         lw=4
     )
@@ -663,7 +711,7 @@ def plot_time_freq_quef(
     # 基本周波数データプロット
     f0_fig.plot(
         time_f0,
-        f0,
+        np.transpose(f0),
         label="Fundamental Frequency",
         lw=3,
         color="forestgreen"
@@ -672,7 +720,7 @@ def plot_time_freq_quef(
     # ケプストラムデータプロット
     ceps_fig.plot(
         time_normalized,
-        cepstrum_db,
+        np.transpose(cepstrum_db),
         label="Cepstrum",
         lw=1,
         color="red"
@@ -680,7 +728,7 @@ def plot_time_freq_quef(
 
     ceps_fig.plot(
         time_normalized,
-        cepstrum_data_lpl,
+        np.transpose(cepstrum_data_lpl),
         label="Cepstrum(Low-Pass-Lifter)",
         lw=1,
         color="royalblue"
@@ -812,9 +860,10 @@ def plot_time_freq_melfreq(
     fig.tight_layout()
 
     # 時間領域波形データプロット
+    # (マルチチャンネル(チャンネル数, データ数)の場合は、以降の各データを転置してチャンネル毎に重ねてプロットする)
     wave_fig.plot(
         time_normalized,
-        data_normalized,
+        np.transpose(data_normalized),
         label="Time Waveform",
         lw=1,
         color="blue"
@@ -823,7 +872,7 @@ def plot_time_freq_melfreq(
     # 周波数特性データプロット
     freq_fig.plot(
         freq_normalized,
-        amp_normalized,
+        np.transpose(amp_normalized),
         label="Spectrum",
         lw=1,
         color="dodgerblue"
@@ -832,7 +881,7 @@ def plot_time_freq_melfreq(
     # スペクトル包絡データプロット
     freq_fig.plot(
         freq_normalized,
-        amp_envelope_normalized,
+        np.transpose(amp_envelope_normalized),
         label="Spectrum Envelope",
         lw=3
     )
@@ -840,7 +889,7 @@ def plot_time_freq_melfreq(
     # メルスケール(メル尺度)スペクトル包絡データプロット
     freq_fig.plot(
         melscale_freq_normalized,
-        melscale_amp_normalized,
+        np.transpose(melscale_amp_normalized),
         label=f"Mel-Scale Spectrum Envelope (Mel-filter nums: {mel_filter_number})",
         lw=1,
         marker='.'
@@ -849,7 +898,7 @@ def plot_time_freq_melfreq(
     # メル周波数ケプストラム係数(MFCC)スペクトル包絡データプロット
     freq_fig.plot(
         melscale_freq_normalized,
-        mfcc_amp_normalized,
+        np.transpose(mfcc_amp_normalized),
         label=f"MFCC Spectrum Envelope (MFCC dimensions: {mfcc_dim})",
         lw=2,
         color="limegreen"
@@ -858,7 +907,7 @@ def plot_time_freq_melfreq(
     # 基本周波数データプロット
     f0_fig.plot(
         time_f0,
-        f0,
+        np.transpose(f0),
         label="Fundamental Frequency",
         lw=3,
         color="forestgreen"
@@ -0,0 +1,89 @@
+import functools
+
+import numpy as np
+import scipy
+
+from .analysis_plan import get_analysis_plan
+from .audio_signal_processing_basic import db, get_float_dtype
+
+
+class RfftSpectrum:
+    # ===========================================================
+    # === 実数入力 周波数特性データクラス (rfft / 遅延評価版) ===
+    # ===========================================================
+    # 時間領域波形(実数)に対してscipy.fft.rfft()で正の周波数領域のみのDFTを実施し、
+    # 振幅/dB値/A特性補正/位相の各成分は、参照された時に1度だけ算出する(functools.cached_property)
+    # (scipy.fft.fft() + dft_normalize()と異なり、負の周波数領域のFFT演算と、
+    #  負の周波数領域を含む全要素に対するnp.abs()/np.angle()/np.degrees()を行わない)
+    #   - spectrum_normalized   : 正規化後 DFTデータ (rfft出力の先頭「要素数 / 2」要素 / fft出力の正の周波数領域と同一)
+    #   - freq_normalized       : 正規化後 周波数軸データ[Hz]
+    #   - amp                   : 正規化後 DFTデータ振幅成分 (リニア値)
+    #   - amp_db                : amp_normalizedのdB値 (dbrefが0以上の場合は音圧レベル[dB SPL] / それ以外は[dB FS])
+    #   - amp_normalized        : gen_freq_domain_data()の振幅成分と同一 (dB値 / dbrefが0以上かつA=Trueの場合はA特性補正済)
+    #   - phase_normalized      : 正規化後 DFTデータ位相成分[deg]
+
+    def __init__(self, discrete_data, samplerate, dbref, A):
+        # discrete_data     : 時間領域波形 離散データ 1次元配列
+        #                     (2次元配列(チャンネル数, フレーム数)の場合は、チャンネル毎に算出する)
+        # samplerate        : サンプリング周波数[Hz]
+        # dbref             : デシベル基準値
+        # A                 : 聴感補正(A特性)の有効(True)/無効(False)設定
+
+        # 時間領域波形 離散データを信号処理の浮動小数点型に変換
+        # (float32の場合、FFTは単精度(complex64)で実行される)
+        self.discrete_data = np.asarray(discrete_data, dtype=get_float_dtype())
+        self.samplerate = samplerate
+        self.dbref = dbref
+        self.A = A
+
+        # 両側スペクトルのデータ数(=時間領域波形のデータ数)と、正の周波数領域のデータ数
+        # (dft_normalize()と同じく、両側スペクトルの「要素数 / 2」までを正の周波数領域とする)
+        self.n = np.shape(self.discrete_data)[-1]
+        self.n_positive = int(self.n / 2)
+
+        # 解析プラン (周波数軸データ/聴感補正曲線 / 同じデータ数の場合はキャッシュ済のプラン)
+        self.plan = get_analysis_plan(samplerate, self.n, self.n, None, dbref, A)
+
+    @functools.cached_property
+    def spectrum_normalized(self):
+        # === 正規化後 DFTデータ (正の周波数領域のみ) ===
+        # (scipy.fft.rfft()の出力は「要素数 / 2 + 1」要素(ナイキスト周波数を含む)のため、
+        #  dft_normalize()と同じ要素数にスライスする)
+        return scipy.fft.rfft(self.discrete_data)[..., :self.n_positive]
+
+    @property
+    def freq_normalized(self):
+        # === 正規化後 周波数軸データ[Hz] (解析プランの読込み専用配列) ===
+        return self.plan.freq_axis
+
+    @functools.cached_property
+    def amp(self):
+        # === 振幅成分の正規化 ===
+        # (dft_normalize()と同じく 1/N 倍 & 対称成分の2倍の正規化を施す)
+        return (np.abs(self.spectrum_normalized) / self.n) * 2
+
+    @functools.cached_property
+    def amp_db(self):
+        # === 振幅成分のdB値 ===
+        if self.dbref > 0:
+            # dbrefが0以上の場合、音圧レベル(dB SPL)に変換
+            return db(self.amp, self.dbref)
+
+        # 振幅成分を対数パワースペクトル(=10 * log10(amp^2))に変換
+        return 20 * np.log10(self.amp)
+
+    @functools.cached_property
+    def amp_normalized(self):
+        # === 振幅成分 (gen_freq_domain_data()の出力と同一) ===
+        if (self.dbref > 0) and self.A:
+            # dB変換されていてAがTrueの時に聴感補正する
+            # (解析プランの聴感補正曲線は信号処理の浮動小数点型のため、振幅成分の浮動小数点型を維持する)
+            # (amp_dbの算出結果を変更しないように新しい配列とする)
+            return self.amp_db + self.plan.a_scale
+
+        return self.amp_db
+
+    @functools.cached_property
+    def phase_normalized(self):
+        # === 位相成分[deg] ===
+        return np.degrees(np.angle(self.spectrum_normalized))
@@ -1,17 +1,23 @@
 import datetime
 import os
+import queue
+import threading
+import time
 
+import numpy as np
 import soundfile as sf
 
+from .audio_signal_processing_basic import get_sample_dtype, unpack_int24
+from .audio_stream import gen_discrete_data_from_audio_stream
 
-def save_audio_to_wav_file(samplerate, audio_discrete_data):
-    # =====================================
-    # === 音声データwavファイル保存関数 ===
-    # =====================================
-    # samplerate                : サンプリング周波数 [sampling data count/s)]
-    # audio_discrete_data       : 音声データ(時系列離散データ) 1次元配列
+# 入力音声ストリームのサンプルフォーマット → WAVファイルのサンプルフォーマット(soundfileのsubtype)
+WAV_SUBTYPES = {"int16": "PCM_16", "int24": "PCM_24", "int32": "PCM_32", "float32": "FLOAT"}
 
-    print("Audio DATA File Save START")
+
+def gen_wav_filename():
+    # =======================================
+    # === 音声データwavファイル名生成関数 ===
+    # =======================================
 
     now = datetime.datetime.now()
 
@@ -22,10 +28,225 @@ def save_audio_to_wav_file(samplerate, audio_discrete_data):
     filename = dirname + 'recorded-sound_' + \
         now.strftime('%Y%m%d_%H%M%S') + '.wav'
 
+    # filename : 音声データのWAVファイル名(拡張子あり:相対PATH)
+    return filename
+
+
+def save_audio_to_wav_file(samplerate, audio_discrete_data, sample_format="int16"):
+    # =====================================
+    # === 音声データwavファイル保存関数 ===
+    # =====================================
+    # samplerate                : サンプリング周波数 [sampling data count/s)]
+    # audio_discrete_data       : 音声データ(時系列離散データ) 1次元配列
+    #                             (マルチチャンネルの場合は2次元配列(チャンネル数, フレーム数))
+    # sample_format             : 入力音声ストリームのサンプルフォーマット ("int16" / "int24" / "int32" / "float32")
+    #                             (WAVファイルも同じ量子化ビット数/浮動小数点で保存し、ダイナミックレンジを維持する)
+
+    print("Audio DATA File Save START")
+
+    filename = gen_wav_filename()
+
+    # soundfileは(フレーム数, チャンネル数)の配列を要求するため、マルチチャンネルの場合は転置
+    if audio_discrete_data.ndim == 2:
+        audio_discrete_data = audio_discrete_data.T
+
     # Numpy array内の音声データをWAVファイルとして保存
-    sf.write(filename, audio_discrete_data, samplerate)
+    sf.write(filename, audio_discrete_data, samplerate, subtype=WAV_SUBTYPES[sample_format])
 
     print("Audio DATA File Save END\n")
 
     # filename : 保存した音声データのWAVファイル名(拡張子あり:相対PATH)
     return filename
+
+
+class StreamingWavRecorder:
+    # ======================================================
+    # === 音声データwavファイル ストリーミング保存クラス ===
+    # ======================================================
+    # 入力音声ストリームバッファ毎の離散データを有界キュー経由でバックグラウンドの
+    # 書込みスレッドに渡し、soundfile.SoundFileへ逐次追記する
+    # (録音時間に関わらずメモリ使用量は一定 / プロセス異常終了時も書込み済データは残る)
+
+    def __init__(
+        self,
+        samplerate,
+        channels=1,
+        dtype="int16",
+        subtype=None,
+        flush_interval=1.0,
+        queue_size=64,
+        filename=None
+    ):
+        # samplerate        : サンプリング周波数 [sampling data count/s)]
+        # channels          : チャンネル数 (1:モノラル / 2:ステレオ)
+        # dtype             : 入力音声ストリームのサンプルフォーマット ("int16" / "int24" / "int32" / "float32")
+        # subtype           : WAVファイルのサンプルフォーマット (例："PCM_16" / Noneの場合はdtypeに対応した形式)
+        # flush_interval    : ファイルのflush & fsync間隔[s] ("0"以下の場合は終了時のみ)
+        # queue_size        : 書込み待ちバッファの最大保持数
+        # filename          : 保存するWAVファイル名 (Noneの場合は日時から自動生成)
+
+        self.samplerate = samplerate
+        self.channels = channels
+        get_sample_dtype(dtype)
+        if subtype is None:
+            subtype = WAV_SUBTYPES[dtype]
+
+        self.dtype = dtype
+        self.subtype = subtype
+        self.flush_interval = flush_interval
+
+        if filename is None:
+            filename = gen_wav_filename()
+        self.filename = filename
+
+        # 書込み待ちバッファ (満杯時はキャプチャ側を待機させ、音声データを破棄しない)
+        self.write_queue = queue.Queue(maxsize=queue_size)
+
+        self.written_frames = 0
+        self.error = None
+        self.thread = threading.Thread(target=self._writer_loop, name="wav-writer", daemon=True)
+
+    def _writer_loop(self):
+        # 書込みスレッド
+        try:
+            with open(self.filename, "w+b") as f, sf.SoundFile(
+                f,
+                mode="w",
+                samplerate=self.samplerate,
+                channels=self.channels,
+                subtype=self.subtype,
+                format="WAV"
+            ) as wav_file:
+                last_flush_time = time.monotonic()
+
+                while True:
+                    discrete_data = self.write_queue.get()
+
+                    # 終了通知(None)を受け取った場合は書込みを終了
+                    if discrete_data is None:
+                        break
+
+                    if self.dtype == "int24":
+                        # 24bitは32bit整数の上位3バイトに配置して書込む (soundfileがPCM_24へ変換)
+                        data = np.left_shift(unpack_int24(discrete_data), 8)
+                    else:
+                        data = np.frombuffer(discrete_data, get_sample_dtype(self.dtype))
+                    data = data.reshape(-1, self.channels)
+                    wav_file.write(data)
+                    self.written_frames += len(data)
+
+                    # flush_interval毎にWAVヘッダ更新 & ディスクへの書出しを実施
+                    now = time.monotonic()
+                    if (self.flush_interval > 0) and (now - last_flush_time >= self.flush_interval):
+                        wav_file.flush()
+                        f.flush()
+                        os.fsync(f.fileno())
+                        last_flush_time = now
+
+                wav_file.flush()
+                f.flush()
+                os.fsync(f.fileno())
+
+        except BaseException as e:
+            self.error = e
+
+    def start(self):
+        # ==================================
+        # === ストリーミング保存開始関数 ===
+        # ==================================
+        print("Audio DATA Streaming Save START : ", self.filename)
+        self.thread.start()
+
+    def write(self, discrete_data):
+        # =============================================
+        # === 離散データ書込み関数 (キューへの追加) ===
+        # =============================================
+        # discrete_data : 入力音声ストリームバッファ毎の離散データ (bytes)
+
+        while True:
+            if self.error is not None:
+                raise self.error
+
+            try:
+                self.write_queue.put(discrete_data, timeout=0.5)
+                break
+            except queue.Full:
+                continue
+
+    def stop(self):
+        # ==================================
+        # === ストリーミング保存停止関数 ===
+        # ==================================
+
+        # 書込み待ちバッファを全て書込んでから終了する
+        # (書込みスレッドがエラーで終了した場合は、満杯のキューへの終了通知で待機し続けないようにする)
+        while self.thread.is_alive() and (self.error is None):
+            try:
+                self.write_queue.put(None, timeout=0.5)
+                break
+            except queue.Full:
+                continue
+        self.thread.join()
+
+        if self.error is not None:
+            raise self.error
+
+        print("Audio DATA Streaming Save END : ", self.written_frames, "frames\n")
+
+        # filename : 保存した音声データのWAVファイル名(拡張子あり:相対PATH)
+        return self.filename
+
+
+def record_audio_stream_to_wav_file(
+    stream,
+    frames_per_buffer,
+    samplerate,
+    channels,
+    time,
+    flush_interval=1.0,
+    sample_format="int16",
+    overflow_monitor=None
+):
+    # ==================================================
+    # === 入力音声ストリーム wavファイル直接録音関数 ===
+    # ==================================================
+    # stream                : マイク入力音声データストリーム
+    # frames_per_buffer     : 入力音声ストリームバッファあたりのサンプリングデータ数
+    # samplerate            : サンプリング周波数 [sampling data count/s)]
+    # channels              : チャンネル数 (1:モノラル / 2:ステレオ)
+    # time                  : 録音時間[s] ("0"の場合は、キーボードインタラプトあるまで録音)
+    # flush_interval        : ファイルのflush & fsync間隔[s]
+    # sample_format         : 入力音声ストリームのサンプルフォーマット ("int16" / "int24" / "int32" / "float32")
+    # overflow_monitor      : 入力オーバーフロー検出に使用するInputOverflowMonitor (Noneは検出なし)
+    #                         (fill_gaps=Trueの場合は、欠落区間に無音を書込み、WAVファイルの時間軸を実時間と一致させる)
+
+    recorder = StreamingWavRecorder(samplerate, channels, sample_format, flush_interval=flush_interval)
+    recorder.start()
+
+    # 録音する入力音声ストリームバッファ数 (録音時間"0"の場合は無制限)
+    buffer_count = int((time * samplerate) / frames_per_buffer)
+
+    i = 0
+    try:
+        while (time <= 0) or (i < buffer_count):
+            audio_data_per_buffer = gen_discrete_data_from_audio_stream(
+                stream, frames_per_buffer, overflow_monitor
+            )
+
+            # 入力オーバーフローで欠落した区間を無音で埋める (欠落区間の前後を詰めて連結しない)
+            if (overflow_monitor is not None) and overflow_monitor.fill_gaps and (overflow_monitor.last_gap_frames > 0):
+                print("  - Input Overflow : ", overflow_monitor.last_gap_frames, "frames dropped")
+                recorder.write(overflow_monitor.gen_silence(
+                    overflow_monitor.last_gap_frames, get_sample_dtype(sample_format).itemsize))
+
+            recorder.write(audio_data_per_buffer)
+            i += 1
+
+    except KeyboardInterrupt:
+        # 「ctrl+c」が押下された場合、録音を終了する
+        pass
+
+    filename = recorder.stop()
+
+    # filename : 保存した音声データのWAVファイル名(拡張子あり:相対PATH)
+    return filename
@@ -0,0 +1,166 @@
+import threading
+
+import numpy as np
+
+from .audio_signal_processing_basic import get_float_dtype
+
+
+class SpectrogramHistory:
+    # =================================================
+    # === スペクトログラム履歴 リングバッファクラス ===
+    # =================================================
+    # STFTフレーム(スペクトログラムの列)単位で、最新columns列分のスペクトログラムを固定メモリで保持する
+    # (セッション時間によらずメモリ使用量は一定 / 列の追加は追加列数分の書込みのみで、保持列数によらない)
+    #   - ミラーリング : リングバッファ本体を2倍(2 * columns列)確保し、各列を位置iとi+columnsの2箇所に書込む
+    #                    (任意の書込み位置から連続するcolumns列が、古い順に並んだ連続領域となるため、
+    #                     折り返しを意識せずに、古い順の(周波数, 時間)配列をコピーなしのviewとして参照できる)
+    #   - 列番号指定   : 列はストリーム先頭からの通し番号(STFTフレーム番号)の位置に書込むため、
+    #                    複数の解析ワーカースレッドの書込み順序が前後しても、列の並びは時刻順となる
+    #   - 欠落列       : 書込み済の最新列より先の列から書込む場合は、間の列を未書込みの値と正しい時刻で埋める
+    #                    (解析キューで破棄されたフレームの列に、リングバッファ1周前の古い列が残らないようにする)
+    #   - 更新列の取得 : 前回のget_updated_columns()以降に書込まれた列のみを返すため、
+    #                    描画側は保持列数分の全体ではなく、更新された列のみを表示画像へ反映できる
+    # (本体は列毎のデータが連続する(列数, 周波数)配列とし、参照時に転置viewとする)
+
+    def __init__(self, freq_bins, columns, time_step, dtype=None, fill_value=np.nan):
+        # freq_bins     : スペクトログラムの周波数軸データ数
+        # columns       : 保持する列数(=STFTフレーム数)
+        # time_step     : 列の時間間隔[s] (=STFTフレームのずらし幅 / サンプリング周波数)
+        # dtype         : 保持するスペクトログラムデータの型 (Noneの場合は信号処理の浮動小数点型)
+        # fill_value    : 未書込み列の値 (np.nanの場合、グラフ表示で描画されない)
+
+        if dtype is None:
+            dtype = get_float_dtype()
+
+        self.freq_bins = freq_bins
+        self.columns = columns
+        self.time_step = time_step
+        self.fill_value = fill_value
+
+        # リングバッファ本体 (ミラーリングのため2倍の列数を事前確保)
+        self.buffer = np.full((columns * 2, freq_bins), fill_value, dtype=dtype)
+
+        # 各列の時間軸データ[s] (本体と同じくミラーリングして保持)
+        self.times = np.full(columns * 2, np.nan)
+
+        # 書込み済の最新列の次の列番号 (ストリーム先頭からの通し番号)
+        self.end_index = 0
+
+        # 前回のget_updated_columns()以降に書込まれた最古の列番号
+        # (解析ワーカーの完了順序が前後し、描画済の列より古い列が後から書込まれる場合も含める)
+        self.updated_index = 0
+
+        self.lock = threading.Lock()
+
+    def append(self, spectrogram, time_spctrgrm):
+        # ==================================
+        # === スペクトログラム列追加関数 ===
+        # ==================================
+        # spectrogram   : 追加するスペクトログラム 振幅データ (周波数, 時間)
+        # time_spctrgrm : 追加するスペクトログラム x軸向けデータ[s]
+        # (書込み済の最新列に続けて追加する)
+
+        self.write(self.end_index, spectrogram, time_spctrgrm)
+
+    def write(self, first_index, spectrogram, time_spctrgrm):
+        # =============================================
+        # === スペクトログラム列 位置指定書込み関数 ===
+        # =============================================
+        # first_index   : 先頭列の列番号 (ストリーム先頭からの通し番号 / StreamingStftのフレーム番号)
+        # spectrogram   : 書込むスペクトログラム 振幅データ (周波数, 時間)
+        # time_spctrgrm : 書込むスペクトログラム x軸向けデータ[s]
+
+        # (列数, 周波数)の転置view (gen_spectrogram_of_stft_frames()の出力の場合は連続領域となる)
+        column_data = np.asarray(spectrogram).T
+        time_spctrgrm = np.asarray(time_spctrgrm)
+        end = first_index + len(column_data)
+
+        # (欠落列の判定と書込みの間に他の解析ワーカースレッドが書込まないように、書込み全体をロックで保護する)
+        with self.lock:
+            # 書込み済の最新列より先の列から書込む場合は、間の列を未書込みの値で埋める
+            # (時刻は書込む先頭列の時刻から列の時間間隔で遡って算出する / 後から到着した列は上書きされる)
+            gap_start = max(self.end_index, end - self.columns)
+            if (gap_start < first_index) and (len(time_spctrgrm) > 0):
+                gap_count = first_index - gap_start
+                self._write_range(
+                    gap_start,
+                    np.full((gap_count, self.freq_bins), self.fill_value, dtype=self.buffer.dtype),
+                    time_spctrgrm[0] - self.time_step * np.arange(gap_count, 0, -1))
+
+            # 保持列数より古くなる列は書込まない
+            start = max(first_index, max(end, self.end_index) - self.columns)
+            if start < end:
+                offset = start - first_index
+                self._write_range(start, column_data[offset:], time_spctrgrm[offset:])
+
+            # 書込み完了後に最新列番号を更新 (参照側への公開)
+            self.end_index = max(self.end_index, end)
+            self.updated_index = min(self.updated_index, first_index)
+
+    def _write_range(self, start, column_data, time_data):
+        # 列番号startから連続する列を、リングバッファの終端で折り返して最大2回に分けて書込む
+        position = start % self.columns
+        first_len = min(len(column_data), self.columns - position)
+
+        self._write_columns(position, column_data[:first_len], time_data[:first_len])
+        if first_len < len(column_data):
+            self._write_columns(0, column_data[first_len:], time_data[first_len:])
+
+    def _write_columns(self, position, column_data, time_data):
+        # リングバッファ本体とミラー領域の2箇所に書込む
+        count = len(column_data)
+        self.buffer[position:position + count] = column_data
+        self.buffer[position + self.columns:position + self.columns + count] = column_data
+        self.times[position:position + count] = time_data
+        self.times[position + self.columns:position + self.columns + count] = time_data
+
+    def get_view(self):
+        # ==================================================
+        # === スペクトログラム履歴 参照関数 (コピーなし) ===
+        # ==================================================
+        # (書込み中の列を含む場合があるため、保存等で確定データが必要な場合はコピーして使用する)
+
+        position = self.end_index % self.columns
+
+        # time_history          : スペクトログラム履歴 x軸向けデータ[s] (古い順 / 未書込み列はnan)
+        # spectrogram_history   : スペクトログラム履歴 振幅データ (周波数, 時間) (古い順 / 転置view)
+        return self.times[position:position + self.columns], self.buffer[position:position + self.columns].T
+
+    def get_updated_columns(self):
+        # ==================================================
+        # === 前回取得以降の更新列 取得関数 (コピーあり) ===
+        # ==================================================
+        # (保持列数より古くなった列は含めない / 取得した列は次回以降の取得対象から外す)
+
+        with self.lock:
+            first_index = max(self.updated_index, self.end_index - self.columns)
+            position = first_index % self.columns
+            column_data = self.buffer[position:position + self.end_index - first_index].copy()
+            end_index = self.end_index
+            time_end = self._get_time_end()
+            self.updated_index = end_index
+
+        # first_index   : 先頭の更新列の列番号
+        # column_data   : 更新列のスペクトログラム 振幅データ (列数, 周波数) (古い順)
+        # end_index     : 書込み済の最新列の次の列番号
+        # time_end      : スペクトログラム履歴の表示終了時刻[s] (get_time_end()と同じ)
+        return first_index, column_data, end_index, time_end
+
+    def get_time_end(self):
+        # ==================================================
+        # === スペクトログラム履歴 表示終了時刻 取得関数 ===
+        # ==================================================
+        # (最新列の時刻に列の時間間隔の1/2を加えた時刻 / 未書込みの場合は0)
+
+        with self.lock:
+            time_end = self._get_time_end()
+
+        # time_end  : スペクトログラム履歴の表示終了時刻[s]
+        return time_end
+
+    def _get_time_end(self):
+        # 最新列の時刻に列の時間間隔の1/2を加えた時刻 (未書込みの場合は0 / ロック取得済の状態で呼び出す)
+        if self.end_index == 0:
+            return 0
+
+        return self.times[(self.end_index - 1) % self.columns] + (self.time_step / 2)
@@ -0,0 +1,136 @@
+import math
+
+import numpy as np
+import soxr
+
+from .audio_signal_processing_basic import (discrete_data_normalize,
+                                            discrete_data_quantize,
+                                            get_sample_dtype)
+
+
+class StreamResampler:
+    # ===================================================
+    # === ストリーミング サンプリング周波数変換クラス ===
+    # ===================================================
+    # soxr.ResampleStreamでフィルタ状態をブロック間で引き継ぎながら、
+    # 入力音声ストリームバッファ毎の離散データをサンプリング周波数変換する
+    # (ブロック毎に独立して変換する場合と異なり、ブロック境界でのフィルタの過渡応答(端部の歪み)が生じない)
+
+    def __init__(self, in_rate, out_rate, channels=1, sample_format="int16", quality="HQ"):
+        # in_rate       : 入力(デバイス)のサンプリング周波数[Hz]
+        # out_rate      : 出力(解析用)のサンプリング周波数[Hz]
+        # channels      : チャンネル数 (1:モノラル / 2:ステレオ)
+        # sample_format : 離散データのサンプルフォーマット ("int16" / "int24" / "int32" / "float32")
+        # quality       : soxrの変換品質 ("QQ" / "LQ" / "MQ" / "HQ" / "VHQ")
+
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.channels = channels
+        self.sample_format = sample_format
+        self.itemsize = get_sample_dtype(sample_format).itemsize
+
+        self.resampler = soxr.ResampleStream(in_rate, out_rate, channels, dtype="float32", quality=quality)
+
+    def process(self, discrete_data, last=False):
+        # =============================================
+        # === 離散データ サンプリング周波数変換関数 ===
+        # =============================================
+        # discrete_data : 入力(デバイス)のサンプリング周波数の離散データ (bytes / チャンネル間インターリーブ)
+        # last          : 最終ブロックの場合はTrue (フィルタ内に残ったデータを全て出力する)
+
+        # 正規化済float32へ変換 (soxrへの入力 / FLOAT_DTYPEの設定に関わらずfloat32で変換する)
+        data_normalized = discrete_data_normalize(
+            discrete_data,
+            self.sample_format,
+            out=np.empty(len(discrete_data) // self.itemsize, dtype=np.float32)
+        )
+
+        resampled = self.resampler.resample_chunk(data_normalized.reshape(-1, self.channels), last)
+
+        # resampled : 出力(解析用)のサンプリング周波数の正規化済データ (float32 / (フレーム数, チャンネル数))
+        return resampled
+
+    def get_delay(self):
+        # delay : 変換フィルタの遅延[s]
+        return self.resampler.delay() / self.out_rate
+
+
+class ResampledInputStream:
+    # =======================================================
+    # === サンプリング周波数変換 入力音声ストリームクラス ===
+    # =======================================================
+    # デバイスのネイティブサンプリング周波数(44.1kHz/48kHz等)で取得するBlockingモードの入力音声ストリームを、
+    # pyaudio.PyAudio.Streamと同じread()インタフェースのまま解析用のサンプリング周波数に変換して供給する
+    # (read()のフレーム数・戻り値のフォーマットは解析用サンプリング周波数の値となるため、
+    #  gen_time_domain_data()等の既存の取得関数にstreamとしてそのまま渡せる)
+
+    def __init__(self, stream, device_samplerate, samplerate, channels=1, sample_format="int16", quality="HQ"):
+        # stream            : デバイスのサンプリング周波数で生成した入力音声ストリーム (Blockingモード)
+        # device_samplerate : デバイスのサンプリング周波数[Hz]
+        # samplerate        : 解析用のサンプリング周波数[Hz]
+        # channels          : チャンネル数 (1:モノラル / 2:ステレオ)
+        # sample_format     : サンプルフォーマット ("int16" / "int24" / "int32" / "float32")
+        # quality           : soxrの変換品質
+
+        self.stream = stream
+        self.device_samplerate = device_samplerate
+        self.samplerate = samplerate
+        self.channels = channels
+        self.sample_format = sample_format
+
+        self.resampler = StreamResampler(device_samplerate, samplerate, channels, sample_format, quality)
+
+        # 変換済で未読出しの正規化済データ (float32 / (フレーム数, チャンネル数))
+        self.pending = np.empty((0, channels), dtype=np.float32)
+
+    def read(self, num_frames, exception_on_overflow=True):
+        # ====================================================
+        # === 入力音声データ読出し関数 (Stream.read()互換) ===
+        # ====================================================
+        # num_frames                : 読出すフレーム数 (解析用サンプリング周波数でのフレーム数)
+        # exception_on_overflow     : pyaudio.PyAudio.Stream.read()の引数 (デバイスのストリームへ引き渡す)
+
+        # 変換済データがnum_framesに達するまで、不足分に相当するデバイスのフレーム数を読出して変換する
+        # (変換フィルタの遅延分だけ初回は出力が少ないため、不足する場合は繰返す)
+        blocks = [self.pending]
+        available = len(self.pending)
+        while available < num_frames:
+            device_frames = math.ceil((num_frames - available) * self.device_samplerate / self.samplerate)
+            discrete_data = self.stream.read(device_frames, exception_on_overflow=exception_on_overflow)
+            resampled = self.resampler.process(discrete_data)
+            blocks.append(resampled)
+            available += len(resampled)
+
+        data = np.concatenate(blocks) if len(blocks) > 1 else self.pending
+        self.pending = data[num_frames:]
+
+        # discrete_data : 入力音声データ (解析用サンプリング周波数 / sample_formatで量子化したbyte列)
+        return discrete_data_quantize(data[:num_frames].reshape(-1), self.sample_format)
+
+    def get_read_available(self):
+        # 読出し可能なフレーム数 (解析用サンプリング周波数に換算 / 入力オーバーフロー検出で使用)
+        return len(self.pending) + int(
+            self.stream.get_read_available() * self.samplerate / self.device_samplerate)
+
+    def get_input_latency(self):
+        # 入力レイテンシ[s] (デバイスの入力レイテンシ + 変換フィルタの遅延)
+        return self.stream.get_input_latency() + self.resampler.get_delay()
+
+    # === pyaudio.PyAudio.Stream互換メソッド ===
+    def get_time(self):
+        return self.stream.get_time()
+
+    def start_stream(self):
+        self.stream.start_stream()
+
+    def stop_stream(self):
+        self.stream.stop_stream()
+
+    def is_active(self):
+        return self.stream.is_active()
+
+    def is_stopped(self):
+        return self.stream.is_stopped()
+
+    def close(self):
+        self.stream.close()
@@ -0,0 +1,164 @@
+import numpy as np
+
+from .analysis_plan import get_analysis_plan
+from .audio_signal_processing_basic import get_float_dtype
+from .gen_freq_domain_data import gen_spectrogram_of_stft_frames
+
+
+class StreamingStft:
+    # =====================================================
+    # === ストリーミング STFT(短時間フーリエ変換)クラス ===
+    # =====================================================
+    # 入力音声ストリームバッファを順にpush()し、前回までのバッファの末尾(次のSTFTフレームの先頭以降)を
+    # 保持して連結することで、バッファ境界をまたぐSTFTフレームも欠落させずに、新たに完成したフレームのみを返す
+    # (時間軸データはストリーム先頭からの連続した時刻とし、バッファ毎に0に戻らない)
+    # (小さいバッファサイズ(低レイテンシ)で取得しても、STFTフレーム長/オーバーラップ率は一定となる)
+    #   - push()    : バッファを連結して完成したSTFTフレーム(ストライドview)と時間軸データを返す
+    #                 (保持データを更新するため、バッファの取得順に呼び出す)
+    #   - skip()    : 入力オーバーフロー等で欠落した区間の分だけ、時間軸とフレーム番号を進める
+    #   - analyze() : push()で得たSTFTフレームのスペクトログラム 振幅データを算出する
+    #                 (内部状態を更新しないため、複数の解析ワーカースレッドから並行して呼び出せる)
+    # (モノラル(1次元配列)の時間領域波形データを対象とする)
+
+    def __init__(self, samplerate, stft_frame_size, overlap_rate, window_func="hann", dbref=0, A=False):
+        # samplerate        : サンプリング周波数[Hz]
+        # stft_frame_size   : STFT(短時間フーリエ変換)を行う時系列データ数(=STFTフレーム長)
+        # overlap_rate      : オーバーラップ率 [%]
+        # window_func       : 使用する窓関数 ("hann" : Hanning窓 / それ以外 : 矩形窓)
+        # dbref             : デシベル基準値
+        # A                 : 聴感補正(A特性)の有効(True)/無効(False)設定
+
+        self.samplerate = samplerate
+        self.stft_frame_size = stft_frame_size
+        self.dbref = dbref
+
+        # STFTフレームのずらし幅[sampling data count] (バッファ間で一定とするため整数とする)
+        self.hop_size = max(int(stft_frame_size * (1 - (overlap_rate / 100))), 1)
+
+        # 解析プラン (窓関数/振幅補正係数/周波数軸データ/聴感補正曲線)
+        # (gen_freq_domain_data_of_stft()と同じく、FFT点数をstft_frame_sizeの2倍とする)
+        # (聴感補正曲線はdbrefが0以上、かつ、A=Trueの場合のみ(それ以外はNone))
+        self.plan = get_analysis_plan(samplerate, stft_frame_size, stft_frame_size * 2, window_func, dbref, A)
+
+        # DFT(離散フーリエ変換)データに対応した周波数軸データ
+        self.freq_spctrgrm = self.plan.freq_axis
+
+        self.reset()
+
+    def reset(self):
+        # =====================================
+        # === 保持データ & 時間軸初期化関数 ===
+        # =====================================
+
+        # 前回までのバッファの末尾 (次のSTFTフレームの先頭以降)
+        self.tail = np.zeros(0, dtype=get_float_dtype())
+
+        # 保持データ先頭のストリーム先頭からの位置[sampling data count]
+        self.tail_position = 0
+
+        # push()したデータ数の累計[sampling data count] / 算出したSTFTフレーム数の累計
+        self.total_samples = 0
+        self.total_frames = 0
+
+        # 次にpush()するバッファの先頭で読み捨てるデータ数 (skip()でフレーム境界に揃えるため)
+        self.discard_samples = 0
+
+    def push(self, data_normalized):
+        # =========================================================
+        # === バッファ追加 & 完成したSTFTフレームの切り出し関数 ===
+        # =========================================================
+        # data_normalized   : 時間領域 波形データ(正規化済) 1次元配列
+
+        # skip()後の最初のバッファは、次のSTFTフレームの先頭より前のデータを読み捨てる
+        discard = min(self.discard_samples, len(data_normalized))
+        self.discard_samples -= discard
+
+        # 保持データとバッファを連結
+        data = np.concatenate((self.tail, np.asarray(data_normalized[discard:], dtype=self.tail.dtype)))
+
+        if len(data) >= self.stft_frame_size:
+            # 新たに完成したSTFTフレーム数
+            frame_count = (len(data) - self.stft_frame_size) // self.hop_size + 1
+
+            # 完成したSTFTフレームを(フレーム数, STFTフレーム長)のストライドviewとして切り出す
+            # (連結したデータは以降変更しないため、解析ワーカースレッドへそのまま受け渡せる)
+            frames = np.lib.stride_tricks.sliding_window_view(
+                data, self.stft_frame_size)[::self.hop_size][:frame_count]
+        else:
+            # STFTフレーム長に満たない場合は、完成したフレームなし
+            frame_count = 0
+            frames = np.zeros((0, self.stft_frame_size), dtype=data.dtype)
+
+        # 時間軸データ (各STFTフレームの中心時刻[s] / ストリーム先頭からの連続した時刻)
+        # (scipy.signal.spectrogram()の時間軸データと同じく、フレームの中心を時刻とする)
+        frame_positions = self.tail_position + self.hop_size * np.arange(frame_count)
+        time_spctrgrm = (frame_positions + (self.stft_frame_size / 2)) / self.samplerate
+
+        # 次のSTFTフレームの先頭以降を保持 (連結したデータ全体を保持し続けないようにコピーする)
+        consumed = frame_count * self.hop_size
+        self.tail = data[consumed:].copy()
+        self.tail_position += consumed
+
+        self.total_samples += len(data_normalized)
+        self.total_frames += frame_count
+
+        # frames        : 完成したSTFTフレーム 2次元配列(フレーム数, STFTフレーム長)
+        # time_spctrgrm : スペクトログラム x軸向けデータ[s]
+        return frames, time_spctrgrm
+
+    def skip(self, gap_samples):
+        # ============================================
+        # === 欠落区間のスキップ(時間軸の前進)関数 ===
+        # ============================================
+        # gap_samples   : 欠落したデータ数[sampling data count] (入力オーバーフローの欠落フレーム数等)
+        # (欠落区間をまたぐSTFTフレームは生成せずに、フレーム番号のみを進める)
+        # (欠落区間の後の最初のフレームはフレーム境界(ずらし幅の整数倍)から開始し、時間軸は実時間と一致する)
+
+        if gap_samples <= 0:
+            return 0
+
+        # 欠落区間の終端(次にpush()するバッファの先頭)の位置
+        resume_position = self.total_samples + gap_samples
+
+        # 保持データの先頭から欠落区間の終端までに開始する(=欠落区間を含む)STFTフレームをスキップ
+        skipped_frames = max(-(-(resume_position - self.tail_position) // self.hop_size), 0)
+
+        self.tail = self.tail[:0]
+        self.tail_position += skipped_frames * self.hop_size
+        self.discard_samples = self.tail_position - resume_position
+
+        self.total_samples += gap_samples
+        self.total_frames += skipped_frames
+
+        # skipped_frames : スキップしたSTFTフレーム数 (スペクトログラム履歴では未書込みの列となる)
+        return skipped_frames
+
+    def analyze(self, frames):
+        # ========================================================
+        # === STFTフレーム スペクトログラム 振幅データ算出関数 ===
+        # ========================================================
+        # frames    : push()で切り出したSTFTフレーム 2次元配列(フレーム数, STFTフレーム長)
+
+        if len(frames) == 0:
+            return np.zeros((self.stft_frame_size, 0), dtype=get_float_dtype())
+
+        # 窓関数の適用 (解析プランの窓関数を使用)
+        data_applied_window = frames * self.plan.window
+
+        # spectrogram   : スペクトログラム 振幅データ (周波数, 時間)
+        return gen_spectrogram_of_stft_frames(
+            data_applied_window, self.stft_frame_size, len(frames), self.plan.acf, self.dbref, self.plan.a_scale)
+
+    def process(self, data_normalized):
+        # ===============================================
+        # === バッファ追加 & スペクトログラム算出関数 ===
+        # ===============================================
+        # data_normalized   : 時間領域 波形データ(正規化済) 1次元配列
+        # (push()とanalyze()を続けて実行する)
+
+        frames, time_spctrgrm = self.push(data_normalized)
+
+        # freq_spctrgrm : スペクトログラム y軸向けデータ[Hz]
+        # time_spctrgrm : スペクトログラム x軸向けデータ[s] (新たに完成したSTFTフレーム分)
+        # spectrogram   : スペクトログラム 振幅データ (新たに完成したSTFTフレーム分)
+        return self.freq_spctrgrm, time_spctrgrm, self.analyze(frames)
@@ -0,0 +1,435 @@
+import threading
+import time
+
+import numpy as np
+
+from .audio_signal_processing_basic import discrete_data_quantize
+
+# PortAudioのサンプルフォーマット定数 (pyaudio.paInt16等と同値)
+# (pyaudio/PortAudioが使用できない環境でも動作するように、本モジュール内で定義する)
+paFloat32 = 1
+paInt32 = 2
+paInt24 = 4
+paInt16 = 8
+
+# stream_callbackの戻り値 (pyaudio.paContinue等と同値)
+paContinue = 0
+paComplete = 1
+paAbort = 2
+
+# サンプルフォーマット毎の1サンプルあたりのバイト数
+SAMPLE_SIZES = {paFloat32: 4, paInt32: 4, paInt24: 3, paInt16: 2}
+
+# PortAudioのサンプルフォーマット → discrete_data_quantize()のサンプルフォーマット
+SAMPLE_FORMAT_NAMES = {paFloat32: "float32", paInt32: "int32", paInt24: "int24", paInt16: "int16"}
+
+# 有効な合成信号の種類
+# "tone"     : 正弦波 (周波数freq)
+# "chirp"    : 線形チャープ (freq → freq_endへsweep_time[s]毎に掃引を繰返す)
+# "noise"    : 白色雑音 (正規分布)
+# "harmonic" : 音声様の調波信号 (基本周波数freq / harmonics次までの倍音を1/k振幅で合成)
+# "silence"  : 無音
+SIGNAL_KINDS = ("tone", "chirp", "noise", "harmonic", "silence")
+
+# 白色雑音の生成ブロック長[sample]
+# (ブロック毎に(seed, ブロック番号)から乱数を生成するため、読出しサイズに関わらず同じ系列となる)
+NOISE_BLOCK_SIZE = 4096
+
+
+class SyntheticSignal:
+    # =============================
+    # === 決定的 合成信号クラス ===
+    # =============================
+    # サンプル位置(先頭からのサンプル数)のみから信号値を算出するため、
+    # 読出しサイズや読出しタイミングに関わらず、サンプル単位で同一の信号を再現する
+
+    def __init__(
+        self,
+        kind="harmonic",
+        freq=220.0,
+        amplitude=0.5,
+        freq_end=None,
+        sweep_time=1.0,
+        harmonics=10,
+        noise_level=0.0,
+        seed=0
+    ):
+        # kind          : 合成信号の種類 ("tone" / "chirp" / "noise" / "harmonic" / "silence")
+        # freq          : 周波数[Hz] (chirpの場合は掃引開始周波数 / harmonicの場合は基本周波数F0)
+        # amplitude     : 振幅 (フルスケールを"1.0"とした値)
+        # freq_end      : chirpの掃引終了周波数[Hz] (Noneの場合はfreqの10倍)
+        # sweep_time    : chirpの掃引時間[s]
+        # harmonics     : harmonicの倍音数
+        # noise_level   : 加算する白色雑音の振幅 (フルスケールを"1.0"とした標準偏差)
+        # seed          : 白色雑音の乱数シード
+
+        if kind not in SIGNAL_KINDS:
+            raise ValueError(
+                "kind must be one of " + str(SIGNAL_KINDS) + ", not '" + str(kind) + "'"
+            )
+
+        self.kind = kind
+        self.freq = freq
+        self.amplitude = amplitude
+        self.freq_end = freq * 10 if freq_end is None else freq_end
+        self.sweep_time = sweep_time
+        self.harmonics = harmonics
+        self.noise_level = noise_level
+        self.seed = seed
+
+    def _gen_noise(self, start, frames):
+        # サンプル位置[start, start + frames)の白色雑音 (標準偏差1.0)
+        first_block = start // NOISE_BLOCK_SIZE
+        last_block = (start + frames - 1) // NOISE_BLOCK_SIZE
+
+        noise = np.concatenate([
+            np.random.default_rng([self.seed, block]).standard_normal(NOISE_BLOCK_SIZE)
+            for block in range(first_block, last_block + 1)
+        ])
+
+        offset = start - first_block * NOISE_BLOCK_SIZE
+        return noise[offset:offset + frames]
+
+    def gen(self, start, frames, samplerate):
+        # ==============================
+        # === 合成信号データ生成関数 ===
+        # ==============================
+        # start         : 生成開始サンプル位置 (先頭からのサンプル数)
+        # frames        : 生成するサンプル数
+        # samplerate    : サンプリング周波数[Hz]
+
+        if frames <= 0:
+            return np.zeros(0)
+
+        t = np.arange(start, start + frames) / samplerate
+
+        if self.kind == "tone":
+            data = np.sin(2 * np.pi * self.freq * t)
+
+        elif self.kind == "chirp":
+            # 掃引時間毎に開始周波数へ戻る線形チャープ (瞬時周波数 = freq + (freq_end - freq) * t / sweep_time)
+            t_sweep = np.mod(t, self.sweep_time)
+            k = (self.freq_end - self.freq) / self.sweep_time
+            data = np.sin(2 * np.pi * (self.freq * t_sweep + 0.5 * k * t_sweep ** 2))
+
+        elif self.kind == "noise":
+            data = self._gen_noise(start, frames)
+
+        elif self.kind == "harmonic":
+            # 基本周波数F0の倍音(ナイキスト周波数未満)を1/k振幅で合成し、最大振幅が概ね1.0となるよう正規化
+            orders = np.arange(1, self.harmonics + 1)
+            orders = orders[orders * self.freq < samplerate / 2]
+            data = np.sin(2 * np.pi * self.freq * np.outer(orders, t)).T @ (1 / orders)
+            data = data / np.sum(1 / orders)
+
+        else:
+            data = np.zeros(frames)
+
+        data = self.amplitude * data
+
+        if (self.noise_level > 0) and (self.kind != "noise"):
+            data = data + self.noise_level * self._gen_noise(start, frames)
+
+        # data : 合成信号データ 1次元配列 (float64 / フルスケール"1.0")
+        return data
+
+
+class SyntheticStream:
+    # ======================================================
+    # === 合成信号 入力音声ストリームクラス (Stream互換) ===
+    # ======================================================
+    # pyaudio.PyAudio.Streamと同じread()/stream_callbackインタフェースで合成信号を供給する
+    #   - realtime=True  : デバイスと同じタイミングで供給 (read()はバッファ分の時間経過まで待機)
+    #   - realtime=False : 待機せずに供給 (デバイス時刻はサンプル数から算出する仮想時刻)
+
+    def __init__(
+        self,
+        signal,
+        format,
+        channels,
+        rate,
+        frames_per_buffer,
+        stream_callback=None,
+        realtime=True,
+        input_latency=0.01,
+        start=True
+    ):
+        # signal                : 供給するSyntheticSignal
+        # format                : サンプルフォーマット (paInt16 / paInt24 / paInt32 / paFloat32)
+        # channels              : チャンネル数 (全チャンネルに同じ信号を供給する)
+        # rate                  : サンプリング周波数[Hz]
+        # frames_per_buffer     : 入力音声ストリームバッファあたりのサンプリングデータ数
+        # stream_callback       : Callbackモード時のstream_callback関数 (NoneはBlockingモード)
+        # realtime              : デバイスと同じタイミングで供給する(True) / 待機しない(False)
+        # input_latency         : 模擬する入力レイテンシ[s] (ADC時刻とデータ到着時刻の差)
+        # start                 : 生成時にストリームを開始する(True)
+
+        if format not in SAMPLE_SIZES:
+            raise ValueError("unsupported sample format: " + str(format))
+
+        self.signal = signal
+        self.format = format
+        self.channels = channels
+        self.rate = rate
+        self.frames_per_buffer = frames_per_buffer
+        self.stream_callback = stream_callback
+        self.realtime = realtime
+        self.input_latency = input_latency
+
+        # 供給済サンプル数 (デバイス時刻の基準)
+        self.position = 0
+        self.start_time = None
+        self.active = False
+        self.callback_thread = None
+
+        if start:
+            self.start_stream()
+
+    def _gen_block(self, frames):
+        # 現在位置からframes分の合成信号を量子化して返し、供給済サンプル数を進める
+        data = self.signal.gen(self.position, frames, self.rate)
+        if self.channels > 1:
+            data = np.repeat(data, self.channels)
+
+        self.position += frames
+        return discrete_data_quantize(data, SAMPLE_FORMAT_NAMES[self.format])
+
+    def _wait_device_time(self, position):
+        # realtime=Trueの場合、デバイス時刻がposition[sample]に到達するまで待機
+        if self.realtime:
+            wait_time = self.start_time + position / self.rate - time.monotonic()
+            if wait_time > 0:
+                time.sleep(wait_time)
+
+    def _callback_loop(self):
+        # Callbackモード (PortAudioのcallbackスレッドに相当)
+        while self.active:
+            start_position = self.position
+            self._wait_device_time(start_position + self.frames_per_buffer)
+            if not self.active:
+                break
+
+            in_data = self._gen_block(self.frames_per_buffer)
+            time_info = {
+                "input_buffer_adc_time": start_position / self.rate,
+                "current_time": self.get_time(),
+                "output_buffer_dac_time": 0.0,
+            }
+
+            out_data, flag = self.stream_callback(in_data, self.frames_per_buffer, time_info, 0)
+            if flag != paContinue:
+                self.active = False
+
+    def get_time(self):
+        # ==================================
+        # === ストリーム時刻[s] 取得関数 ===
+        # ==================================
+        # (realtime=Falseの場合は、供給済サンプル数 + 入力レイテンシから算出する仮想時刻)
+
+        if self.realtime and (self.start_time is not None):
+            return time.monotonic() - self.start_time
+
+        # stream_time : ストリーム開始からの経過時刻[s]
+        return self.position / self.rate + self.input_latency
+
+    def read(self, num_frames, exception_on_overflow=True):
+        # ====================================================
+        # === 入力音声データ読出し関数 (Stream.read()互換) ===
+        # ====================================================
+        # num_frames                : 読出すフレーム数
+        # exception_on_overflow     : pyaudio.PyAudio.Stream.read()互換の引数 (未使用)
+
+        if self.stream_callback is not None:
+            raise IOError("Not input stream or stream_callback is set")
+
+        self._wait_device_time(self.position + num_frames)
+
+        # in_data : 量子化済 離散データ (bytes / チャンネル間インターリーブ)
+        return self._gen_block(num_frames)
+
+    def get_read_available(self):
+        # 読出し可能なフレーム数 (realtime=Falseの場合は常に1バッファ分)
+        if not self.realtime:
+            return self.frames_per_buffer
+        elapsed_frames = int((time.monotonic() - self.start_time) * self.rate)
+        return max(elapsed_frames - self.position, 0)
+
+    # === pyaudio.PyAudio.Stream互換メソッド ===
+    def start_stream(self):
+        if self.active:
+            return
+
+        # 停止中のサンプルは供給しないため、デバイス時刻は再開時点の供給済サンプル数から継続する
+        self.start_time = time.monotonic() - self.position / self.rate
+        self.active = True
+
+        if self.stream_callback is not None:
+            self.callback_thread = threading.Thread(
+                target=self._callback_loop, name="synthetic-stream-callback", daemon=True)
+            self.callback_thread.start()
+
+    def stop_stream(self):
+        self.active = False
+        if (self.callback_thread is not None) and (self.callback_thread is not threading.current_thread()):
+            self.callback_thread.join()
+        self.callback_thread = None
+
+    def is_active(self):
+        return self.active
+
+    def is_stopped(self):
+        return not self.active
+
+    def close(self):
+        self.stop_stream()
+
+    def get_input_latency(self):
+        return self.input_latency
+
+
+class SyntheticPyAudio:
+    # ==========================================================
+    # === 合成信号 PortAudioインスタンスクラス (PyAudio互換) ===
+    # ==========================================================
+    # pyaudio.PyAudioの代わりにget_mic_index() / audio_stream_start()へ渡す事で、
+    # サウンドカードの無い環境でも既存の取得/解析関数をそのまま実行できる
+    # (入力デバイスは1つ(index:0)のみで、全ストリームに同じ合成信号を供給する)
+
+    def __init__(
+        self,
+        signal=None,
+        realtime=True,
+        input_latency=0.01,
+        max_input_channels=2,
+        default_samplerate=44100
+    ):
+        # signal                : 供給するSyntheticSignal (Noneの場合は既定値のharmonic信号)
+        # realtime              : デバイスと同じタイミングで供給する(True) / 待機しない(False)
+        # input_latency         : 模擬する入力レイテンシ[s]
+        # max_input_channels    : 入力デバイスの最大チャンネル数
+        # default_samplerate    : 入力デバイスの既定サンプリング周波数[Hz]
+
+        if signal is None:
+            signal = SyntheticSignal()
+
+        self.signal = signal
+        self.realtime = realtime
+        self.input_latency = input_latency
+
+        self.host_api_info = {
+            "index": 0,
+            "structVersion": 1,
+            "type": 0,
+            "name": "Synthetic",
+            "deviceCount": 1,
+            "defaultInputDevice": 0,
+            "defaultOutputDevice": -1,
+        }
+        self.device_info = {
+            "index": 0,
+            "structVersion": 2,
+            "name": "Synthetic Microphone",
+            "hostApi": 0,
+            "maxInputChannels": max_input_channels,
+            "maxOutputChannels": 0,
+            "defaultLowInputLatency": input_latency,
+            "defaultLowOutputLatency": 0.0,
+            "defaultHighInputLatency": input_latency,
+            "defaultHighOutputLatency": 0.0,
+            "defaultSampleRate": float(default_samplerate),
+        }
+
+        self.streams = []
+
+    def _check_device_index(self, index):
+        if index not in (None, 0):
+            raise IOError("Invalid device index: " + str(index))
+
+    # === pyaudio.PyAudio互換メソッド ===
+    def get_host_api_count(self):
+        return 1
+
+    def get_host_api_info_by_index(self, host_api_index):
+        if host_api_index != 0:
+            raise IOError("Invalid host API index: " + str(host_api_index))
+        return dict(self.host_api_info)
+
+    def get_default_host_api_info(self):
+        return dict(self.host_api_info)
+
+    def get_device_count(self):
+        return 1
+
+    def get_device_info_by_index(self, device_index):
+        self._check_device_index(device_index)
+        return dict(self.device_info)
+
+    def get_device_info_by_host_api_device_index(self, host_api_index, host_api_device_index):
+        if host_api_index != 0:
+            raise IOError("Invalid host API index: " + str(host_api_index))
+        return self.get_device_info_by_index(host_api_device_index)
+
+    def get_default_input_device_info(self):
+        return dict(self.device_info)
+
+    def get_sample_size(self, format):
+        return SAMPLE_SIZES[format]
+
+    def is_format_supported(
+        self,
+        rate,
+        input_device=None,
+        input_channels=None,
+        input_format=None,
+        output_device=None,
+        output_channels=None,
+        output_format=None
+    ):
+        self._check_device_index(input_device)
+        if (input_format is not None) and (input_format not in SAMPLE_SIZES):
+            raise ValueError("Invalid sample format: " + str(input_format))
+        if (input_channels is not None) and (input_channels > self.device_info["maxInputChannels"]):
+            raise ValueError("Invalid number of channels: " + str(input_channels))
+        return True
+
+    def open(
+        self,
+        rate,
+        channels,
+        format,
+        input=False,
+        output=False,
+        input_device_index=None,
+        output_device_index=None,
+        frames_per_buffer=1024,
+        start=True,
+        stream_callback=None,
+        **kwargs
+    ):
+        if not input or output:
+            raise ValueError("SyntheticPyAudio supports input-only streams")
+
+        self._check_device_index(input_device_index)
+
+        if channels > self.device_info["maxInputChannels"]:
+            raise ValueError("Invalid number of channels: " + str(channels))
+
+        stream = SyntheticStream(
+            self.signal,
+            format,
+            channels,
+            rate,
+            frames_per_buffer,
+            stream_callback=stream_callback,
+            realtime=self.realtime,
+            input_latency=self.input_latency,
+            start=start
+        )
+        self.streams.append(stream)
+
+        return stream
+
+    def terminate(self):
+        for stream in self.streams:
+            stream.close()
+        self.streams = []
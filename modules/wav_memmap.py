@@ -0,0 +1,88 @@
+import struct
+
+import numpy as np
+
+# WAVファイル fmtチャンク フォーマットタグ
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def load_wav_memmap(filename):
+    # =======================================================
+    # === WAVファイル メモリマップ読込み関数 (コピーなし) ===
+    # =======================================================
+    # filename : WAVファイル名
+    #
+    # WAVファイルのRIFFチャンクを解析し、dataチャンクをnumpy.memmapとして返す
+    # (ファイル全体を読込まず、アクセスされたページのみがOSによりメモリに読込まれる)
+    # ([*] numpyの型で直接表現できる 16bit/32bit整数PCM, 32bit浮動小数点のみ対応)
+
+    with open(filename, "rb") as f:
+        riff_header = f.read(12)
+        if (len(riff_header) < 12) or (riff_header[0:4] != b"RIFF") or (riff_header[8:12] != b"WAVE"):
+            raise ValueError(str(filename) + " is not a RIFF/WAVE file")
+
+        fmt = None
+        data_offset = None
+        data_size = None
+
+        # RIFFチャンクを順に走査し、fmtチャンクとdataチャンクを探す
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                break
+
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk_header)
+
+            if chunk_id == b"fmt ":
+                fmt = f.read(chunk_size)
+            elif chunk_id == b"data":
+                data_offset = f.tell()
+                data_size = chunk_size
+                break
+            else:
+                f.seek(chunk_size, 1)
+
+            # チャンクサイズが奇数の場合は1byteのパディングあり
+            if chunk_size % 2 == 1:
+                f.seek(1, 1)
+
+        file_size = f.seek(0, 2)
+
+    if (fmt is None) or (data_offset is None):
+        raise ValueError(str(filename) + " has no fmt/data chunk")
+
+    format_tag, channels, samplerate, byte_rate, block_align, bits_per_sample = struct.unpack(
+        "<HHIIHH", fmt[:16])
+
+    # WAVE_FORMAT_EXTENSIBLEの場合は、SubFormat GUIDの先頭2byteが実際のフォーマットタグ
+    if (format_tag == WAVE_FORMAT_EXTENSIBLE) and (len(fmt) >= 26):
+        format_tag = struct.unpack("<H", fmt[24:26])[0]
+
+    if (format_tag == WAVE_FORMAT_PCM) and (bits_per_sample == 16):
+        dtype = np.dtype("<i2")
+    elif (format_tag == WAVE_FORMAT_PCM) and (bits_per_sample == 32):
+        dtype = np.dtype("<i4")
+    elif (format_tag == WAVE_FORMAT_IEEE_FLOAT) and (bits_per_sample == 32):
+        dtype = np.dtype("<f4")
+    else:
+        raise ValueError(
+            str(filename) + " has a sample format that cannot be memory-mapped "
+            "(format tag: " + hex(format_tag) + ", bits: " + str(bits_per_sample) + ")"
+        )
+
+    # 書込み途中のファイル等、dataチャンクサイズがファイル実サイズを超える場合は実サイズに合わせる
+    data_size = min(data_size, file_size - data_offset)
+    frames = data_size // (dtype.itemsize * channels)
+
+    if frames == 0:
+        # 空のdataチャンクはメモリマップできないため、空配列とする
+        data = np.zeros((0, channels), dtype=dtype)
+    else:
+        data = np.memmap(
+            filename, dtype=dtype, mode="r", offset=data_offset, shape=(frames, channels))
+
+    # data          : WAVファイル 音声データ (読込み専用numpy.memmap / (フレーム数, チャンネル数))
+    # samplerate    : サンプリング周波数[Hz]
+    return data, samplerate
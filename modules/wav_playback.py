@@ -0,0 +1,134 @@
+import numpy as np
+import soundfile as sf
+
+from .wav_memmap import load_wav_memmap
+
+# stream_callbackの戻り値 (pyaudio.paContinue等と同値)
+# (pyaudio/PortAudioが使用できない環境でも動作するように、本モジュール内で定義する)
+paContinue = 0
+paComplete = 1
+
+# WAVファイル 音声データのnumpy型 → サンプルフォーマット
+SAMPLE_FORMAT_OF_DTYPE = {
+    np.dtype("<i2"): "int16",
+    np.dtype("<i4"): "int32",
+    np.dtype("<f4"): "float32",
+}
+
+
+class WavPlaybackEngine:
+    # ===================================================
+    # === WAVファイル 再生エンジンクラス (コピーなし) ===
+    # ===================================================
+    # WAVファイルの音声データ全体を1つのバッファ(numpy.memmap または 事前読込みしたnumpy配列)として保持し、
+    # 再生ブロック毎に、そのバッファを参照する読込み専用memoryviewを返す
+    # (wave.readframes()と異なり、ブロック毎のbytes生成/ファイル読込み(システムコール)を行わないため、
+    #  CPU負荷が高い状況でもstream_callback内の処理時間が一定となり、出力アンダーランを起こしにくい)
+    #   - ブロック毎のmemoryviewと(データ, 戻り値flag)のタプルは、frames_per_buffer設定時に全て事前生成し、
+    #     stream_callback内ではリストのインデックス参照のみとする
+    #   - メモリマップできない形式(8bit/24bit整数PCM, FLAC等)は、soundfileで32bit浮動小数点にデコードして
+    #     事前読込みする
+
+    def __init__(self, filename, frames_per_buffer=1024, preload=False):
+        # filename          : WAVファイル名
+        # frames_per_buffer : 再生ブロックあたりのフレーム数
+        # preload           : 音声データを事前にメモリへ読込む(True) / メモリマップのまま参照する(False)
+        #                     (Trueの場合、再生中のページフォールト(ディスク読込み)も発生しない)
+
+        try:
+            data, samplerate = load_wav_memmap(filename)
+        except ValueError:
+            data, samplerate = sf.read(filename, dtype="float32", always_2d=True)
+            preload = True
+
+        if preload:
+            data = np.array(data, order="C")
+
+        # stream_callbackの戻り値とするmemoryviewは読込み専用とする
+        # (pyaudioはstream_callbackの戻り値として読込み専用のbytes-likeオブジェクトのみを受け付ける)
+        data.flags.writeable = False
+
+        self.filename = filename
+        self.data = data
+        self.samplerate = samplerate
+        self.channels = data.shape[1]
+        self.sample_format = SAMPLE_FORMAT_OF_DTYPE[data.dtype]
+        self.total_frames = data.shape[0]
+        self.frame_bytes = self.channels * data.dtype.itemsize
+
+        # 音声データ全体を参照するbyte単位のmemoryview (チャンネル間インターリーブ)
+        if self.total_frames > 0:
+            self.buffer = memoryview(data.reshape(-1)).cast("B")
+        else:
+            self.buffer = memoryview(b"")
+
+        # 再生位置[frame]
+        self.position = 0
+
+        self.set_frames_per_buffer(frames_per_buffer)
+
+    def set_frames_per_buffer(self, frames_per_buffer):
+        # =================================================
+        # === 再生ブロックサイズ設定 & ブロック生成関数 ===
+        # =================================================
+        # frames_per_buffer : 再生ブロックあたりのフレーム数
+        # (再生位置は先頭に戻る)
+
+        if frames_per_buffer <= 0:
+            raise ValueError("frames_per_buffer must be positive, not " + str(frames_per_buffer))
+
+        self.frames_per_buffer = frames_per_buffer
+        block_bytes = frames_per_buffer * self.frame_bytes
+
+        # 再生ブロック毎の読込み専用memoryview (音声データのコピーは行わない)
+        self.blocks = [
+            self.buffer[start:start + block_bytes]
+            for start in range(0, len(self.buffer), block_bytes)
+        ]
+
+        # stream_callbackの戻り値 (最終ブロックのみpaComplete)
+        self.callback_results = [(block, paContinue) for block in self.blocks]
+        if len(self.callback_results) > 0:
+            self.callback_results[-1] = (self.blocks[-1], paComplete)
+
+        self.position = 0
+
+    def callback(self, in_data, frame_count, time_info, status):
+        # ==================================================
+        # === 再生用stream_callback関数 (Callbackモード) ===
+        # ==================================================
+        # (pyaudio.PyAudio.open()のstream_callbackに指定する / 引数はpyaudioのstream_callbackと同じ)
+
+        position = self.position
+        self.position = min(position + frame_count, self.total_frames)
+
+        if (frame_count == self.frames_per_buffer) and (position % frame_count == 0):
+            # 事前生成した再生ブロックをそのまま返す (最終ブロックの場合はpaComplete)
+            # (再生位置が終端に到達済の場合は空データ & paComplete)
+            index = position // frame_count
+            if index < len(self.callback_results):
+                return self.callback_results[index]
+            return (b"", paComplete)
+
+        # 事前生成したブロックサイズと異なるフレーム数を要求された場合は、再生位置から都度切出す
+        # (frames_per_bufferを指定せずにストリームを生成した場合等)
+        block = self.buffer[position * self.frame_bytes:self.position * self.frame_bytes]
+        flag = paContinue if self.position < self.total_frames else paComplete
+
+        # (再生ブロック(読込み専用memoryview), paContinue / 最終ブロックの場合はpaComplete)
+        return (block, flag)
+
+    def iter_blocks(self):
+        # =================================================
+        # === 再生ブロック逐次取得関数 (Blockingモード) ===
+        # =================================================
+        # (pyaudio.PyAudio.Stream.write()へ渡す再生ブロック(読込み専用memoryview)を、再生位置から順に返す)
+
+        while self.position < self.total_frames:
+            if self.position % self.frames_per_buffer == 0:
+                block = self.blocks[self.position // self.frames_per_buffer]
+            else:
+                block = self.buffer[self.position * self.frame_bytes:
+                                    (self.position + self.frames_per_buffer) * self.frame_bytes]
+            self.position = min(self.position + self.frames_per_buffer, self.total_frames)
+            yield block
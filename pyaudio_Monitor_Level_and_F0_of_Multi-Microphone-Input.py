@@ -0,0 +1,159 @@
+import time
+
+import numpy as np
+
+from modules.activity_detector import ActivityDetector
+from modules.audio_session import AudioSession
+from modules.audio_signal_processing_basic import set_float_dtype
+from modules.gen_freq_domain_data import (gen_fundamental_freq_data,
+                                          gen_unvoiced_fundamental_freq_data)
+from modules.gen_multi_channel_data import (
+    gen_fundamental_freq_data_of_multi_channel,
+    gen_unvoiced_fundamental_freq_data_of_multi_channel)
+from modules.get_std_input import get_selected_mic_indices_by_std_input
+from modules.multi_mic_capture import MultiMicCapture, gen_level_data
+
+
+def analyze_level_and_f0(data_normalized, samplerate, activity_detector=None):
+    # ============================================
+    # === 入力音声レベル & 基本周波数 解析関数 ===
+    # ============================================
+    # data_normalized   : 時間領域波形データ(正規化済)
+    #                     (1次元配列(フレーム数) / ステレオ等は2次元配列(チャンネル数, フレーム数))
+    # samplerate        : サンプリング周波数[Hz]
+    # activity_detector : マイク毎の有音/無音判定に使用するActivityDetector
+    #                     (無音と判定したバッファでは基本周波数の抽出を行わず無声とする / None:全バッファで抽出)
+
+    # 入力音声レベル(RMS)[dB FS] (チャンネル毎)
+    level = gen_level_data(data_normalized)
+
+    # 基本周波数 解析関数 (2次元配列の場合はチャンネル毎に抽出する)
+    if np.ndim(data_normalized) > 1:
+        f0_func = gen_fundamental_freq_data_of_multi_channel
+        unvoiced_f0_func = gen_unvoiced_fundamental_freq_data_of_multi_channel
+    else:
+        f0_func = gen_fundamental_freq_data
+        unvoiced_f0_func = gen_unvoiced_fundamental_freq_data
+
+    # 基本周波数 時系列データ生成 (有声区間(f0>0)の中央値を代表値とする)
+    if activity_detector is None:
+        f0, time_f0 = f0_func(data_normalized, samplerate)
+    else:
+        active = activity_detector.update(data_normalized)
+        f0, time_f0 = activity_detector.run_stage(
+            "f0", active, f0_func, data_normalized, samplerate,
+            downgrade_func=unvoiced_f0_func
+        )
+    f0_median = np.zeros(np.shape(level))
+    for channel, channel_f0 in enumerate(np.atleast_2d(f0)):
+        voiced_f0 = channel_f0[channel_f0 > 0]
+        if len(voiced_f0) > 0:
+            f0_median.flat[channel] = np.median(voiced_f0)
+
+    # level     : 入力音声レベル(RMS)[dB FS] (モノラルはスカラー / ステレオ等はチャンネル毎の1次元配列)
+    # f0_median : 基本周波数[Hz] (有声区間の中央値 / 無声の場合は"0" / levelと同じ形状)
+    return level, f0_median
+
+
+if __name__ == '__main__':
+    # =================
+    # === Main Code ===
+    # =================
+
+    # --- Parameters ---
+    # マイクモード (1:モノラル / 2:ステレオ)
+    mic_mode = 1
+
+    # サンプルフォーマット ("int16":16bit / "int24":24bit / "int32":32bit整数, "float32":32bit浮動小数点)
+    # (計測用オーディオインタフェース等で24bit/float32が使用可能な場合は、ダイナミックレンジを維持できる)
+    sample_format = "int16"
+
+    # サンプリング周波数[Hz]
+    samplerate = int(16000 / 2)
+    print("\nSampling Frequency[Hz] = ", samplerate)
+
+    # 入力音声ストリームバッファあたりのサンプリングデータ数
+    frames_per_buffer = 1024 * 4
+    print(
+        "frames_per_buffer [sampling data count/stream buffer] = ",
+        frames_per_buffer,
+        "\n"
+    )
+
+    # 信号処理で使用する浮動小数点型 (リアルタイム解析のためfloat32とする)
+    set_float_dtype("float32")
+
+    # 有音/無音判定による基本周波数抽出のスキップ
+    # (常時監視で大半を占める無音バッファでは、基本周波数の抽出(pyworld)を行わず無声とする)
+    # (有音開始/継続のエネルギー閾値[dB FS]、有音開始のスペクトル平坦度の上限、有音終了までのハングオーバー時間[s])
+    activity_gating = True
+    activity_on_threshold_db = -50.0
+    activity_off_threshold_db = -56.0
+    activity_flatness_threshold = 0.5
+    activity_hangover_time = 0.5
+    # ------------------------
+
+    # === マイクチャンネルを自動取得 ===
+    # (標準入力にて複数選択可能とする)
+    print("=================================================================")
+    print("  [ Please Select Microphone indices ]")
+    print("=================================================================")
+    print("")
+    # (1つのPortAudioインスタンスをデバイス一覧取得とストリーム生成で共有する)
+    session = AudioSession()
+    mic_list = session.get_mic_index()
+    selected_indices = get_selected_mic_indices_by_std_input(mic_list)
+    print("\nUse Microphone Indices :", selected_indices, "\n")
+
+    # === マイク毎の有音/無音判定 ===
+    # (判定状態(ヒステリシス/ハングオーバー)はマイク毎に保持する)
+    if activity_gating:
+        activity_detectors = {
+            index: ActivityDetector(
+                samplerate, activity_on_threshold_db, activity_off_threshold_db,
+                activity_flatness_threshold, activity_hangover_time)
+            for index in selected_indices
+        }
+    else:
+        activity_detectors = {}
+    # activity_detectors : マイク毎のActivityDetector (device index → ActivityDetector / 空の場合は全バッファを解析)
+
+    # === 全Microphone入力音声ストリーム生成 & 入力音声レベル/基本周波数モニタ ===
+    # (1つのPortAudioインスタンス/1プロセスで全マイクを同時に取得し、共通のワーカープールで解析する)
+    with MultiMicCapture(
+            selected_indices, mic_mode, samplerate, frames_per_buffer,
+            pa=session, sample_format=sample_format) as capture:
+
+        # キーボードインタラプトあるまでループ処理継続
+        while True:
+            try:
+                results = capture.analyze(
+                    analyze_level_and_f0, samplerate,
+                    index_args={index: (detector,) for index, detector in activity_detectors.items()})
+
+                for index, (level, f0_median) in results.items():
+                    for channel, (channel_level, channel_f0) in enumerate(
+                            zip(np.atleast_1d(level), np.atleast_1d(f0_median))):
+                        print(
+                            "  Mic index:", index,
+                            " Ch:", channel,
+                            " Level[dB FS]:", round(float(channel_level), 1),
+                            " F0[Hz]:", round(float(channel_f0), 1)
+                        )
+                print("")
+
+                # 入力音声ストリームバッファ1つ分の時間だけ待機
+                time.sleep(frames_per_buffer / samplerate)
+
+            except KeyboardInterrupt:
+                # 「ctrl+c」が押下された場合、While処理を抜ける
+                break
+
+    # === マイク毎の有音/無音判定 & 基本周波数抽出のスキップ統計の出力 ===
+    for index, detector in activity_detectors.items():
+        print("Mic index:", index)
+        detector.print_report()
+
+    print("=================")
+    print("= Main Code END =")
+    print("=================\n")
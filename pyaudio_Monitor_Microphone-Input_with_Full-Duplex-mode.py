@@ -0,0 +1,98 @@
+import time
+
+from modules.audio_session import AudioSession
+from modules.duplex_stream import (DuplexProcessor, duplex_stream_open,
+                                   gen_butter_filter_processor,
+                                   gen_gain_processor)
+from modules.get_std_input import get_selected_mic_index_by_std_input
+from modules.latency_monitor import LatencyMonitor
+
+if __name__ == '__main__':
+    # =================
+    # === Main Code ===
+    # =================
+
+    # --- Parameters ---
+    # マイクモード (1:モノラル / 2:ステレオ) (出力も同じチャンネル数とする)
+    mic_mode = 1
+
+    # サンプルフォーマット ("int16":16bit / "int24":24bit / "int32":32bit整数, "float32":32bit浮動小数点)
+    # (float32の場合は、stream_callback内での量子化の変換/メモリ確保が不要となる)
+    sample_format = "float32"
+
+    # サンプリング周波数[Hz]
+    samplerate = 48000
+    print("\nSampling Frequency[Hz] = ", samplerate)
+
+    # 全二重ストリームバッファあたりのサンプリングデータ数
+    # (ライブモニタ向けに数ms以内のラウンドトリップレイテンシとするため、小さいバッファサイズとする)
+    frames_per_buffer = 64
+    print(
+        "frames_per_buffer [sampling data count/stream buffer] = ",
+        frames_per_buffer,
+        "\n"
+    )
+
+    # 出力デバイスのdevice index (Noneの場合はデフォルト出力デバイス)
+    output_index = None
+
+    # モニタ出力のゲイン[dB]
+    gain_db = 0.0
+
+    # 低域カット(ハイパスフィルタ)のカットオフ周波数[Hz] ("0"の場合はフィルタなし)
+    highpass_cutoff = 80
+
+    # レイテンシ統計値(p50/p95/p99)の定期出力間隔[s] ("0"の場合は終了時のみ出力)
+    latency_report_interval = 10
+    # ------------------------
+
+    # === マイクチャンネルを自動取得 ===
+    # (標準入力にて選択可能とする)
+    print("=================================================================")
+    print("  [ Please Select Microphone index ]")
+    print("=================================================================")
+    print("")
+    # (1つのPortAudioインスタンスをデバイス一覧取得とストリーム生成で共有する)
+    session = AudioSession()
+    mic_list = session.get_mic_index()
+    selected_index = get_selected_mic_index_by_std_input(mic_list)
+    print("\nUse Microphone Index :", selected_index, "\n")
+
+    # === ブロック処理プロセッサ ===
+    # (stream_callback内で入力ブロック毎に順に適用する)
+    processors = [gen_gain_processor(gain_db)]
+    if highpass_cutoff > 0:
+        processors.append(gen_butter_filter_processor(samplerate, highpass_cutoff, "highpass", 2, mic_mode))
+
+    # === ラウンドトリップレイテンシ計測 ===
+    latency_monitor = LatencyMonitor(report_interval=latency_report_interval)
+
+    duplex_processor = DuplexProcessor(
+        processors, samplerate, frames_per_buffer, mic_mode, sample_format, latency_monitor)
+
+    # === 全二重(Microphone入力 → モニタ出力)ストリーム生成 ===
+    # (1つのstream_callbackで、入力ブロックの処理と出力ブロックの生成を行う)
+    stream = duplex_stream_open(session, selected_index, output_index, duplex_processor)
+
+    print("Full-Duplex Monitor START (Press ctrl+c to STOP)")
+
+    # キーボードインタラプトあるまでループ処理継続
+    while stream.is_active():
+        try:
+            latency_monitor.print_report_if_due()
+            time.sleep(0.1)
+
+        except KeyboardInterrupt:
+            # 「ctrl+c」が押下された場合、While処理を抜ける
+            break
+
+    # === 全二重ストリームの計測カウンタ/レイテンシ統計値の出力 ===
+    duplex_processor.print_report(stream)
+
+    # === 全二重ストリーム停止 ===
+    session.close_stream(stream)
+    session.close()
+
+    print("=================")
+    print("= Main Code END =")
+    print("=================\n")
@@ -1,17 +1,30 @@
+import sys
+import threading
+
+from modules.activity_detector import ActivityDetector
+from modules.audio_pipeline import AudioPipeline
+from modules.audio_replay_source import AudioReplaySource
+from modules.audio_session import AudioSession
 from modules.audio_signal_processing_advanced import overlap, window
+from modules.audio_signal_processing_basic import set_float_dtype
 from modules.audio_stream import audio_stream_start, audio_stream_stop
+from modules.buffer_size_tuner import BufferSizeTuner
 from modules.gen_freq_domain_data import (
     gen_freq_domain_data_of_signal_spctrgrm, gen_freq_domain_data_of_stft,
-    gen_fundamental_freq_data)
+    gen_fundamental_freq_data, gen_unvoiced_fundamental_freq_data)
 from modules.gen_time_domain_data import gen_time_domain_data
-from modules.get_mic_index import get_mic_index
 from modules.get_std_input import (get_selected_mic_index_by_std_input,
                                    get_selected_mode_by_std_input)
+from modules.input_overflow_monitor import InputOverflowMonitor
+from modules.latency_monitor import LatencyMonitor, gen_block_stamp
+from modules.playback_monitor_source import PlaybackMonitorSource
 from modules.plot_matplot_graph import (gen_graph_figure,
                                         gen_graph_figure_for_realtime_spctrgrm,
                                         plot_time_and_spectrogram)
 from modules.save_audio_to_wav_file import save_audio_to_wav_file
 from modules.save_matplot_graph import save_matplot_graph
+from modules.spectrogram_history import SpectrogramHistory
+from modules.streaming_stft import StreamingStft
 
 if __name__ == '__main__':
     # =================
@@ -58,6 +71,14 @@ if __name__ == '__main__':
     # マイクモード (1:モノラル / 2:ステレオ)
     mic_mode = 1
 
+    # スペクトログラム/基本周波数を解析するチャンネル (マルチチャンネルの場合のみ使用)
+    # (グラフは1チャンネル分を表示するため、解析するチャンネルを選択する / 録音データは全チャンネルを保存する)
+    spctrgrm_channel = 0
+
+    # サンプルフォーマット ("int16":16bit / "int24":24bit / "int32":32bit整数, "float32":32bit浮動小数点)
+    # (計測用オーディオインタフェース等で24bit/float32が使用可能な場合は、ダイナミックレンジを維持できる)
+    sample_format = "int16"
+
     # サンプリング周波数[Hz]
     if selected_mode == 0:  # レコーディングモード向け
         samplerate = 16000
@@ -65,6 +86,11 @@ if __name__ == '__main__':
         samplerate = int(16000 / 2)
     print("\nSampling Frequency[Hz] = ", samplerate)
 
+    # 入力デバイスで取得するサンプリング周波数[Hz] ("0"の場合はデバイスのネイティブサンプリング周波数)
+    # (samplerateと異なる場合は、ストリーミングリサンプラ(soxr)でsamplerateに変換してから解析/保存する)
+    # (解析コストはsamplerateで、取得品質/デバイスの安定動作はdevice_samplerateで個別に調整できる)
+    device_samplerate = 0
+
     # 入力音声ストリームバッファあたりのサンプリングデータ数
     if selected_mode == 0:  # レコーディングモード向け
         frames_per_buffer = 512
@@ -76,6 +102,24 @@ if __name__ == '__main__':
         "\n"
     )
 
+    # 入力音声ストリームバッファサイズの自動調整 (リアルタイムモードのみ)
+    # (解析の処理時間がバッファ時間長のbuffer_target_ratio以下に収まる最小のサイズを、
+    #  buffer_min_frames～frames_per_bufferの範囲から起動時および実行中に選択する)
+    # (STFTフレーム長はframes_per_bufferから算出した値で固定するため、最小サイズはSTFTフレームが
+    #  十分な数だけ得られるサイズとする)
+    auto_tune_buffer = True
+    buffer_min_frames = 2048
+    buffer_target_ratio = 0.5
+
+    # 信号処理(正規化/窓関数/FFT/dB変換/メル・ケプストラム解析)で使用する浮動小数点型
+    # (リアルタイムモードの場合は、メモリ帯域およびFFT演算量削減のためにfloat32とする)
+    if selected_mode == 0:  # レコーディングモード向け
+        float_dtype = "float64"
+    else:                   # リアルタイムモード向け
+        float_dtype = "float32"
+    set_float_dtype(float_dtype)
+    print("float_dtype = ", float_dtype, "\n")
+
     # グラフタイプ (0:時間領域波形&周波数特性 / 1:時間領域波形&スペクトログラム)
     graph_type = 1
 
@@ -106,20 +150,77 @@ if __name__ == '__main__':
     overlap_rate = 50
     # 使用する窓関数 ("hann" : Hanning窓)
     window_func = "hann"
+    # ストリーミングSTFT (リアルタイムモードで自作STFT関数を使用する場合のみ)
+    # (True:前回バッファの末尾を保持し、バッファ境界をまたぐSTFTフレームも連続して算出 / False:バッファ毎に独立して算出)
+    stft_streaming = True
+    # スペクトログラム履歴の表示時間長[s] (ストリーミングSTFTの場合のみ / "0"の場合は取得したバッファ分のみ表示)
+    # (最新の表示時間長分のスペクトログラムを固定メモリのリングバッファに保持し、スクロール表示する)
+    spctrgrm_history_time = 10
+
+    # リアルタイムモード向けパイプライン設定
+    # (取得→解析間キューの最大保持データ数 / キュー溢れ時の動作ポリシー / 解析ワーカースレッド数)
+    analysis_queue_size = 4
+    analysis_drop_policy = "drop-oldest"    # "drop-oldest" or "latest-only"
+    analysis_workers = 2
+
+    # レイテンシ統計値(p50/p95/p99)の定期出力間隔[s] ("0"の場合は終了時のみ出力)
+    latency_report_interval = 10
+
+    # 入力オーバーフロー(入力音声の欠落)区間の扱い (True:無音を挿入して実時間軸を維持 / False:詰めて連結)
+    fill_overflow_gaps = True
+
+    # 有音/無音判定による解析ステージのスキップ (リアルタイムモードのみ)
+    # (無音と判定したバッファでは、基本周波数を無声(0Hz)とする / スペクトログラムは全バッファで算出する)
+    # (有音開始/継続のエネルギー閾値[dB FS]、有音開始のスペクトル平坦度の上限、有音終了までのハングオーバー時間[s])
+    activity_gating = True
+    activity_on_threshold_db = -50.0
+    activity_off_threshold_db = -56.0
+    activity_flatness_threshold = 0.5
+    activity_hangover_time = 0.5
 
     # グラフ保存時のファイル名プレフィックス
     filename_prefix = "time-waveform_and_spectrogram_"
     # ------------------------
 
-    # === マイクチャンネルを自動取得 ===
-    # (標準入力にて選択可能とする)
-    print("=================================================================")
-    print("  [ Please Select Microphone index ]")
-    print("=================================================================")
-    print("")
-    mic_list = get_mic_index()
-    selected_index = get_selected_mic_index_by_std_input(mic_list)
-    print("\nUse Microphone Index :", selected_index, "\n")
+    # === 入力音声ソース選択 ===
+    # (コマンドライン引数に音声ファイル(WAV/FLAC)が指定された場合は、マイク入力の代わりに
+    #  音声ファイルを入力音声ストリームとして再生入力する)
+    # ("--unpaced"が指定された場合は、実時間ペースではなく最大速度で供給する)
+    # ("--play"が指定された場合は、スピーカーから再生しながら、聴こえている位置の音声データをそのまま解析する)
+    # 例： python <本スクリプト> recorded-sound.wav --unpaced
+    #      python <本スクリプト> recorded-sound.wav --play
+    if len(sys.argv) >= 2:
+        replay_filename = sys.argv[1]
+        replay_paced = "--unpaced" not in sys.argv[2:]
+        replay_play = "--play" in sys.argv[2:]
+        print(
+            "Replay Audio File :", replay_filename,
+            "( paced =", replay_paced, "/ play =", replay_play, ")\n")
+    else:
+        replay_filename = None
+
+    # 音声ファイルを最大速度で供給する場合は、取得が解析より常に速く"drop-oldest"ではほぼ全てのバッファを
+    # 破棄してしまうため、解析キューを"block"として取得済データを全て解析する
+    if (replay_filename is not None) and not replay_paced:
+        analysis_drop_policy = "block"
+
+    if replay_filename is None:
+        # === マイクチャンネルを自動取得 ===
+        # (標準入力にて選択可能とする)
+        print("=================================================================")
+        print("  [ Please Select Microphone index ]")
+        print("=================================================================")
+        print("")
+        # (1つのPortAudioインスタンスをデバイス一覧取得とストリーム生成で共有する)
+        session = AudioSession()
+        mic_list = session.get_mic_index()
+        selected_index = get_selected_mic_index_by_std_input(mic_list)
+        print("\nUse Microphone Index :", selected_index, "\n")
+
+        # 入力デバイスのネイティブサンプリング周波数を取得
+        if device_samplerate == 0:
+            device_samplerate = session.get_device_samplerate(selected_index)
+        print("Device Sampling Frequency[Hz] = ", device_samplerate, "\n")
 
     # === グラフ領域作成 ===
     # (リアルタイムモード向けグラフ描画のためにMain Codeでの生成が必須)
@@ -143,110 +244,358 @@ if __name__ == '__main__':
         # cbar_fig      : スペクトログラムカラーバー向けmatplotlib Axesインスタンス
         # f0_fig        : 基本周波数 時系列波形向けmatplotlib Axesインスタンス
 
+    # === 入力オーバーフロー検出 ===
+    # (欠落したフレーム数/発生回数を累積し、fill_overflow_gaps=Trueの場合は欠落区間を無音で埋める)
+    overflow_monitor = InputOverflowMonitor(samplerate, frames_per_buffer, mic_mode, fill_overflow_gaps)
+
+    # === 入力音声バッファサイズ自動調整 ===
+    # (デバイスバッファは最小サイズとし、取得ステージのstream.read()のサイズのみを変更する)
+    if (selected_mode == 1) and auto_tune_buffer:
+        buffer_tuner = BufferSizeTuner(samplerate, buffer_min_frames, frames_per_buffer, buffer_target_ratio)
+        frames_per_buffer = buffer_tuner.frames_per_buffer
+    else:
+        buffer_tuner = None
+    # buffer_tuner  : 入力音声バッファサイズ自動調整に使用するBufferSizeTuner (None:固定サイズ)
+
     # === Microphone入力音声ストリーム生成 ===
-    pa, stream = audio_stream_start(
-        selected_index, mic_mode, samplerate, frames_per_buffer)
-    # pa        : 生成したpyaudio.PyAudioクラスオブジェクト
-    #             (pyaudio.PyAudio object)
+    if replay_filename is None:
+        # (リアルタイムモードの場合は、パイプラインの取得ステージ専用スレッドで
+        #  stream.read()を行うため、Blockingモードのまま解析/描画中も入力音声を取りこぼさない)
+        pa, stream = audio_stream_start(
+            selected_index, mic_mode, samplerate, frames_per_buffer,
+            pa=session, sample_format=sample_format, overflow_monitor=overflow_monitor,
+            device_samplerate=device_samplerate)
+    elif replay_play:
+        # 再生モニタの場合は、出力ストリーム(Callbackモード)で再生しながら、再生バッファを共有する
+        # PlaybackMonitorSourceから、聴こえている位置の音声データ(再生バッファのview)をstreamとして取得する
+        # (レコーディングモードの場合は読飛ばさずに連続して取得する)
+        pa = AudioSession()
+        stream = PlaybackMonitorSource(
+            replay_filename, samplerate, mic_mode, sample_format=sample_format,
+            latest_only=(selected_mode == 1))
+        stream.open(pa)
+    else:
+        # 音声ファイル再生入力の場合は、PyAudioを使用せずにAudioReplaySourceをstreamとして使用する
+        pa = None
+        stream = AudioReplaySource(
+            replay_filename, samplerate, mic_mode, replay_paced, sample_format=sample_format)
+    # pa        : PortAudioインスタンスを保持するAudioSession
+    #             (AudioSession object / 音声ファイル再生入力の場合はNone)
     # stream    : 生成したpyaudio.PyAudio.Streamオブジェクト
-    #             (pyaudio.PyAudio.Stream object)
+    #             (pyaudio.PyAudio.Stream object / 音声ファイル再生入力の場合はAudioReplaySource
+    #              / 再生モニタの場合はPlaybackMonitorSource)
+
+    # レコーディングモードで音声ファイル再生入力の場合、録音時間を音声ファイルの長さまでに制限する
+    if (selected_mode == 0) and (replay_filename is not None):
+        time = min(time, stream.total_frames / samplerate)
+
+    # === レイテンシ計測 ===
+    # (取得ブロック毎のADC時刻/到着時刻を解析/描画まで持ち回り、ステージ毎およびEnd-to-Endのレイテンシを記録する)
+    latency_monitor = LatencyMonitor(report_interval=latency_report_interval)
+
+    # === 有音/無音判定 ===
+    # (バッファ毎に最初に判定し、無音バッファでは負荷の大きい解析ステージをスキップ/簡易処理に置換える)
+    if (selected_mode == 1) and activity_gating:
+        activity_detector = ActivityDetector(
+            samplerate, activity_on_threshold_db, activity_off_threshold_db,
+            activity_flatness_threshold, activity_hangover_time)
+    else:
+        activity_detector = None
+    # activity_detector : 有音/無音判定に使用するActivityDetector (None:全バッファを解析)
 
-    # === 時間領域波形 & スペクトログラムプロット ===
-    # キーボードインタラプトあるまでループ処理継続
-    while True:
-        try:
-            # === 時間領域波形データ生成 ===
-            data_normalized, time_normalized = gen_time_domain_data(
-                stream, frames_per_buffer, samplerate, time
+    # === ストリーミングSTFT ===
+    # (バッファサイズによらずSTFTフレームが連続するため、バッファサイズ自動調整で小さいバッファとなっても欠落しない)
+    if (selected_mode == 1) and (spctrgrm_mode == 1) and stft_streaming:
+        streaming_stft = StreamingStft(samplerate, stft_frame_size, overlap_rate, window_func, dbref, A)
+    else:
+        streaming_stft = None
+    # streaming_stft    : STFTフレームの切り出しに使用するStreamingStft (None:バッファ毎にoverlap()で切り出し)
+
+    # === スペクトログラム履歴 ===
+    # (解析ステージでSTFTフレーム番号の位置に書込むため、複数の解析ワーカーの完了順序が前後しても時刻順に保持される)
+    if (streaming_stft is not None) and (spctrgrm_history_time > 0):
+        spctrgrm_history = SpectrogramHistory(
+            stft_frame_size,
+            int(spctrgrm_history_time * samplerate / streaming_stft.hop_size),
+            streaming_stft.hop_size / samplerate
+        )
+    else:
+        spctrgrm_history = None
+    # spctrgrm_history  : スペクトログラム履歴を保持するSpectrogramHistory (None:履歴表示なし)
+
+    # 解析ステージで解析したフレーム数の累計 (音声ファイル再生入力の実時間比の算出に使用)
+    # (複数の解析ワーカースレッドから加算するため、ロックで保護する)
+    analyzed_frames = [0]
+    analyzed_frames_lock = threading.Lock()
+
+    def select_spctrgrm_channel(data_normalized):
+        # (マルチチャンネル(チャンネル数, フレーム数)の場合は、解析するチャンネルのview(データコピーなし)を返す)
+        if mic_mode > 1:
+            return data_normalized[spctrgrm_channel]
+
+        return data_normalized
+
+    def capture_time_domain_data():
+        # =============================================================
+        # === 時間領域波形データ取得関数 (パイプライン取得ステージ) ===
+        # =============================================================
+
+        # (バッファサイズ自動調整時は、最新のバッファサイズで取得する)
+        if buffer_tuner is not None:
+            capture_frames = buffer_tuner.frames_per_buffer
+        else:
+            capture_frames = frames_per_buffer
+
+        # === 時間領域波形データ生成 ===
+        data_normalized, time_normalized = gen_time_domain_data(
+            stream, capture_frames, samplerate, time,
+            channels=mic_mode, sample_format=sample_format, overflow_monitor=overflow_monitor
+        )
+        # data_normalized : 時間領域波形データ(正規化済)
+        #                   (マルチチャンネルの場合は2次元配列(チャンネル数, フレーム数))
+        # time_normalized : 時間領域波形データ(正規化済)に対応した時間軸データ
+
+        # === 有音/無音判定 ===
+        # (ハングオーバー等の判定状態をバッファの取得順に更新するため、解析ワーカーではなく取得ステージで判定する)
+        if activity_detector is not None:
+            active = activity_detector.update(select_spctrgrm_channel(data_normalized))
+        else:
+            active = True
+        # active    : 有音(True) / 無音(False)
+
+        # === STFTフレームの切り出し (ストリーミングSTFT) ===
+        # (前回バッファの末尾を保持して連結するため、解析ワーカーではなく取得ステージでバッファの取得順に切り出す)
+        if streaming_stft is not None:
+            # 入力オーバーフローで欠落した区間の分だけ時間軸/フレーム番号を進める
+            # (欠落区間の前後を連結したSTFTフレームを生成せず、スペクトログラム履歴では欠落列を未書込みの値で埋める)
+            if overflow_monitor.fill_gaps and (overflow_monitor.last_gap_frames > 0):
+                streaming_stft.skip(overflow_monitor.last_gap_frames)
+
+            block_start_time = streaming_stft.total_samples / samplerate
+            first_frame_index = streaming_stft.total_frames
+            stft_frames, time_stft = streaming_stft.push(select_spctrgrm_channel(data_normalized))
+            stft_block = (stft_frames, first_frame_index, time_stft, block_start_time)
+        else:
+            stft_block = None
+        # stft_block    : (新たに完成したSTFTフレーム, 先頭フレームのフレーム番号,
+        #                  スペクトログラム x軸向けデータ[s], バッファ先頭の時刻[s]) (None:ストリーミングSTFT無効)
+
+        return data_normalized, time_normalized, active, stft_block
+
+    def analyze_time_domain_data(captured):
+        # =======================================================================
+        # === スペクトログラム/基本周波数 解析関数 (パイプライン解析ステージ) ===
+        # =======================================================================
+        # captured : capture_time_domain_data()の戻り値
+
+        data_normalized, time_normalized, active, stft_block = captured
+
+        # 解析するチャンネルの選択 (マルチチャンネルの場合)
+        data_normalized = select_spctrgrm_channel(data_normalized)
+
+        # === 解析の処理時間計測開始 (バッファサイズ自動調整) ===
+        if buffer_tuner is not None:
+            buffer_tuner_token = buffer_tuner.begin(len(time_normalized))
+
+        # === スペクトログラムデータ算出 ===
+        if spctrgrm_mode == 0:
+
+            # ================================================
+            # === scipy.signal.spectrogram()を使用する場合 ===
+            # ================================================
+
+            freq_spctrgrm, time_spctrgrm, spectrogram = gen_freq_domain_data_of_signal_spctrgrm(
+                data_normalized, samplerate, stft_frame_size, overlap_rate, window_func, dbref, A)
+            # freq_spctrgrm         : スペクトログラム y軸向けデータ[Hz]
+            # time_spctrgrm         : スペクトログラム x軸向けデータ[s]
+            # spectrogram           : スペクトログラム 振幅データ
+
+        elif stft_block is not None:
+
+            # ==============================================
+            # === 自作STFT関数(ストリーミングSTFT)の場合 ===
+            # ==============================================
+
+            # 取得ステージで切り出したSTFTフレームのスペクトログラムを算出
+            stft_frames, first_frame_index, time_stft, block_start_time = stft_block
+            freq_spctrgrm = streaming_stft.freq_spctrgrm
+            spectrogram = streaming_stft.analyze(stft_frames)
+
+            # スペクトログラム履歴へ新たに完成したフレーム(列)のみを書込む
+            if spctrgrm_history is not None:
+                spctrgrm_history.write(first_frame_index, spectrogram, time_stft)
+
+            # 時間軸データは、描画する時間領域波形データ(バッファ先頭)からの時刻とする
+            time_spctrgrm = time_stft - block_start_time
+            # freq_spctrgrm         : スペクトログラム y軸向けデータ[Hz]
+            # time_spctrgrm         : スペクトログラム x軸向けデータ[s]
+            #                         (バッファ境界をまたぐフレームを含むため、先頭フレームは負の時刻となる場合がある)
+            # spectrogram           : スペクトログラム 振幅データ
+
+        else:
+
+            # ==================================
+            # === 自作STFT関数を使用する場合 ===
+            # ==================================
+
+            # オーバーラップ処理の実行
+            data_overlaped, N_ave, final_time = overlap(
+                data_normalized, samplerate, stft_frame_size, overlap_rate
+            )
+            # data_overlaped    : オーバーラップ抽出された時間領域波形配列(正規化済 / (切り出しフレーム数, STFTフレーム長)のview)
+            # N_ave             : オーバーラップ処理における切り出しフレーム数
+            # final_time        : オーバーラップ処理で切り出したデータの最終時刻[s]
+
+            # 窓関数の適用
+            data_applied_window, acf = window(
+                data_overlaped, stft_frame_size, N_ave, window_func
             )
-            # data_normalized : 時間領域波形データ(正規化済)
-            # time_normalized : 時間領域波形データ(正規化済)に対応した時間軸データ
-
-            # === スペクトログラムデータ算出 ===
-            if spctrgrm_mode == 0:
-
-                # ================================================
-                # === scipy.signal.spectrogram()を使用する場合 ===
-                # ================================================
-
-                freq_spctrgrm, time_spctrgrm, spectrogram = gen_freq_domain_data_of_signal_spctrgrm(
-                    data_normalized, samplerate, stft_frame_size, overlap_rate, window_func, dbref, A)
-                # freq_spctrgrm         : スペクトログラム y軸向けデータ[Hz]
-                # time_spctrgrm         : スペクトログラム x軸向けデータ[s]
-                # spectrogram           : スペクトログラム 振幅データ
-
-            else:
-
-                # ==================================
-                # === 自作STFT関数を使用する場合 ===
-                # ==================================
-
-                # オーバーラップ処理の実行
-                data_overlaped, N_ave, final_time = overlap(
-                    data_normalized, samplerate, stft_frame_size, overlap_rate
-                )
-                # data_overlaped    : オーバーラップ抽出された時間領域波形配列(正規化済)
-                # N_ave             : オーバーラップ処理における切り出しフレーム数
-                # final_time        : オーバーラップ処理で切り出したデータの最終時刻[s]
-
-                # 窓関数の適用
-                data_applied_window, acf = window(
-                    data_overlaped, stft_frame_size, N_ave, window_func
-                )
-                # data_applied_window   : 時間領域 波形データ(正規化/オーバーラップ処理/hanning窓関数適用済)
-                # acf                   : 振幅補正係数(Amplitude Correction Factor)
-
-                # STFT(Short-Time Fourier Transform)の実行
-                freq_spctrgrm, time_spctrgrm, spectrogram = gen_freq_domain_data_of_stft(
-                    data_applied_window, samplerate, stft_frame_size, N_ave, final_time, acf, dbref, A)
-                # freq_spctrgrm         : スペクトログラム y軸向けデータ[Hz]
-                # time_spctrgrm         : スペクトログラム x軸向けデータ[s]
-                # spectrogram           : スペクトログラム 振幅データ
-
-            # === 基本周波数 時系列データ生成 ===
+            # data_applied_window   : 時間領域 波形データ(正規化/オーバーラップ処理/hanning窓関数適用済)
+            # acf                   : 振幅補正係数(Amplitude Correction Factor)
+
+            # STFT(Short-Time Fourier Transform)の実行
+            freq_spctrgrm, time_spctrgrm, spectrogram = gen_freq_domain_data_of_stft(
+                data_applied_window, samplerate, stft_frame_size, N_ave, final_time, acf, dbref, A)
+            # freq_spctrgrm         : スペクトログラム y軸向けデータ[Hz]
+            # time_spctrgrm         : スペクトログラム x軸向けデータ[s]
+            # spectrogram           : スペクトログラム 振幅データ
+
+        # === 基本周波数 時系列データ生成 ===
+        if activity_detector is None:
             f0, time_f0 = gen_fundamental_freq_data(data_normalized, samplerate)
-            # f0        : 基本周波数 時系列データ 1次元配列
-            # time_f0   : 基本周波数 時系列データに対応した時間軸データ 1次元配列
-
-            # === グラフ表示 ===
-            plot_time_and_spectrogram(
-                fig,
-                wave_fig,
-                spctrgrm_fig,
-                cbar_fig,
-                f0_fig,
-                data_normalized,
-                time_normalized,
-                time_range,
-                freq_spctrgrm,
-                time_spctrgrm,
-                spectrogram,
-                freq_range,
-                f0,
-                time_f0,
-                dbref,
-                A,
-                selected_mode,
-                spctrgrm_mode
+        else:
+            f0, time_f0 = activity_detector.run_stage(
+                "f0", active, gen_fundamental_freq_data, data_normalized, samplerate,
+                downgrade_func=gen_unvoiced_fundamental_freq_data
             )
+        # f0        : 基本周波数 時系列データ 1次元配列
+        # time_f0   : 基本周波数 時系列データに対応した時間軸データ 1次元配列
+
+        # === 解析の処理時間計測終了 (バッファサイズ自動調整) ===
+        if buffer_tuner is not None:
+            buffer_tuner.end(buffer_tuner_token)
+
+        # 解析したフレーム数の累計を更新
+        with analyzed_frames_lock:
+            analyzed_frames[0] += len(time_normalized)
+
+        return (
+            data_normalized,
+            time_normalized,
+            freq_spctrgrm,
+            time_spctrgrm,
+            spectrogram,
+            f0,
+            time_f0
+        )
+
+    def render_analysis_result(result):
+        # =================================================
+        # === グラフ表示関数 (パイプライン描画ステージ) ===
+        # =================================================
+        # result : analyze_time_domain_data()の戻り値
+
+        (
+            data_normalized,
+            time_normalized,
+            freq_spctrgrm,
+            time_spctrgrm,
+            spectrogram,
+            f0,
+            time_f0
+        ) = result
+
+        # X軸表示レンジは取得したバッファの時間長とする (バッファサイズ自動調整時はブロック毎に異なる)
+        if buffer_tuner is not None:
+            block_time_range = (1 / samplerate) * len(time_normalized)
+        else:
+            block_time_range = time_range
+
+        # === グラフ表示 ===
+        plot_time_and_spectrogram(
+            fig,
+            wave_fig,
+            spctrgrm_fig,
+            cbar_fig,
+            f0_fig,
+            data_normalized,
+            time_normalized,
+            block_time_range,
+            freq_spctrgrm,
+            time_spctrgrm,
+            spectrogram,
+            freq_range,
+            f0,
+            time_f0,
+            dbref,
+            A,
+            selected_mode,
+            spctrgrm_mode,
+            spctrgrm_history
+        )
+
+    # === 時間領域波形 & スペクトログラムプロット ===
+    if selected_mode == 0:
+        # レコーディングモードの場合、取得 → 解析 → 描画を1回のみ直列に実行
+        captured = capture_time_domain_data()
+        data_normalized, time_normalized, active, stft_block = captured
+
+        block_stamp = gen_block_stamp(stream, samplerate)
+        latency_monitor.begin(block_stamp)
+        result = analyze_time_domain_data(captured)
+        latency_monitor.mark(block_stamp, "analysis")
+        render_analysis_result(result)
+        latency_monitor.mark(block_stamp, "render")
+        latency_monitor.finish(block_stamp)
 
-            if selected_mode == 0:
-                # レコーディングモードの場合、While処理を1回で抜ける
-                break
+    else:
+        # リアルタイムモードの場合、取得/解析/描画をスレッド分離したパイプラインで実行
+        # (キーボードインタラプトあるまで継続)
+        pipeline = AudioPipeline(
+            capture_time_domain_data,
+            analyze_time_domain_data,
+            render_analysis_result,
+            analysis_queue_size=analysis_queue_size,
+            analysis_drop_policy=analysis_drop_policy,
+            render_queue_size=1,
+            render_drop_policy="latest-only",
+            analysis_workers=analysis_workers,
+            latency_monitor=latency_monitor,
+            stamp_func=lambda: gen_block_stamp(stream, samplerate)
+        )
+        pipeline.run()
 
-        except KeyboardInterrupt:
-            # 「ctrl+c」が押下された場合、While処理を抜ける
-            break
+        # パイプライン各キューの状態カウンタを表示
+        print("\nPipeline Queue Stats = ", pipeline.get_queue_stats(), "\n")
 
     if selected_mode == 0:
         # レコーディングモードの場合、音声およびグラフを保存する
 
         # === レコーディング音声のwavファイル保存 ===
-        save_audio_to_wav_file(samplerate, data_normalized)
+        save_audio_to_wav_file(samplerate, data_normalized, sample_format)
 
         # === グラフ保存 ===
         save_matplot_graph(filename_prefix)
 
+    # === レイテンシ統計値(p50/p95/p99)の出力 ===
+    latency_monitor.print_report()
+
+    # === 入力オーバーフロー累積カウンタの出力 ===
+    overflow_monitor.print_report()
+
+    # === 有音/無音判定 & 解析ステージのスキップ統計の出力 ===
+    if activity_detector is not None:
+        activity_detector.print_report()
+
+    if replay_filename is not None:
+        # 音声ファイル再生入力の場合、処理スループット(実時間比)を表示
+        # (解析キューで破棄されたバッファを含めないように、解析したフレーム数から算出する)
+        print("Replay Realtime Factor = x", round(stream.get_realtime_factor(analyzed_frames[0]), 2), "\n")
+
+        if replay_play:
+            # 再生モニタの場合、解析が再生に遅れて読飛ばしたフレーム数を表示
+            print("Playback Monitor Skipped Frames = ", stream.skipped_frames, "\n")
+
     # === Microphone入力音声ストリーム停止 ===
     audio_stream_stop(pa, stream)
 
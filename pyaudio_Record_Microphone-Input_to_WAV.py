@@ -0,0 +1,95 @@
+from modules.audio_session import AudioSession
+from modules.audio_stream import audio_stream_start, audio_stream_stop
+from modules.get_std_input import get_selected_mic_index_by_std_input
+from modules.input_overflow_monitor import InputOverflowMonitor
+from modules.save_audio_to_wav_file import record_audio_stream_to_wav_file
+
+if __name__ == '__main__':
+    # =================
+    # === Main Code ===
+    # =================
+
+    # --- Parameters ---
+    # マイクモード (1:モノラル / 2:ステレオ)
+    mic_mode = 1
+
+    # サンプルフォーマット ("int16":16bit / "int24":24bit / "int32":32bit整数, "float32":32bit浮動小数点)
+    # (計測用オーディオインタフェース等で24bit/float32が使用可能な場合は、ダイナミックレンジを維持できる)
+    sample_format = "int16"
+
+    # サンプリング周波数[Hz]
+    samplerate = 16000
+    print("\nSampling Frequency[Hz] = ", samplerate)
+
+    # 入力デバイスで取得するサンプリング周波数[Hz] ("0"の場合はデバイスのネイティブサンプリング周波数)
+    # (samplerateと異なる場合は、ストリーミングリサンプラ(soxr)でsamplerateに変換してから解析/保存する)
+    # (解析コストはsamplerateで、取得品質/デバイスの安定動作はdevice_samplerateで個別に調整できる)
+    device_samplerate = 0
+
+    # 入力音声ストリームバッファあたりのサンプリングデータ数
+    frames_per_buffer = 512
+    print(
+        "frames_per_buffer [sampling data count/stream buffer] = ",
+        frames_per_buffer,
+        "\n"
+    )
+
+    # 録音時間[s] ("0"の場合は、キーボードインタラプトあるまで録音を継続)
+    time = 0
+
+    # WAVファイルのflush & fsync間隔[s]
+    flush_interval = 1.0
+
+    # 入力オーバーフロー(入力音声の欠落)区間の扱い (True:無音を挿入して実時間軸を維持 / False:詰めて連結)
+    fill_overflow_gaps = True
+    # ------------------------
+
+    # === マイクチャンネルを自動取得 ===
+    # (標準入力にて選択可能とする)
+    print("=================================================================")
+    print("  [ Please Select Microphone index ]")
+    print("=================================================================")
+    print("")
+    # (1つのPortAudioインスタンスをデバイス一覧取得とストリーム生成で共有する)
+    session = AudioSession()
+    mic_list = session.get_mic_index()
+    selected_index = get_selected_mic_index_by_std_input(mic_list)
+    print("\nUse Microphone Index :", selected_index, "\n")
+
+    # 入力デバイスのネイティブサンプリング周波数を取得
+    if device_samplerate == 0:
+        device_samplerate = session.get_device_samplerate(selected_index)
+    print("Device Sampling Frequency[Hz] = ", device_samplerate, "\n")
+
+    # === Microphone入力音声ストリーム生成 ===
+    pa, stream = audio_stream_start(
+        selected_index, mic_mode, samplerate, frames_per_buffer,
+        pa=session, sample_format=sample_format, device_samplerate=device_samplerate)
+    # pa        : PortAudioインスタンスを保持するAudioSession
+    #             (AudioSession object)
+    # stream    : 生成したpyaudio.PyAudio.Streamオブジェクト
+    #             (pyaudio.PyAudio.Stream object)
+
+    # === 入力オーバーフロー検出 ===
+    # (欠落したフレーム数/発生回数を累積し、fill_overflow_gaps=Trueの場合は欠落区間を無音で埋める)
+    overflow_monitor = InputOverflowMonitor(samplerate, frames_per_buffer, mic_mode, fill_overflow_gaps)
+
+    # === 入力音声のwavファイル直接録音 ===
+    # (入力音声ストリームバッファ毎にバックグラウンドスレッドでwavファイルへ追記するため、
+    #  録音時間に関わらずメモリ使用量は一定となる)
+    print("Audio Stream Recording START (Press ctrl+c to STOP)")
+    filename = record_audio_stream_to_wav_file(
+        stream, frames_per_buffer, samplerate, mic_mode, time, flush_interval, sample_format,
+        overflow_monitor
+    )
+    print("Audio Stream Recording END : ", filename, "\n")
+
+    # === 入力オーバーフロー累積カウンタの出力 ===
+    overflow_monitor.print_report()
+
+    # === Microphone入力音声ストリーム停止 ===
+    audio_stream_stop(pa, stream)
+
+    print("=================")
+    print("= Main Code END =")
+    print("=================\n")
@@ -0,0 +1,68 @@
+# ================================================
+# === Play Playlist Gapless with Callback-mode ===
+# ================================================
+import sys
+import time
+
+import pyaudio
+
+from modules.audio_stream import SAMPLE_FORMATS
+from modules.playlist_player import PlaylistPlayer
+
+CHUNK = 1024
+
+# Number of decoded files held ahead of playback by the prefetch thread
+PREFETCH = 2
+
+# Output sample format ("int16" / "int24" / "int32" / "float32")
+SAMPLE_FORMAT = "float32"
+
+if len(sys.argv) < 2:
+    print(f'Plays audio files gapless in order. Usage: {sys.argv[0]} file1.wav [file2.flac file3.ogg ...]')
+    sys.exit(-1)
+
+# === Prepare the playlist ===
+# The output stream format (rate / channels) is taken from the first
+# file. A background thread decodes the following files (WAV/FLAC/OGG via
+# soundfile), converts their channels and rates to the output format, and
+# keeps up to PREFETCH of them in a bounded queue. The callback never
+# waits on disk or decoding, and consecutive files are joined sample by
+# sample, so transitions are gapless.
+player = PlaylistPlayer(sys.argv[1:], sample_format=SAMPLE_FORMAT,
+                        frames_per_buffer=CHUNK, prefetch_count=PREFETCH)
+player.start()
+
+# === Instantiate PyAudio and initialize PortAudio system resources ===
+p = pyaudio.PyAudio()
+
+# === Open one stream for the whole playlist using callback ===
+# The stream stays open across file transitions, and stops after the
+# callback returns "pyaudio.paComplete" with the last block of the last file.
+stream = p.open(format=SAMPLE_FORMATS[player.sample_format],
+                channels=player.channels,
+                rate=player.samplerate,
+                frames_per_buffer=CHUNK,
+                output=True,
+                stream_callback=player.callback)
+
+# === Wait for stream to finish ===
+# Print the file being played whenever it changes.
+now_playing = None
+try:
+    while stream.is_active():
+        if player.now_playing != now_playing:
+            now_playing = player.now_playing
+            print("Now Playing :", player.filenames[now_playing])
+        time.sleep(0.1)
+except KeyboardInterrupt:
+    pass
+
+# === Close stream ===
+stream.close()
+
+# === Stop the prefetch thread ===
+player.stop()
+player.print_report()
+
+# === Release PortAudio system resources ===
+p.terminate()
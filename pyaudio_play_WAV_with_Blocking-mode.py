@@ -2,43 +2,58 @@
 # === Play WAV File with Blocking-mode ===
 # ========================================
 import sys
-import wave
 
 import pyaudio
 
+from modules.audio_stream import SAMPLE_FORMATS
+from modules.wav_playback import WavPlaybackEngine
+
 CHUNK = 1024
 
+# Load the whole file into memory before playback (True), or play it
+# directly from the memory-mapped file (False).
+PRELOAD = False
+
 if len(sys.argv) < 2:
-    print(f'Plays a wave file. Usage: {sys.argv[0]} filename.wav')
+    print(f'Plays a wave file. Usage: {sys.argv[0]} filename.wav [chunk]')
     sys.exit(-1)
 
-with wave.open(sys.argv[1], 'rb') as wf:  # mode="rb" is read-only mode
-
-    # === Instantiate PyAudio and initialize PortAudio system resources ===
-    p = pyaudio.PyAudio()
-
-    # === Open stream ===
-    # To record or play audio, open a stream on the desired device with the
-    # desired audio parameters using "pyaudio.PyAudio.open()". This sets up a
-    # "pyaudio.PyAudio.Stream" to play or record audio.
-    stream = p.open(format=p.get_format_from_width(wf.getsampwidth()),
-                    channels=wf.getnchannels(),
-                    rate=wf.getframerate(),
-                    output=True)
-
-    # === Play Audio from the wave file ===
-    # Play audio by writing audio data to the stream using
-    # "pyaudio.PyAudio.Stream.write()". Note that in “blocking mode”, each
-    # "pyaudio.PyAudio.Stream.write()" or "pyaudio.PyAudio.Stream.read()"
-    # blocks until all frames have been played/recorded. An alternative
-    # approach is “callback mode”, described below, in which PyAudio invokes a
-    # user-defined function to process recorded audio or generate output
-    # audio.
-    while len(data := wf.readframes(CHUNK)):  # Requires Python 3.8+ for :=
-        stream.write(data)
-
-    # === Close stream ===
-    stream.close()
-
-    # === Release PortAudio system resources ===
-    p.terminate()
+if len(sys.argv) >= 3:
+    CHUNK = int(sys.argv[2])
+
+# === Open the wave file for zero-copy playback ===
+# The audio data is held as one memory-mapped (or preloaded) buffer, and
+# the playback blocks are read-only views into that buffer, built once
+# for the given chunk size. Unlike "wf.readframes(CHUNK)", no bytes
+# object is allocated and no file I/O is done for each block.
+engine = WavPlaybackEngine(sys.argv[1], CHUNK, preload=PRELOAD)
+
+# === Instantiate PyAudio and initialize PortAudio system resources ===
+p = pyaudio.PyAudio()
+
+# === Open stream ===
+# To record or play audio, open a stream on the desired device with the
+# desired audio parameters using "pyaudio.PyAudio.open()". This sets up a
+# "pyaudio.PyAudio.Stream" to play or record audio.
+stream = p.open(format=SAMPLE_FORMATS[engine.sample_format],
+                channels=engine.channels,
+                rate=engine.samplerate,
+                frames_per_buffer=CHUNK,
+                output=True)
+
+# === Play Audio from the wave file ===
+# Play audio by writing audio data to the stream using
+# "pyaudio.PyAudio.Stream.write()". Note that in “blocking mode”, each
+# "pyaudio.PyAudio.Stream.write()" or "pyaudio.PyAudio.Stream.read()"
+# blocks until all frames have been played/recorded. An alternative
+# approach is “callback mode”, described below, in which PyAudio invokes a
+# user-defined function to process recorded audio or generate output
+# audio.
+for data in engine.iter_blocks():
+    stream.write(data)
+
+# === Close stream ===
+stream.close()
+
+# === Release PortAudio system resources ===
+p.terminate()